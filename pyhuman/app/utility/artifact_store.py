@@ -0,0 +1,242 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from .download_engine import PART_SUFFIX
+from .persona import persona_key
+
+INDEX_FILE_NAME = 'index.json'
+STALE_PART_SECONDS = 3600  # a download's .part untouched this long has been abandoned
+DEFAULT_QUOTA_MB = 2048
+DEFAULT_MAX_AGE_HOURS = 0  # 0 = evict by quota only
+
+# Set once from the command line via configure()
+settings = {'root': os.path.join(tempfile.gettempdir(), 'pyhuman-artifacts'),
+            'quota_mb': DEFAULT_QUOTA_MB, 'max_age_hours': DEFAULT_MAX_AGE_HOURS}
+
+
+def configure(root: str | None = None, quota_mb: float = DEFAULT_QUOTA_MB,
+              max_age_hours: float = DEFAULT_MAX_AGE_HOURS) -> None:
+    """
+    Args:
+        root (str, optional): Directory holding one store per persona.
+        quota_mb (float): Disk quota per store; least recently used artifacts are evicted above it (0 = none).
+        max_age_hours (float): Evict artifacts not used for this long (0 = never by age).
+    """
+    if root:
+        settings['root'] = root
+    settings['quota_mb'] = quota_mb
+    settings['max_age_hours'] = max_age_hours
+
+
+def path_size(path: str) -> int:
+    if not os.path.isdir(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class ArtifactStore(object):
+    """
+    Disk space for files and build trees that workflows leave behind, with a quota.
+
+    Every artifact is a top-level entry of the store's directory, recorded in index.json with
+    its size, creating workflow and last use. After each addition, artifacts older than the
+    age limit and then the least recently used ones are deleted until the store fits in its
+    quota. Artifacts in use (see using()) are never evicted. Entries found on disk but missing
+    from the index (e.g. after a crash) are adopted when the store is opened. Partial downloads
+    ('.part' files) count towards the quota and are deleted once they are stale.
+    """
+
+    def __init__(self, root: str, quota_bytes: int = 0, max_age_seconds: float = 0):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._pinned = {}
+        self._stats = {'bytes_written': 0, 'bytes_evicted': 0, 'artifacts_evicted': 0}
+        os.makedirs(root, exist_ok=True)
+        self._index = self._load()
+
+    def path_for(self, name: str) -> str:
+        """Where a new file artifact called `name` should be written; call add() once it exists."""
+        return os.path.join(self.root, os.path.basename(name))
+
+    def new_workspace(self, prefix: str) -> str:
+        """Create an empty directory artifact, e.g. for a build; call add() when done with it."""
+        return tempfile.mkdtemp(prefix=f'{prefix}-', dir=self.root)
+
+    def add(self, path: str, workflow: str | None = None) -> int:
+        """
+        Record (or re-measure) an artifact and enforce the quota.
+
+        Returns:
+            int: The artifact's size in bytes.
+        """
+        name = os.path.basename(path.rstrip(os.sep))
+        size = path_size(os.path.join(self.root, name))
+        now = time.time()
+        with self._lock:
+            previous = self._index.get(name, {})
+            self._stats['bytes_written'] += max(size - previous.get('size', 0), 0)
+            self._index[name] = {
+                'size': size,
+                'workflow': workflow or previous.get('workflow'),
+                'created': previous.get('created', now),
+                'last_used': now,
+                'directory': os.path.isdir(os.path.join(self.root, name)),
+            }
+            self.enforce()
+        return size
+
+    def touch(self, name: str) -> None:
+        with self._lock:
+            if name in self._index:
+                self._index[name]['last_used'] = time.time()
+                self._save()
+
+    @contextmanager
+    def using(self, path: str):
+        """Protect an artifact from eviction while the block runs."""
+        name = os.path.basename(path.rstrip(os.sep))
+        with self._lock:
+            self._pinned[name] = self._pinned.get(name, 0) + 1
+        try:
+            yield path
+        finally:
+            with self._lock:
+                self._pinned[name] -= 1
+                if not self._pinned[name]:
+                    del self._pinned[name]
+
+    def enforce(self) -> int:
+        """Evict expired, then least recently used, artifacts until within quota. Returns bytes freed."""
+        freed = 0
+        with self._lock:
+            now = time.time()
+            candidates = sorted((entry['last_used'], name) for name, entry in self._index.items()
+                                if name not in self._pinned)
+            total = self.total_bytes()
+            for modified, name, size in self._parts():
+                if now - modified <= STALE_PART_SECONDS:
+                    total += size  # still being written; counted, but left to its download
+                    continue
+                self._delete(os.path.join(self.root, name))
+                freed += size
+                self._stats['bytes_evicted'] += size
+                self._stats['artifacts_evicted'] += 1
+            for last_used, name in candidates:
+                expired = self.max_age_seconds and now - last_used > self.max_age_seconds
+                over = self.quota_bytes and total > self.quota_bytes
+                if not expired and not over:
+                    continue
+                size = self._index.pop(name)['size']
+                self._delete(os.path.join(self.root, name))
+                total -= size
+                freed += size
+                self._stats['bytes_evicted'] += size
+                self._stats['artifacts_evicted'] += 1
+            self._save()
+        if freed:
+            print(f'Artifact store {self.root}: evicted {freed / (1024 * 1024):.1f} MB; {self.report()}')
+        return freed
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry['size'] for entry in self._index.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, artifacts=len(self._index), bytes=self.total_bytes())
+
+    def report(self) -> str:
+        s = self.stats()
+        return (f"artifacts={s['artifacts']} size={s['bytes'] / (1024 * 1024):.1f}MB "
+                f"written={s['bytes_written'] / (1024 * 1024):.1f}MB "
+                f"evicted={s['bytes_evicted'] / (1024 * 1024):.1f}MB in {s['artifacts_evicted']} artifacts")
+
+    """ PRIVATE """
+
+    def _load(self) -> dict:
+        index = {}
+        try:
+            with open(os.path.join(self.root, INDEX_FILE_NAME), encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            pass
+        on_disk = {e.name: e for e in os.scandir(self.root)
+                   if e.name != INDEX_FILE_NAME and not e.name.endswith(('.tmp', PART_SUFFIX))}
+        index = {name: entry for name, entry in index.items() if name in on_disk}
+        for name, e in on_disk.items():
+            if name not in index:
+                mtime = e.stat(follow_symlinks=False).st_mtime
+                index[name] = {'size': path_size(e.path), 'workflow': None, 'created': mtime,
+                               'last_used': mtime, 'directory': e.is_dir(follow_symlinks=False)}
+        return index
+
+    def _parts(self) -> list:
+        # (modified, name, size) of the partial downloads in the store; they are not artifacts yet
+        parts = []
+        for e in os.scandir(self.root):
+            if e.name.endswith(PART_SUFFIX):
+                try:
+                    st = e.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                parts.append((st.st_mtime, e.name, st.st_size))
+        return parts
+
+    def _save(self) -> None:
+        path = os.path.join(self.root, INDEX_FILE_NAME)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=1)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def _delete(path: str) -> None:
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store() -> ArtifactStore:
+    """The calling persona's store (one per persona, so each simulated human has its own quota)."""
+    key = persona_key() or 'default'
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ArtifactStore(os.path.join(settings['root'], key),
+                                         quota_bytes=int(settings['quota_mb'] * 1024 * 1024),
+                                         max_age_seconds=settings['max_age_hours'] * 3600)
+        return _stores[key]
+
+
+def all_stats() -> dict:
+    """Counters summed over every store opened in this process."""
+    with _stores_lock:
+        stores = list(_stores.values())
+    totals = {'bytes_written': 0, 'bytes_evicted': 0, 'artifacts_evicted': 0, 'artifacts': 0, 'bytes': 0}
+    for store in stores:
+        for key, value in store.stats().items():
+            totals[key] += value
+    return totals
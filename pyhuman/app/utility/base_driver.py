@@ -1,14 +1,21 @@
+import threading
 from abc import abstractmethod
 
+from .persona import persona_key
+
 
 class Singleton(type):
+    """One instance per class, and per persona when running several personas in one process."""
     _instances = {}
+    _lock = threading.RLock()
 
     def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super(
-                Singleton, cls).__call__(*args, **kwargs)
-        return cls._instances[cls]
+        key = (cls, persona_key())
+        with Singleton._lock:
+            if key not in cls._instances:
+                cls._instances[key] = super(
+                    Singleton, cls).__call__(*args, **kwargs)
+            return cls._instances[key]
 
 
 class BaseDriverHelper(metaclass=Singleton):
@@ -0,0 +1,260 @@
+import atexit
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+DEFAULT_POOL_SIZE = 0  # 0 = no limit on live browsers
+DEFAULT_SPARES = 0
+CHECKOUT_TIMEOUT_SECONDS = 300
+
+
+def default_health_check(driver) -> bool:
+    """A browser is healthy if chromedriver still answers a trivial script."""
+    try:
+        return driver.execute_script('return 1') == 1
+    except Exception:
+        return False
+
+
+def _quit_quietly(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class BrowserPool(object):
+    """
+    Pool of launched browsers with warm spares and checkout/checkin semantics.
+
+    Browsers are grouped by a launch key (the driver path plus Chrome arguments), so a spare
+    is only handed to a caller that would have launched an identical browser. Discarded
+    browsers are quit on a background thread and replaced by pre-launched spares, so the next
+    checkout does not pay Chrome's cold start.
+
+    Exclusive keys (browsers bound to a persistent profile directory, which only one Chrome may
+    open at a time) get no spares, and their discarded browsers are quit before the next launch.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, spares: int = DEFAULT_SPARES,
+                 health_check: Callable[[Any], bool] = default_health_check):
+        """
+        Args:
+            size (int): Maximum number of live browsers (checked out, idle or launching); 0 for no limit.
+            spares (int): Number of idle, pre-launched browsers to keep per launch key.
+            health_check (callable): Returns True if an idle browser may be handed out.
+        """
+        self.size = size
+        self.spares = spares
+        self.health_check = health_check
+        self._cond = threading.Condition()
+        self._idle: dict[Hashable, list] = {}
+        self._launchers: dict[Hashable, Callable[[], Any]] = {}
+        self._pending: dict[Hashable, int] = {}
+        self._exclusive: set = set()
+        self._live = 0
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'hits': 0,
+            'misses': 0,
+            'checkins': 0,
+            'discards': 0,
+            'health_failures': 0,
+            'launches': 0,
+            'launch_failures': 0,
+            'launch_seconds_total': 0.0,
+            'launch_seconds_max': 0.0,
+            'launch_seconds_last': 0.0,
+        }
+
+    def checkout(self, key: Hashable, launch: Callable[[], Any], exclusive: bool = False):
+        """
+        Return a browser for `key`, preferring a healthy warm spare over a cold launch.
+
+        Args:
+            key (Hashable): Launch key; only browsers launched with the same key are reused.
+            launch (callable): Zero-argument function that launches a new browser.
+            exclusive (bool): At most one browser may exist for this key (e.g. a locked profile).
+
+        Returns:
+            The checked out browser (a selenium WebDriver).
+        """
+        deadline = time.monotonic() + CHECKOUT_TIMEOUT_SECONDS
+        with self._cond:
+            self._launchers[key] = launch
+            if exclusive:
+                self._exclusive.add(key)
+            self._stats['checkouts'] += 1
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    driver = idle.pop()
+                    self._cond.release()
+                    try:
+                        healthy = self.health_check(driver)
+                    finally:
+                        self._cond.acquire()
+                    if healthy:
+                        self._stats['hits'] += 1
+                        self._replenish(key)
+                        return driver
+                    self._stats['health_failures'] += 1
+                    self._live -= 1
+                    self._retire(key, driver)
+                    continue
+                if self._has_capacity() or self._evict_idle():
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError('Timed out waiting for a free browser in the pool')
+                self._cond.wait(remaining)
+            self._stats['misses'] += 1
+            self._live += 1
+
+        try:
+            driver = self._launch(launch)
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._replenish(key)
+        return driver
+
+    def checkin(self, key: Hashable, driver, discard: bool = False) -> None:
+        """
+        Return a browser to the pool.
+
+        Args:
+            key (Hashable): Launch key the browser was checked out with.
+            driver: The browser.
+            discard (bool): Quit the browser (e.g. after an error or a forced logout) instead of
+                            keeping it as a spare; a replacement spare is launched in the background.
+        """
+        with self._cond:
+            self._stats['checkins'] += 1
+            keep = not discard and not self._closed and len(self._idle.get(key, [])) < max(self.spares, 1)
+            if keep:
+                self._idle.setdefault(key, []).append(driver)
+            else:
+                self._stats['discards'] += 1
+                self._live -= 1
+                self._retire(key, driver)
+            self._replenish(key)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Return a snapshot of hit/miss counters, launch timings and current occupancy."""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot['live'] = self._live
+            snapshot['idle'] = sum(len(v) for v in self._idle.values())
+            snapshot['launching'] = sum(self._pending.values())
+        return snapshot
+
+    def report(self) -> str:
+        s = self.stats()
+        launches = s['launches'] or 1
+        return (f"browser pool: hits={s['hits']} misses={s['misses']} launches={s['launches']} "
+                f"failures={s['launch_failures']} avg_launch={s['launch_seconds_total'] / launches:.2f}s "
+                f"max_launch={s['launch_seconds_max']:.2f}s live={s['live']} idle={s['idle']}")
+
+    def shutdown(self) -> None:
+        """Quit all idle spares and stop launching new ones."""
+        with self._cond:
+            self._closed = True
+            idle = [d for drivers in self._idle.values() for d in drivers]
+            self._idle.clear()
+            self._live -= len(idle)
+        for driver in idle:
+            _quit_quietly(driver)
+
+    """ PRIVATE """
+
+    def _has_capacity(self) -> bool:
+        return self.size <= 0 or self._live < self.size
+
+    def _evict_idle(self) -> bool:
+        # Free a slot held by an idle spare of some other launch key
+        for key, drivers in self._idle.items():
+            if drivers:
+                self._live -= 1
+                self._retire(key, drivers.pop())
+                return True
+        return False
+
+    def _launch(self, launch):
+        start = time.monotonic()
+        try:
+            driver = launch()
+        except Exception:
+            with self._cond:
+                self._stats['launch_failures'] += 1
+            raise
+        elapsed = time.monotonic() - start
+        with self._cond:
+            self._stats['launches'] += 1
+            self._stats['launch_seconds_total'] += elapsed
+            self._stats['launch_seconds_last'] = elapsed
+            self._stats['launch_seconds_max'] = max(self._stats['launch_seconds_max'], elapsed)
+        return driver
+
+    def _retire(self, key, driver) -> None:
+        # Called with the condition held. An exclusive key's profile must be released before
+        # the next launch, so its browser is quit synchronously (outside the lock).
+        if key not in self._exclusive:
+            self._quit_async(driver)
+            return
+        self._cond.release()
+        try:
+            _quit_quietly(driver)
+        finally:
+            self._cond.acquire()
+
+    def _replenish(self, key) -> None:
+        # Called with the condition held
+        if self._closed or key not in self._launchers or key in self._exclusive:
+            return
+        while (len(self._idle.get(key, [])) + self._pending.get(key, 0) < self.spares
+               and self._has_capacity()):
+            self._pending[key] = self._pending.get(key, 0) + 1
+            self._live += 1
+            threading.Thread(target=self._launch_spare, args=(key, self._launchers[key]),
+                             name='browser-pool-spare', daemon=True).start()
+
+    def _launch_spare(self, key, launch) -> None:
+        try:
+            driver = self._launch(launch)
+        except Exception as e:
+            print(f'Could not launch spare browser: {e}')
+            driver = None
+        with self._cond:
+            self._pending[key] -= 1
+            if driver is None or self._closed:
+                self._live -= 1
+                if driver is not None:
+                    self._quit_async(driver)
+            else:
+                self._idle.setdefault(key, []).append(driver)
+            self._cond.notify_all()
+
+    @staticmethod
+    def _quit_async(driver) -> None:
+        threading.Thread(target=_quit_quietly, args=(driver,), name='browser-pool-quit', daemon=True).start()
+
+
+_pool = BrowserPool()
+atexit.register(lambda: _pool.shutdown())
+
+
+def configure_pool(size: int = DEFAULT_POOL_SIZE, spares: int = DEFAULT_SPARES) -> BrowserPool:
+    """Set the process-wide pool's limits; call before the first browser is launched."""
+    _pool.size = size
+    _pool.spares = spares
+    return _pool
+
+
+def get_pool() -> BrowserPool:
+    return _pool
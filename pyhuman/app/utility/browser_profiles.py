@@ -0,0 +1,165 @@
+import os
+import re
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: profiles still persist, but are not protected against a second process
+    fcntl = None
+
+DEFAULT_MAX_MB = 512
+LOCK_FILE_NAME = '.pyhuman-lock'
+
+# Disposable caches inside a Chrome user data dir; cookies, logins and site storage are never evicted
+CACHE_DIRS = [
+    'Cache', 'Code Cache', 'GPUCache', 'GrShaderCache', 'GraphiteDawnCache', 'ShaderCache',
+    os.path.join('Service Worker', 'CacheStorage'), os.path.join('Service Worker', 'ScriptCache'),
+]
+
+# Set once from the command line via configure(); profiles are disabled while root is None
+settings = {'root': None, 'max_mb': DEFAULT_MAX_MB}
+
+_lock = threading.Lock()
+_held = {}  # profile dir -> open lock file, held for the life of the process
+
+
+def configure(root: str | None = None, max_mb: int = DEFAULT_MAX_MB) -> None:
+    """
+    Enable persistent browser profiles.
+
+    Args:
+        root (str, optional): Directory holding one Chrome profile per persona; None disables profiles.
+        max_mb (int): Size cap per profile; cache contents are evicted oldest-first above it (0 = no cap).
+    """
+    settings['root'] = root
+    settings['max_mb'] = max_mb
+
+
+def profile_name(persona: str | None) -> str:
+    return re.sub(r'[^\w.-]', '_', persona or 'default')
+
+
+def acquire_profile(persona: str | None) -> str | None:
+    """
+    Lock and return the persistent profile directory for a persona.
+
+    The lock is held until the process exits, so a second human.py cannot open the same
+    profile (Chrome would refuse, or corrupt it). Cache contents over the size cap are
+    evicted before the profile is first used, and again by trim_held_profile() whenever its
+    browser quits.
+
+    Args:
+        persona (str|None): Persona name, or None outside persona mode.
+
+    Returns:
+        str|None: The profile directory, or None if profiles are disabled or it is locked elsewhere.
+    """
+    root = settings['root']
+    if not root:
+        return None
+    path = os.path.join(os.path.abspath(os.path.expanduser(root)), profile_name(persona))
+    with _lock:
+        if path in _held:
+            return path
+        os.makedirs(path, exist_ok=True)
+        lock_file = open(os.path.join(path, LOCK_FILE_NAME), 'a+')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                print(f'Browser profile {path} is in use by another process; using a throwaway profile')
+                return None
+        _held[path] = lock_file
+    trim_held_profile(path)
+    return path
+
+
+def trim_held_profile(path: str | None) -> int:
+    """
+    Evict cache over the size cap from a profile this process holds (see acquire_profile()).
+
+    Call it between browser sessions, after the browser using the profile has quit, so a
+    long-running persona's cache does not grow without bound. Other directories are ignored.
+
+    Returns:
+        int: Bytes freed.
+    """
+    with _lock:
+        if path not in _held:
+            return 0
+    freed = trim_profile(path, settings['max_mb'] * 1024 * 1024)
+    if freed:
+        print(f'Evicted {freed / (1024 * 1024):.1f} MB of cache from browser profile {path}')
+    return freed
+
+
+def needs_trim(path: str | None) -> bool:
+    """Whether a profile this process holds has grown past the size cap."""
+    with _lock:
+        if path not in _held:
+            return False
+    return settings['max_mb'] > 0 and profile_size(path) > settings['max_mb'] * 1024 * 1024
+
+
+def profile_size(path: str) -> int:
+    return sum(size for _, size, _ in _files(path))
+
+
+def trim_profile(path: str, max_bytes: int) -> int:
+    """
+    Delete cache files, least recently used first, until the profile fits in `max_bytes`.
+
+    Only the CACHE_DIRS of each profile are touched; cookies, local storage and saved state
+    survive however large they are. Must only be called while no browser uses the profile.
+
+    Returns:
+        int: Bytes freed.
+    """
+    if max_bytes <= 0:
+        return 0
+    excess = profile_size(path) - max_bytes
+    if excess <= 0:
+        return 0
+    candidates = []
+    for profile in _profile_dirs(path):
+        for cache_dir in CACHE_DIRS:
+            candidates.extend(_files(os.path.join(profile, cache_dir)))
+    freed = 0
+    for file, size, _ in sorted(candidates, key=lambda c: c[2]):
+        if freed >= excess:
+            break
+        try:
+            os.remove(file)
+            freed += size
+        except OSError:
+            pass
+    return freed
+
+
+""" PRIVATE """
+
+
+def _profile_dirs(path: str) -> list:
+    # The user data dir holds 'Default' and 'Profile N' subdirectories, plus top-level caches
+    dirs = [path]
+    try:
+        dirs += [e.path for e in os.scandir(path)
+                 if e.is_dir() and (e.name == 'Default' or e.name.startswith('Profile '))]
+    except OSError:
+        pass
+    return dirs
+
+
+def _files(path: str) -> list:
+    """(path, size, last use) for every file below `path`; last use is atime, or mtime if later."""
+    files = []
+    for root, _, names in os.walk(path):
+        for name in names:
+            file = os.path.join(root, name)
+            try:
+                st = os.stat(file, follow_symlinks=False)
+            except OSError:
+                continue
+            files.append((file, st.st_size, max(st.st_atime, st.st_mtime)))
+    return files
@@ -0,0 +1,291 @@
+"""
+Content-addressed cache of download workflow sources, and a mirror server for it.
+
+The cache stores each body once under objects/<sha256[:2]>/<sha256><ext> and maps source URLs
+to bodies in index.json. It is filled from a JSON manifest:
+
+    {"entries": [
+        {"url": "https://en.wikipedia.org/wiki/Special:Random", "kind": "wikipedia", "count": 50, "assets": true},
+        {"url": "https://imgs.xkcd.com/comics/barrel_cropped_(1).jpg", "kind": "xkcd"},
+        {"url": "https://www.nist.gov/publications/example", "file": "/srv/pdfs/example.pdf", "kind": "nist"}
+    ]}
+
+`count` fetches a (redirecting) URL several times to collect different pages, `assets` also caches
+the images, scripts and stylesheets a page references, and `file` takes the body from a local
+file instead of the network. `kind` names the DownloadFiles source an entry stands in for.
+
+The mirror serves http://mirror/<host>/<path> for every cached URL, with absolute links to other
+cached hosts rewritten to point at the mirror, and lists the entries of each kind at /catalog.json.
+
+    python -m app.utility.content_mirror seed manifest.json --cache /srv/pyhuman-mirror
+    python -m app.utility.content_mirror serve --cache /srv/pyhuman-mirror --bind 0.0.0.0 --port 8081
+"""
+import argparse
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import threading
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from .download_engine import DownloadError, asset_urls, get_engine
+from .local_http_server import LocalHTTPServer, RangeRequestHandler
+
+INDEX_FILE_NAME = 'index.json'
+CATALOG_PATH = '/catalog.json'
+DEFAULT_PORT = 8081
+
+# Set once from the command line via configure()
+settings = {'mirror': None}
+
+
+def mirror_path(url: str) -> str:
+    """Where `url` is served on the mirror: /<host>/<path>[?query]."""
+    parts = urlsplit(url)
+    path = f'/{parts.netloc}{parts.path or "/"}'
+    return f'{path}?{parts.query}' if parts.query else path
+
+
+class ContentCache(object):
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        try:
+            with open(os.path.join(root, INDEX_FILE_NAME), encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def put(self, url: str, source_path: str, content_type: str | None = None, kind: str | None = None,
+            move: bool = False) -> dict:
+        """Copy (or with `move`, move) a body into the cache and index it under `url`."""
+        digest = hashlib.sha256()
+        with open(source_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        content_type = (content_type or mimetypes.guess_type(source_path)[0]
+                        or mimetypes.guess_type(urlsplit(url).path)[0] or 'application/octet-stream')
+        extension = mimetypes.guess_extension(content_type.split(';')[0].strip()) or ''
+        relative = os.path.join('objects', digest[:2], digest + extension)
+        target = os.path.join(self.root, relative)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if move:
+                os.replace(source_path, target)
+            else:
+                shutil.copyfile(source_path, target)
+        entry = {'url': url, 'object': relative, 'sha256': digest, 'size': os.path.getsize(target),
+                 'content_type': content_type, 'kind': kind}
+        with self._lock:
+            self.index[mirror_path(url)] = entry
+            self._save()
+        return entry
+
+    def lookup(self, path: str) -> dict | None:
+        return self.index.get(path)
+
+    def object_path(self, entry: dict) -> str:
+        return os.path.join(self.root, entry['object'])
+
+    def hosts(self) -> set:
+        return {urlsplit(entry['url']).netloc for entry in self.index.values()}
+
+    def catalog(self) -> dict:
+        """Mirror paths and sizes of the entries of each kind (assets have no kind and are left out)."""
+        kinds = {}
+        for path, entry in sorted(self.index.items()):
+            if entry.get('kind') and not entry.get('alias'):
+                kinds.setdefault(entry['kind'], []).append({'path': path, 'size': entry['size'],
+                                                            'content_type': entry['content_type']})
+        return kinds
+
+    def seed(self, manifest_path: str) -> dict:
+        """
+        Fill the cache from a manifest, fetching what is not cached yet.
+
+        Returns:
+            dict: Counts of entries added, already cached and failed.
+        """
+        with open(manifest_path, encoding='utf-8') as f:
+            entries = json.load(f)['entries']
+        engine = get_engine()
+        counts = {'added': 0, 'cached': 0, 'failed': 0}
+        for item in entries:
+            url, kind = item['url'], item.get('kind')
+            if 'file' in item:
+                self.put(url, item['file'], item.get('content_type'), kind)
+                counts['added'] += 1
+                continue
+            for _ in range(item.get('count', 1)):
+                if item.get('count', 1) == 1 and mirror_path(url) in self.index:
+                    counts['cached'] += 1
+                    continue
+                try:
+                    # A URL fetched several times (e.g. a random article) is not an alias of any one result
+                    page = self._fetch(engine, url, kind, alias=item.get('count', 1) == 1)
+                except DownloadError as e:
+                    print(f'Could not seed {url}: {e}')
+                    counts['failed'] += 1
+                    continue
+                counts['added'] += 1
+                if item.get('assets') and 'html' in page['content_type']:
+                    with open(self.object_path(page), 'rb') as f:
+                        html = f.read()
+                    for asset in asset_urls(html, page['url']):
+                        if mirror_path(asset) not in self.index:
+                            try:
+                                self._fetch(engine, asset, None)
+                            except DownloadError:
+                                pass
+        return counts
+
+    """ PRIVATE """
+
+    def _fetch(self, engine, url: str, kind: str | None, alias: bool = True) -> dict:
+        fd, path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        os.close(fd)
+        try:
+            result = engine.run(engine.download(url, path, resume=False))
+            entry = self.put(result.url, path, result.headers.get('content-type'), kind, move=True)
+            if alias and mirror_path(url) != mirror_path(result.url):
+                # Index the requested URL too, so seeding again finds it cached and the mirror serves it
+                with self._lock:
+                    self.index[mirror_path(url)] = dict(entry, url=url, alias=True)
+                    self._save()
+            return entry
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _save(self) -> None:
+        path = os.path.join(self.root, INDEX_FILE_NAME)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(path + '.tmp', path)
+
+
+class MirrorRequestHandler(RangeRequestHandler):
+    """Serves a ContentCache; set `cache` on a subclass (see MirrorServer)."""
+    cache = None
+
+    def send_head(self):
+        self._content_type = None
+        if self.path.split('?')[0] == CATALOG_PATH:
+            return self._send_bytes(json.dumps(self.cache.catalog()).encode('utf-8'), 'application/json')
+        entry = self.cache.lookup(self.path)
+        if entry is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        if 'html' in entry['content_type']:
+            with open(self.cache.object_path(entry), 'rb') as f:
+                return self._send_bytes(self._rewrite(f.read()), entry['content_type'])
+        # Other bodies are served from their object file, with byte ranges
+        self._content_type = entry['content_type']
+        self.path = '/' + entry['object']
+        return super().send_head()
+
+    def guess_type(self, path):
+        return self._content_type or super().guess_type(path)
+
+    """ PRIVATE """
+
+    def _send_bytes(self, body: bytes, content_type: str):
+        self._range = None
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        return io.BytesIO(body)
+
+    def _rewrite(self, body: bytes) -> bytes:
+        # Links to cached hosts point at the mirror, so a page's assets are fetched from it too
+        hosts = '|'.join(re.escape(h) for h in self.cache.hosts())
+        if not hosts:
+            return body
+        return re.sub(rf'(?:https?:)?//({hosts})/'.encode(), rb'/\1/', body)
+
+
+class MirrorServer(LocalHTTPServer):
+
+    def __init__(self, cache: ContentCache, host: str = '127.0.0.1', port: int = 0):
+        handler = type('BoundMirrorRequestHandler', (MirrorRequestHandler,), {'cache': cache})
+        super().__init__(cache.root, host, port, handler=handler)
+
+
+def configure(mirror: str | None = None) -> None:
+    """
+    Args:
+        mirror (str, optional): Mirror base URL, or a cache directory to serve on localhost.
+    """
+    settings['mirror'] = mirror
+
+
+_local_server = None
+_catalog = None
+_mirror_lock = threading.Lock()
+
+
+def mirror_url() -> str | None:
+    """Base URL of the configured mirror (starting a local one for a cache directory), or None."""
+    global _local_server
+    mirror = settings['mirror']
+    if not mirror:
+        return None
+    if re.match(r'https?://', mirror):
+        return mirror.rstrip('/') + '/'
+    with _mirror_lock:
+        if _local_server is None:
+            _local_server = MirrorServer(ContentCache(mirror)).start()
+        return _local_server.base_url
+
+
+def mirror_catalog() -> dict:
+    """The mirror's catalog, fetched once."""
+    global _catalog
+    with _mirror_lock:
+        catalog = _catalog
+    if catalog is None:
+        engine = get_engine()
+        catalog = json.loads(engine.run(engine.fetch(mirror_url() + CATALOG_PATH.lstrip('/'))).content)
+        with _mirror_lock:
+            _catalog = catalog
+    return catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed or serve a local mirror of DownloadFiles sources')
+    commands = parser.add_subparsers(dest='command', required=True)
+    seed = commands.add_parser('seed', help='Fetch the entries of a manifest into the cache')
+    seed.add_argument('manifest')
+    seed.add_argument('--cache', required=True, metavar='DIR')
+    serve = commands.add_parser('serve', help='Serve the cache over HTTP')
+    serve.add_argument('--cache', required=True, metavar='DIR')
+    serve.add_argument('--bind', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    cache = ContentCache(args.cache)
+    if args.command == 'seed':
+        counts = cache.seed(args.manifest)
+        print(f"Added {counts['added']}, already cached {counts['cached']}, failed {counts['failed']}; "
+              f"{len(cache.index)} URLs in {args.cache}")
+        get_engine().close()
+        return
+    server = MirrorServer(cache, args.bind, args.port).start()
+    print(f'Serving {len(cache.index)} URLs from {args.cache} on {server.base_url}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
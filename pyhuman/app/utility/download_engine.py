@@ -0,0 +1,425 @@
+import asyncio
+import hashlib
+import importlib.util
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+from .link_extractor import LinkExtractor
+
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_TIMEOUT = 30
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_FILE_MB = 0  # 0 = no limit
+MAX_ASSETS = 50  # Assets fetched per page, like a browser that stops at the first screenful
+MAX_PAGE_SCAN_BYTES = 4 * 1024 * 1024  # Only this much of a saved page is searched for assets
+PART_SUFFIX = '.part'
+
+# Set once from the command line via configure(); read when the engine is first created
+settings = {'max_connections': DEFAULT_MAX_CONNECTIONS, 'bandwidth_kbps': 0, 'http2': True,
+            'chunk_size': DEFAULT_CHUNK_SIZE, 'max_file_mb': DEFAULT_MAX_FILE_MB}
+
+
+class DownloadError(Exception):
+    """A request failed at the network or HTTP level."""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+class DownloadTooLarge(DownloadError):
+    """A response exceeded the size limit; the partial file has been removed."""
+
+
+class FetchResult(object):
+    __slots__ = ['url', 'status', 'headers', 'content', 'size', 'http_version', 'seconds', 'digest', 'resumed_from']
+
+    def __init__(self, url, status, headers, content, size, http_version, seconds):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.size = size
+        self.http_version = http_version
+        self.seconds = seconds
+        self.digest = None
+        self.resumed_from = 0
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace') if self.content is not None else ''
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket that shapes throughput to `rate` bytes per second.
+
+    Callers reserve bytes and sleep for the returned delay, so concurrent transfers share the
+    link the way they would on a real user's connection.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate / 4
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: int) -> float:
+        """Take `amount` bytes from the bucket; returns the seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+def asset_urls(html: bytes | str, base_url: str) -> list:
+    """Images, scripts and stylesheets a browser would request for a page, in document order."""
+    extractor = LinkExtractor(limit=0, assets=True)
+    extractor.feed(html)
+    extractor.close()
+    urls = []
+    for link in extractor.assets:
+        url = urljoin(base_url, link.strip())
+        if urlsplit(url).scheme in ('http', 'https') and url not in urls:
+            urls.append(url)
+    return urls[:MAX_ASSETS]
+
+
+class DownloadEngine(object):
+    """
+    Shared asynchronous HTTP client for download workflows.
+
+    One connection pool with keep-alive serves every workflow run in the process, so repeat
+    requests to a host skip the TCP and TLS handshakes; HTTP/2 is negotiated when httpx and h2
+    are installed. Without httpx, a pooled requests.Session on a thread pool is used. The
+    coroutines run on a private event loop thread; synchronous workflow code calls run().
+    Neither HTTP library is imported until the first request.
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS, bandwidth_kbps: float = 0,
+                 http2: bool = True, verify: bool = False, timeout: float = DEFAULT_TIMEOUT,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, max_file_bytes: int = 0):
+        """
+        Args:
+            max_connections (int): Connections kept open (and requests in flight) at most.
+            bandwidth_kbps (float): Shape total throughput to this many kilobits per second (0 = unlimited).
+            http2 (bool): Negotiate HTTP/2 where the server and installed packages allow it.
+            verify (bool): Verify TLS certificates; off by default like the workflows' previous requests.
+            timeout (float): Seconds before a connect or read is abandoned.
+            chunk_size (int): Bytes read from the network (and written to disk) at a time.
+            max_file_bytes (int): Default size limit for download() (0 = no limit).
+        """
+        self.max_connections = max_connections
+        self.chunk_size = chunk_size
+        self.max_file_bytes = max_file_bytes
+        self.bucket = TokenBucket(bandwidth_kbps * 1000 / 8) if bandwidth_kbps > 0 else None
+        self.http2 = http2 and importlib.util.find_spec('h2') is not None
+        self.verify = verify
+        self.timeout = timeout
+        self._loop = None
+        self._client = None
+        self._session = None
+        self._executor = None
+        self._errors = ()
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'bytes': 0, 'seconds_total': 0.0}
+
+    @property
+    def backend(self) -> str:
+        return 'httpx' if importlib.util.find_spec('httpx') is not None else 'requests'
+
+    def run(self, coro):
+        """Run a coroutine on the engine's loop and wait for its result (for synchronous callers)."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    async def fetch(self, url: str) -> FetchResult:
+        """GET a URL into memory."""
+        chunks = []
+        result = await self._get(url, chunks.append)
+        result.content = b''.join(chunks)
+        return result
+
+    async def stream(self, url: str, sink) -> FetchResult:
+        """GET a URL, handing the body to `sink(chunk)` as it arrives instead of keeping it."""
+        return await self._get(url, sink)
+
+    async def fetch_page(self, url: str, assets: bool = True, path: str | None = None) -> tuple:
+        """
+        GET an HTML page and then, concurrently, the assets it references.
+
+        Asset bodies are counted and discarded, as a browser's would be from our point of view.
+
+        Args:
+            url (str): Page URL.
+            assets (bool): Also fetch the page's images, scripts and stylesheets.
+            path (str|None): Stream the page to this file instead of holding it in memory.
+
+        Returns:
+            tuple: (page FetchResult, list of asset FetchResults; failed assets are left out).
+        """
+        if path is None:
+            page = await self.fetch(url)
+            html = page.text
+        else:
+            page = await self.download(url, path, resume=False)
+            html = None
+        if not assets or 'html' not in page.headers.get('content-type', ''):
+            return page, []
+        if html is None:
+            with open(path, 'rb') as f:
+                html = f.read(MAX_PAGE_SCAN_BYTES)
+        results = await asyncio.gather(*(self._get(u, lambda chunk: None) for u in asset_urls(html, page.url)),
+                                       return_exceptions=True)
+        return page, [r for r in results if isinstance(r, FetchResult)]
+
+    async def download(self, url: str, path: str, resume: bool = True, max_bytes: int | None = None,
+                       checksum: str | None = None, expected_digest: str | None = None) -> FetchResult:
+        """
+        Stream a URL to a file in `chunk_size` pieces, so memory stays bounded whatever its size.
+
+        The body is written to `path` + '.part' and renamed into place when complete. A '.part'
+        left by an interrupted download is resumed with a Range request; servers that ignore
+        Range send the whole file again and the part is overwritten. The part is removed when
+        the download fails for good (too large, a 4xx, a checksum mismatch) or `resume` is False,
+        so only pass resume=True for a destination whose name the next attempt will use again.
+
+        Args:
+            url (str): What to download.
+            path (str): Destination file.
+            resume (bool): Continue an existing partial download.
+            max_bytes (int|None): Abort with DownloadTooLarge past this size (default: the engine's limit).
+            checksum (str|None): hashlib algorithm (e.g. 'sha256') computed while writing; see result.digest.
+            expected_digest (str|None): Hex digest the file must match; implies checksum='sha256' if unset.
+
+        Returns:
+            FetchResult: With size (bytes received now), resumed_from and digest set.
+        """
+        max_bytes = self.max_file_bytes if max_bytes is None else max_bytes
+        if expected_digest and not checksum:
+            checksum = 'sha256'
+        part = path + PART_SUFFIX
+        offset = os.path.getsize(part) if resume and os.path.exists(part) else 0
+        writer = _PartWriter(part, offset, max_bytes, checksum)
+        try:
+            try:
+                result = await self._get(url, writer.write, {'Range': f'bytes={offset}-'} if offset else None,
+                                         writer.open)
+            except DownloadError as e:
+                if e.status != 416:
+                    raise
+                # The part is not a prefix the server recognizes (e.g. the file changed); start over
+                writer.close()
+                writer = _PartWriter(part, 0, max_bytes, checksum)
+                result = await self._get(url, writer.write, None, writer.open)
+        except BaseException as e:
+            writer.close()
+            # Only a resumable download interrupted mid-transfer leaves a part worth continuing
+            if not resume or not _resumable(e):
+                _remove_quietly(part)
+            raise
+        finally:
+            writer.close()
+        result.resumed_from = writer.start
+        result.digest = writer.hexdigest()
+        if expected_digest and result.digest != expected_digest.lower():
+            _remove_quietly(part)
+            raise DownloadError(f'GET {url}: {checksum} {result.digest} does not match {expected_digest}')
+        os.replace(part, path)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, backend=self.backend, http2=self.http2)
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        if self._client is not None:
+            self.run(self._client.aclose())
+        if self._session is not None:
+            self._session.close()
+            self._executor.shutdown(wait=False)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    """ PRIVATE """
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='download-engine', daemon=True).start()
+                if self.backend == 'httpx':
+                    import httpx
+
+                    self._errors = (OSError, httpx.HTTPError)
+                    self._client = httpx.AsyncClient(
+                        http2=self.http2, verify=self.verify, timeout=self.timeout, follow_redirects=True,
+                        limits=httpx.Limits(max_connections=self.max_connections,
+                                            max_keepalive_connections=self.max_connections))
+                else:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    self._errors = (OSError, requests.RequestException)
+                    self._session = requests.Session()
+                    self._session.verify = self.verify
+                    adapter = HTTPAdapter(pool_connections=self.max_connections, pool_maxsize=self.max_connections)
+                    self._session.mount('http://', adapter)
+                    self._session.mount('https://', adapter)
+                    self._executor = ThreadPoolExecutor(self.max_connections, thread_name_prefix='download')
+            return self._loop
+
+    async def _get(self, url: str, sink, headers: dict | None = None, on_response=None) -> FetchResult:
+        # on_response(status, headers) is called before the body is read and may raise to abort
+        start = time.monotonic()
+        try:
+            if self._client is not None:
+                result = await self._get_httpx(url, sink, headers, on_response)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._get_requests, url, sink, headers, on_response)
+        except DownloadError:
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        except self._errors as e:
+            with self._lock:
+                self._stats['errors'] += 1
+            raise DownloadError(f'GET {url} failed: {e}') from e
+        result.seconds = time.monotonic() - start
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['bytes'] += result.size
+            self._stats['seconds_total'] += result.seconds
+        return result
+
+    async def _get_httpx(self, url: str, sink, headers, on_response) -> FetchResult:
+        size = 0
+        async with self._client.stream('GET', url, headers=headers) as response:
+            _check_status(url, response.status_code)
+            if on_response is not None:
+                on_response(response.status_code, response.headers)
+            async for chunk in response.aiter_bytes(self.chunk_size):
+                if self.bucket is not None:
+                    await asyncio.sleep(self.bucket.reserve(len(chunk)))
+                sink(chunk)
+                size += len(chunk)
+            return FetchResult(str(response.url), response.status_code, response.headers, None, size,
+                               response.http_version, 0.0)
+
+    def _get_requests(self, url: str, sink, headers, on_response) -> FetchResult:
+        size = 0
+        with self._session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            _check_status(url, response.status_code)
+            headers = {k.lower(): v for k, v in response.headers.items()}
+            if on_response is not None:
+                on_response(response.status_code, headers)
+            for chunk in response.iter_content(self.chunk_size):
+                if self.bucket is not None:
+                    time.sleep(self.bucket.reserve(len(chunk)))
+                sink(chunk)
+                size += len(chunk)
+            return FetchResult(response.url, response.status_code, headers, None, size, 'HTTP/1.1', 0.0)
+
+
+class _PartWriter(object):
+    """Writes a download's body to its .part file, enforcing the size limit and hashing as it goes."""
+
+    def __init__(self, path: str, offset: int, max_bytes: int, checksum: str | None):
+        self.path = path
+        self.offset = offset
+        self.max_bytes = max_bytes
+        self.start = 0
+        self.total = 0
+        self._hash = hashlib.new(checksum) if checksum else None
+        self._file = None
+
+    def open(self, status: int, headers) -> None:
+        # A 206 continues the part; anything else is the whole file from the beginning
+        self.start = self.offset if status == 206 else 0
+        length = headers.get('content-length')
+        if self.max_bytes and length is not None and self.start + int(length) > self.max_bytes:
+            raise DownloadTooLarge(f'{self.start + int(length)} bytes exceeds the {self.max_bytes} byte limit')
+        self._file = open(self.path, 'r+b' if self.start else 'wb')
+        if self._hash is not None and self.start:
+            while self._file.tell() < self.start:
+                chunk = self._file.read(min(DEFAULT_CHUNK_SIZE, self.start - self._file.tell()))
+                if not chunk:
+                    break
+                self._hash.update(chunk)
+        self._file.seek(self.start)
+        self._file.truncate()
+        self.total = self.start
+
+    def write(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        if self.max_bytes and self.total > self.max_bytes:
+            raise DownloadTooLarge(f'Download exceeds the {self.max_bytes} byte limit')
+        if self._hash is not None:
+            self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def hexdigest(self) -> str | None:
+        return self._hash.hexdigest() if self._hash is not None else None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _check_status(url: str, status: int) -> None:
+    if status >= 400:
+        raise DownloadError(f'GET {url} returned HTTP {status}', status=status)
+
+
+def _resumable(error: BaseException) -> bool:
+    # Connection failures, server errors and cancellation may succeed when the download is retried
+    if isinstance(error, DownloadTooLarge):
+        return False
+    if isinstance(error, DownloadError):
+        return error.status is None or error.status >= 500
+    return True
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def configure(max_connections: int = DEFAULT_MAX_CONNECTIONS, bandwidth_kbps: float = 0, http2: bool = True,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, max_file_mb: float = DEFAULT_MAX_FILE_MB) -> None:
+    settings['max_connections'] = max_connections
+    settings['bandwidth_kbps'] = bandwidth_kbps
+    settings['http2'] = http2
+    settings['chunk_size'] = chunk_size
+    settings['max_file_mb'] = max_file_mb
+
+
+def get_engine() -> DownloadEngine:
+    """The process-wide engine, created from `settings` on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = DownloadEngine(settings['max_connections'], settings['bandwidth_kbps'], settings['http2'],
+                                     chunk_size=settings['chunk_size'],
+                                     max_file_bytes=int(settings['max_file_mb'] * 1024 * 1024))
+        return _engine
+
+
+def engine_stats() -> dict | None:
+    """Counters of the process-wide engine, or None if nothing has been downloaded yet."""
+    return None if _engine is None else _engine.stats()
@@ -0,0 +1,148 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from typing import Callable
+
+CACHE_FILE_NAME = 'chromedriver-cache.json'
+CHROME_BINARIES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+MAC_CHROME_BINARY = '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
+WINDOWS_CHROME_BINARIES = [
+    r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+    r'C:\Program Files (x86)\Google\Chrome\Application\chrome.exe',
+]
+
+_lock = threading.Lock()
+_resolved = {}
+
+# Set once from the command line via configure()
+settings = {'chromedriver': None, 'offline': False}
+
+
+def configure(chromedriver: str | None = None, offline: bool = False) -> None:
+    """
+    Set process-wide chromedriver resolution options.
+
+    Args:
+        chromedriver (str, optional): Explicit chromedriver path, bypassing all lookup.
+        offline (bool): Never contact the network; resolve only from the local driver cache.
+    """
+    settings['chromedriver'] = chromedriver
+    settings['offline'] = offline
+
+
+def find_chrome_binary() -> str | None:
+    """Locate the installed Chrome/Chromium executable without launching it."""
+    if sys.platform == 'darwin' and os.path.exists(MAC_CHROME_BINARY):
+        return MAC_CHROME_BINARY
+    if sys.platform.startswith('win'):
+        for path in WINDOWS_CHROME_BINARIES:
+            if os.path.exists(path):
+                return path
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return os.path.realpath(path)
+    return None
+
+
+def chrome_version(binary: str) -> str | None:
+    """Return the full Chrome version string (e.g. '124.0.6367.91') by asking the binary."""
+    try:
+        out = subprocess.run([binary, '--version'], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r'(\d+\.\d+\.\d+\.\d+)', out)
+    return match.group(1) if match else None
+
+
+def _read_cache(path: str) -> dict:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(path: str, cache: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, path)
+
+
+def resolve_chromedriver(cache_dir: str, install: Callable[[], str], override: str | None = None,
+                         offline: bool = False) -> str:
+    """
+    Resolve the chromedriver path, consulting webdriver-manager only when the cache misses.
+
+    The cache is a JSON file keyed by Chrome major version. The Chrome binary's path, size and
+    mtime are remembered too, so an unchanged Chrome resolves with a couple of stat() calls and
+    no subprocess. Once seeded, nothing here touches the network.
+
+    Args:
+        cache_dir (str): Directory holding the cache file.
+        install (callable): Fallback that downloads/locates a driver (ChromeDriverManager().install).
+        override (str, optional): Explicit chromedriver path; always wins.
+        offline (bool): Never call `install`; use the best cached driver or fail.
+
+    Returns:
+        str: Path to a chromedriver executable.
+    """
+    if override:
+        if not os.path.isfile(override):
+            raise FileNotFoundError(f'chromedriver override does not exist: {override}')
+        return override
+
+    with _lock:
+        if cache_dir in _resolved:
+            return _resolved[cache_dir]
+
+        cache_path = os.path.join(cache_dir, CACHE_FILE_NAME)
+        cache = _read_cache(cache_path)
+        before = json.dumps(cache, sort_keys=True)
+        drivers = cache.setdefault('drivers', {})
+
+        binary = find_chrome_binary()
+        fingerprint = None
+        if binary:
+            st = os.stat(binary)
+            fingerprint = [binary, st.st_size, int(st.st_mtime)]
+
+        major = None
+        if fingerprint and cache.get('chrome') == fingerprint:
+            major = cache.get('chrome_major')
+        elif binary:
+            version = chrome_version(binary)
+            major = version.split('.')[0] if version else None
+
+        path = drivers.get(major) if major else None
+        if path and not os.path.isfile(path):
+            path = None
+
+        if path is None and offline:
+            # Fall back to the newest driver we have on disk
+            usable = [(int(k), v) for k, v in drivers.items() if k.isdigit() and os.path.isfile(v)]
+            if not usable:
+                raise RuntimeError('Offline mode: no cached chromedriver found; pass --chromedriver')
+            path = max(usable)[1]
+            print(f'... Offline: using cached chromedriver {path} for Chrome {major or "unknown"}')
+        elif path is None:
+            path = install()
+            if major:
+                drivers[major] = path
+
+        cache['chrome'] = fingerprint
+        cache['chrome_major'] = major
+        if json.dumps(cache, sort_keys=True) != before:
+            try:
+                _write_cache(cache_path, cache)
+            except OSError as e:
+                print(f'Could not write chromedriver cache {cache_path}: {e}')
+
+        _resolved[cache_dir] = path
+        return path
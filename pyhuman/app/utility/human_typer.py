@@ -6,7 +6,87 @@ import threading
 import re
 import sys
 import random
-from typing import Callable
+from collections import namedtuple
+from typing import Callable, List
+
+from .keystroke_dynamics import TYPO_NOTICE_KEYS, KeystrokeModel, current_profile, get_profiles
+from .output_capture import OutputCapture
+from .rng import current_stream
+
+READ_SIZE = 64 * 1024
+# Bytes before the unscanned part of the buffer that are searched again, so a prompt split across
+# reads is still found; must exceed the longest prompt (user, host and working directory)
+PROMPT_OVERLAP = 4096
+# Seconds allowed for the prompt to come back after an interrupted command is sent Ctrl-C, and
+# how often Ctrl-C is repeated meanwhile (one arriving while bash runs a builtin can be lost)
+INTERRUPT_GRACE = 10.0
+INTERRUPT_REPEAT = 2.0
+
+
+# Keystrokes due within this many seconds of each other are written together
+TYPING_TICK = 0.01
+TYPO_RATE = 0.05
+
+QWERTY_NEIGHBORS = {
+    'a': 'qwsz', 'b': 'vghn', 'c': 'xdfv', 'd': 'serfcx', 'e': 'wsdr',
+    'f': 'drtgvc', 'g': 'ftyhbv', 'h': 'gyujnb', 'i': 'ujko', 'j': 'huikmn',
+    'k': 'jiolm', 'l': 'kop', 'm': 'njk', 'n': 'bhjm', 'o': 'iklp',
+    'p': 'ol', 'q': 'wa', 'r': 'edft', 's': 'awedxz', 't': 'rfgy',
+    'u': 'yhji', 'v': 'cfgb', 'w': 'qase', 'x': 'zsdc', 'y': 'tugh',
+    'z': 'asx', '1': '2q', '2': '13w', '3': '24e', '4': '35r', '5': '46t',
+    '6': '57y', '7': '68u', '8': '79i', '9': '80o', '0': '9p',
+    '-': '0p', '=': '-',
+    ' ': ' '
+}
+
+# One write to the terminal: `at` seconds after typing starts, `data` is sent and `echo` shown
+Keystroke = namedtuple('Keystroke', ['at', 'data', 'echo'])
+
+
+def plan_keystrokes(command: str, rng, latency: Callable[[str, str], float],
+                    typo_rate: float = TYPO_RATE) -> List[Keystroke]:
+    """
+    Work out up front how a person would type `command`, including typos they notice and
+    backspace over, ending with enter. `latency(previous, next)` gives the seconds between two
+    keys. Needs no terminal, so the typing model can be tested alone.
+    """
+    plan = []
+    t = 0.0
+    previous = ''
+    for i, char in enumerate(command):
+        if rng.random() < typo_rate:
+            typo_count = rng.choice([1, 3])
+
+            # extra pause for understanding your typo before fixing it.
+            t += TYPO_NOTICE_KEYS * latency(previous, char)
+            for _ in range(typo_count):
+                fallback = rng.choice('abcdefghijklmnopqrstuvwxyz')
+                typo = rng.choice(QWERTY_NEIGHBORS.get(char.lower(), fallback))
+                plan.append(Keystroke(t, typo.encode(), typo))
+            for _ in range(typo_count):
+                plan.append(Keystroke(t, b"\x7f", '\b \b'))
+                t += latency('\x7f', '\x7f')
+
+        # now type the correct character
+        plan.append(Keystroke(t, char.encode(), char))
+        t += latency(char, command[i + 1] if i + 1 < len(command) else '\n')
+        previous = char
+    plan.append(Keystroke(t, b'\n', '\n'))
+    return plan
+
+
+def typing_time(plan: List[Keystroke]) -> float:
+    """Seconds from the first keystroke of a plan to pressing enter."""
+    return plan[-1].at if plan else 0.0
+
+
+class CommandInterrupted(Exception):
+    """A command was stopped with Ctrl-C before it finished; `output` is what it printed."""
+
+    def __init__(self, reason: str, output: str):
+        super().__init__(reason)
+        self.reason = reason
+        self.output = output
 
 
 class HumanTyperShell:
@@ -17,29 +97,47 @@ class HumanTyperShell:
                  keystroke_delay_fn: Callable[[], float] = None,
                  post_prompt_delay: float = 1.0,
                  prompt_timeout: float = 10.0,
-                 verbose: bool = False):
+                 verbose: bool = False,
+                 output_head_bytes: int = 0,
+                 output_tail_bytes: int = 0,
+                 transcript_dir: str = None,
+                 typing_profile: str = None):
         """
         :param shell: Shell binary to launch.
         :param prompt_regex: Regex to detect shell prompt.
         :param live_echo: If True, prints shell output and typed characters in real time.
-        :param keystroke_delay_fn: Function returning float delay per keystroke (in seconds).
+        :param keystroke_delay_fn: Function returning float delay per keystroke (in seconds), replacing the
+                                   keystroke dynamics model.
         :param post_prompt_delay: Additional wait time after prompt match to gather more output.
         :param prompt_timeout: how long to wait for a prompt.  may need to crank this up if doing something like long link times
         :param verbose: If True, enables debug output.
+        :param output_head_bytes: Bytes kept from the start of each command's output (0 with output_tail_bytes 0 = keep all).
+        :param output_tail_bytes: Bytes kept from the end of each command's output.
+        :param transcript_dir: If set, the full output of each command is also written here, gzipped.
+        :param typing_profile: Keystroke dynamics profile to type with; by default the current persona's.
         """
         self.shell = shell
         self.live_echo = live_echo
         self.verbose = verbose
         self.prompt_regex = re.compile(prompt_regex)
-        self.keystroke_delay_fn = keystroke_delay_fn or (
-            lambda: random.uniform(0.05, 0.35))
+        self.keystroke_delay_fn = keystroke_delay_fn
+        self.keystroke_model = None if keystroke_delay_fn else KeystrokeModel(
+            get_profiles()[typing_profile] if typing_profile else current_profile())
         self.post_prompt_delay = post_prompt_delay
         self.child_pid, self.master_fd = pty.fork()
         self._lock = threading.Lock()
+        # Notified by the reader whenever output arrives or the shell goes away
+        self._output_arrived = threading.Condition(self._lock)
         self._buffer = bytearray()
+        self._eof = False
         self._stop = False
         self._suppress_output = False
         self.prompt_timeout = prompt_timeout
+        self.output_head_bytes = output_head_bytes
+        self.output_tail_bytes = output_tail_bytes
+        self.transcript_dir = transcript_dir
+        self.last_capture = None
+        self._commands_typed = 0
 
         if self.child_pid == 0:
             os.execvp(self.shell, [self.shell])
@@ -54,111 +152,167 @@ class HumanTyperShell:
                     "Shell did not produce prompt in time. Is the shell hanging or producing unexpected output?")
 
     def _read_output(self):
-        while not self._stop:
-            r, _, _ = select.select([self.master_fd], [], [], 0.1)
-            if self.master_fd in r:
-                try:
-                    data = os.read(self.master_fd, 1024)
+        try:
+            while not self._stop:
+                r, _, _ = select.select([self.master_fd], [], [], 0.1)
+                if self.master_fd in r:
+                    try:
+                        data = os.read(self.master_fd, READ_SIZE)
+                    except OSError:
+                        break
                     if not data:
                         break
-                    with self._lock:
+                    with self._output_arrived:
                         self._buffer += data
+                        self._output_arrived.notify_all()
                     if self.live_echo and not self._suppress_output:
                         sys.stdout.buffer.write(data)
                         sys.stdout.flush()
-                except OSError:
-                    break
+        finally:
+            with self._output_arrived:
+                self._eof = True
+                self._output_arrived.notify_all()
+
+    def _wait_for_prompt(self, timeout: float = 10.0, capture: OutputCapture = None, deadline: float = None,
+                         interrupt_when_idle: bool = False, should_interrupt: Callable[[], str] = None) -> str:
+        """
+        Wait until the prompt appears, giving up after `timeout` seconds without new output.
 
-    def _wait_for_prompt(self, timeout: float = 10.0) -> str:
+        Woken by the reader as output arrives; only the new bytes (plus PROMPT_OVERLAP) are searched.
+        New output is passed to `capture` as it arrives and dropped from the buffer once searched,
+        so the buffer stays small.
+
+        The command is interrupted with Ctrl-C, and CommandInterrupted raised once the prompt is
+        back, when the monotonic `deadline` passes, when `should_interrupt()` returns a reason, or
+        (with `interrupt_when_idle`) when it is idle for `timeout`; otherwise idling raises TimeoutError.
+        """
         if self.verbose:
             print("[DEBUG] Waiting for prompt...")
-        start = time.time()
-        last_buffer_size = 0
-        last_change = start
-        while time.time() - last_change < timeout:
-            time.sleep(0.05)
-            with self._lock:
-                match = self.prompt_regex.search(self._buffer)
+        capture = capture or OutputCapture(self.output_head_bytes, self.output_tail_bytes)
+        scanned = 0
+        captured = 0
+        interrupted = None
+        last_change = time.monotonic()
+        while True:
+            # Only the search and copying new bytes out hold the lock: capture.write() runs the
+            # listeners and the gzip transcript, and the reader must not wait for them
+            with self._output_arrived:
+                match = self.prompt_regex.search(self._buffer, max(scanned - PROMPT_OVERLAP, 0))
                 if match:
                     end = match.end()
-                    if self.verbose:
-                        print("[DEBUG] Prompt matched.")
                     break
-                if len(self._buffer) != last_buffer_size:
-                    last_change = time.time()
-                    last_buffer_size = len(self._buffer)
-        else:
-            raise TimeoutError("Timed out waiting for prompt.")
+                new_output = b''
+                if len(self._buffer) != scanned:
+                    new_output = bytes(self._buffer[captured:])
+                    if len(self._buffer) > 2 * PROMPT_OVERLAP:
+                        # Everything but the overlap window has been searched and captured
+                        del self._buffer[:len(self._buffer) - PROMPT_OVERLAP]
+                    scanned = captured = len(self._buffer)
+                eof = self._eof
+            if new_output:
+                last_change = time.monotonic()
+                capture.write(new_output)
+            now = time.monotonic()
+            if interrupted is None:
+                if should_interrupt is not None:
+                    interrupted = should_interrupt()
+                if not interrupted and deadline is not None and now >= deadline:
+                    interrupted = "timed out"
+                if not interrupted and interrupt_when_idle and now - last_change >= timeout:
+                    interrupted = f"no output for {timeout:.0f}s"
+                if interrupted:
+                    if self.verbose:
+                        print(f"[DEBUG] Interrupting command: {interrupted}")
+                    os.write(self.master_fd, b"\x03")
+                    timeout, last_change, last_interrupt = INTERRUPT_GRACE, now, now
+            elif now - last_interrupt >= INTERRUPT_REPEAT:
+                os.write(self.master_fd, b"\x03")
+                last_interrupt = now
+            remaining = timeout - (now - last_change)
+            if deadline is not None and interrupted is None:
+                remaining = min(remaining, deadline - now)
+            if interrupted:
+                remaining = min(remaining, INTERRUPT_REPEAT)
+            if remaining <= 0 or eof:
+                capture.close()
+                raise TimeoutError("Timed out waiting for prompt.")
+            with self._output_arrived:
+                # Output that arrived while capturing is handled without waiting
+                if len(self._buffer) == scanned and not self._eof:
+                    self._output_arrived.wait(remaining)
 
+        if self.verbose:
+            print("[DEBUG] Prompt matched.")
         time.sleep(self.post_prompt_delay)
         with self._lock:
-            output = self._buffer[:end]
-            self._buffer = self._buffer[end:]
-            return output.decode(errors='ignore')
-
-    def type_command(self, command: str) -> str:
-        qwerty_neighbors = {
-            'a': 'qwsz', 'b': 'vghn', 'c': 'xdfv', 'd': 'serfcx', 'e': 'wsdr',
-            'f': 'drtgvc', 'g': 'ftyhbv', 'h': 'gyujnb', 'i': 'ujko', 'j': 'huikmn',
-            'k': 'jiolm', 'l': 'kop', 'm': 'njk', 'n': 'bhjm', 'o': 'iklp',
-            'p': 'ol', 'q': 'wa', 'r': 'edft', 's': 'awedxz', 't': 'rfgy',
-            'u': 'yhji', 'v': 'cfgb', 'w': 'qase', 'x': 'zsdc', 'y': 'tugh',
-            'z': 'asx', '1': '2q', '2': '13w', '3': '24e', '4': '35r', '5': '46t',
-            '6': '57y', '7': '68u', '8': '79i', '9': '80o', '0': '9p',
-            '-': '0p', '=': '-',
-            ' ': ' '
-        }
+            rest = bytes(self._buffer[captured:end])
+            del self._buffer[:end]
+        capture.write(rest)
+        capture.close()
+        self.last_capture = capture
+        if interrupted:
+            raise CommandInterrupted(interrupted, capture.text())
+        return capture.text()
+
+    def type_command(self, command: str, listeners: tuple = (), timeout: float = None,
+                     inactivity_timeout: float = None, should_interrupt: Callable[[], str] = None) -> str:
+        """
+        Type `command` like a person would, press enter and wait for the prompt.
 
+        :param listeners: Callables given the command's output (bytes) chunk by chunk as it arrives.
+        :param timeout: Interrupt the command if it runs longer than this many seconds.
+        :param inactivity_timeout: Interrupt the command after this many seconds without output
+                                   (instead of raising TimeoutError after prompt_timeout).
+        :param should_interrupt: Called as output arrives; returning a reason interrupts the command.
+        :return: The output, limited to output_head_bytes + output_tail_bytes if those are set.
+        :raises CommandInterrupted: If the command was interrupted for one of the reasons above.
+        """
         with self._lock:
             self._buffer.clear()
         self._suppress_output = True
+        rng = current_stream('typer')
+        if self.keystroke_model is not None:
+            plan = plan_keystrokes(command, rng, lambda previous, char: self.keystroke_model.latency(previous, char, rng),
+                                   self.keystroke_model.typo_rate)
+        else:
+            plan = plan_keystrokes(command, rng, lambda previous, char: self.keystroke_delay_fn())
+        self._type_plan(plan)
+        self._suppress_output = False
+        self._commands_typed += 1
+        spill_path = None
+        if self.transcript_dir:
+            os.makedirs(self.transcript_dir, exist_ok=True)
+            slug = re.sub(r'[^a-zA-Z0-9]+', '_', command).strip('_')[:32]
+            spill_path = os.path.join(self.transcript_dir, f"{self._commands_typed:03d}_{slug}.log.gz")
+        capture = OutputCapture(self.output_head_bytes, self.output_tail_bytes, spill_path, listeners)
+        deadline = time.monotonic() + timeout if timeout else None
+        return self._wait_for_prompt(inactivity_timeout or self.prompt_timeout, capture, deadline,
+                                     interrupt_when_idle=bool(inactivity_timeout), should_interrupt=should_interrupt)
 
-        i = 0
-        while i < len(command):
-            typo_happened = False
-
-            # 3% chance to inject a typo
-            if random.random() < 0.05:
-                typo_count = random.choice([1, 3])
-
-                # extra sleep for understanding your typo before fixing it.
-                time.sleep(4*self.keystroke_delay_fn())
-                for _ in range(typo_count):
-                    char = command[i]
-                    typo_choices = qwerty_neighbors.get(
-                        char.lower(), random.choice('abcdefghijklmnopqrstuvwxyz'))
-
-                    typo = random.choice(typo_choices)
-                    os.write(self.master_fd, typo.encode())
-                    if self.live_echo:
-                        sys.stdout.write(typo)
-                        sys.stdout.flush()
-                    # time.sleep(self.keystroke_delay_fn())
-
-                for _ in range(typo_count):
-                    # simulate backspace
-                    os.write(self.master_fd, b"\x7f")
-                    if self.live_echo:
-                        sys.stdout.write('\b \b')
-                        sys.stdout.flush()
-                    time.sleep(self.keystroke_delay_fn())
-                    typo_happened = True
+    def expected_typing_time(self, command: str) -> float:
+        """
+        Mean seconds type_command() spends typing `command` (not running it), for scheduling;
+        None when a custom keystroke_delay_fn is used.
+        """
+        return self.keystroke_model.expected_time(command) if self.keystroke_model is not None else None
 
-            # now type the correct character
-            char = command[i]
-            os.write(self.master_fd, char.encode())
+    def _type_plan(self, plan: List[Keystroke]) -> None:
+        # One timer: sleep until the next keystroke is due, then write everything due within a tick
+        start = time.monotonic()
+        i = 0
+        while i < len(plan):
+            wait = start + plan[i].at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            due = time.monotonic() - start + TYPING_TICK
+            j = i + 1
+            while j < len(plan) and plan[j].at <= due:
+                j += 1
+            os.write(self.master_fd, b''.join(k.data for k in plan[i:j]))
             if self.live_echo:
-                sys.stdout.write(char)
+                sys.stdout.write(''.join(k.echo for k in plan[i:j]))
                 sys.stdout.flush()
-            time.sleep(self.keystroke_delay_fn())
-            i += 1
-
-        os.write(self.master_fd, b'\n')
-        if self.live_echo:
-            sys.stdout.write('\n')
-            sys.stdout.flush()
-        self._suppress_output = False
-        return self._wait_for_prompt(self.prompt_timeout)
+            i = j
 
     def close(self):
         self._stop = True
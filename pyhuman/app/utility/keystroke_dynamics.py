@@ -0,0 +1,177 @@
+import math
+import threading
+from collections import namedtuple
+
+from .persona import current_persona
+
+# Columns of a profile table, one profile per line:
+#   key_ms       median time between two keys on the same row with alternating hands
+#   spread       sigma of the log-normal jitter on every interval
+#   same_finger, same_hand, alternate
+#                interval multipliers for the finger/hand transition between two keys
+#   shift        multiplier for keys needing Shift (capitals, most punctuation)
+#   typo         chance per character of a typo that is noticed and backspaced over
+#   burst        mean keys typed between pauses (pauses are likelier at word boundaries)
+#   pause_ms     median pause length
+#   fatigue      slowdown reached after FATIGUE_KEYSTROKES keys in one shell session
+#   scale        factor applied to every interval; "fast" types average's keystrokes in 1/50 of the time
+PROFILE_TABLE = """
+# name          key_ms spread same_finger same_hand alternate shift typo burst pause_ms fatigue scale
+hunt_and_peck   320    0.45   1.30        1.10      1.00      1.60  0.08 3     1200     0.30    1.0
+average         180    0.35   1.35        1.15      0.90      1.40  0.05 6     700      0.20    1.0
+touch_typist    110    0.25   1.40        1.20      0.80      1.25  0.02 10    450      0.10    1.0
+fast            180    0.35   1.35        1.15      0.90      1.40  0.05 6     700      0.20    0.02
+"""
+
+TypingProfile = namedtuple('TypingProfile', ['name', 'key_ms', 'spread', 'same_finger', 'same_hand', 'alternate',
+                                             'shift', 'typo', 'burst', 'pause_ms', 'fatigue', 'scale'])
+
+DEFAULT_PROFILE = 'average'
+# Profiles drawn for personas when none is configured, with their weights
+PERSONA_PROFILE_WEIGHTS = {'hunt_and_peck': 1, 'average': 3, 'touch_typist': 2}
+FATIGUE_KEYSTROKES = 2000
+TYPO_NOTICE_KEYS = 4  # noticing a typo takes this many key intervals
+WORD_BOUNDARIES = ' /-.|;,=&'
+
+# Finger (0-3 left pinky to index, 4-7 right index to pinky) of each unshifted key; space is a thumb
+FINGERS = {key: finger for finger, keys in enumerate(['`1qaz', '2wsx', '3edc', '45rtfgvb', '67yhujnm',
+                                                       '8ik,', '9ol.', "0-=p[]\\;'/"]) for key in keys}
+SHIFTED = dict(zip('~!@#$%^&*()_+{}|:"<>?', "`1234567890-=[]\\;',./"))
+
+settings = {'profile': None, 'profiles': None}
+_lock = threading.Lock()
+_persona_profiles = {}
+
+
+def parse_profiles(table: str) -> dict:
+    """Read a profile table (see PROFILE_TABLE) into {name: TypingProfile}."""
+    profiles = {}
+    for line in table.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        name, *values = line.split()
+        if len(values) != len(TypingProfile._fields) - 1:
+            raise ValueError(f'Typing profile {name!r} needs {len(TypingProfile._fields) - 1} values')
+        profiles[name] = TypingProfile(name, *(float(v) for v in values))
+    return profiles
+
+
+def configure(profile: str | None = None, table_path: str | None = None) -> None:
+    """
+    Args:
+        profile (str, optional): Profile every shell types with; by default each persona draws one.
+        table_path (str, optional): File with a profile table replacing PROFILE_TABLE.
+    """
+    if table_path:
+        with open(table_path, encoding='utf-8') as f:
+            settings['profiles'] = parse_profiles(f.read())
+    profiles = settings['profiles'] or parse_profiles(PROFILE_TABLE)
+    if profile is not None and profile not in profiles:
+        raise ValueError(f"Unknown typing profile {profile!r}; choose from {', '.join(profiles)}")
+    settings['profile'] = profile
+
+
+def get_profiles() -> dict:
+    if settings['profiles'] is None:
+        settings['profiles'] = parse_profiles(PROFILE_TABLE)
+    return settings['profiles']
+
+
+def current_profile() -> TypingProfile:
+    """The configured profile, else the calling persona's (drawn once from its own stream), else the default."""
+    profiles = get_profiles()
+    if settings['profile']:
+        return profiles[settings['profile']]
+    persona = current_persona()
+    if persona is None:
+        return profiles.get(DEFAULT_PROFILE) or next(iter(profiles.values()))
+    with _lock:
+        if persona.name not in _persona_profiles:
+            names = [n for n in PERSONA_PROFILE_WEIGHTS if n in profiles] or list(profiles)
+            weights = [PERSONA_PROFILE_WEIGHTS.get(n, 1) for n in names]
+            _persona_profiles[persona.name] = persona.streams.stream('typing-profile').choices(names, weights)[0]
+        return profiles[_persona_profiles[persona.name]]
+
+
+def _key(char: str) -> tuple:
+    """(base key, needs shift) for a character."""
+    if char.isupper():
+        return char.lower(), True
+    if char in SHIFTED:
+        return SHIFTED[char], True
+    return char, False
+
+
+class KeystrokeModel(object):
+    """
+    Intervals between keystrokes for one typing session (a shell).
+
+    An interval depends on the pair of keys (same finger, same hand or alternating hands, and
+    Shift), is jittered log-normally, is sometimes followed by a pause (bursts of typing,
+    likelier at word boundaries) and slowly stretches with the number of keys typed (fatigue).
+    """
+
+    def __init__(self, profile: TypingProfile):
+        self.profile = profile
+        self.keystrokes = 0
+
+    @property
+    def typo_rate(self) -> float:
+        return self.profile.typo
+
+    def transition(self, previous: str, char: str) -> float:
+        """Deterministic interval multiplier for typing `char` after `previous`."""
+        p = self.profile
+        key, shifted = _key(char)
+        previous_key = _key(previous)[0] if previous else ''
+        factor = p.shift if shifted else 1.0
+        finger, previous_finger = FINGERS.get(key), FINGERS.get(previous_key)
+        if finger is None or previous_finger is None:
+            return factor  # space, enter, backspace and the first key
+        if finger == previous_finger:
+            return factor * p.same_finger
+        if (finger < 4) == (previous_finger < 4):
+            return factor * p.same_hand
+        return factor * p.alternate
+
+    def fatigue(self) -> float:
+        return 1.0 + self.profile.fatigue * min(self.keystrokes / FATIGUE_KEYSTROKES, 1.0)
+
+    def pause_chance(self, previous: str) -> float:
+        burst = max(self.profile.burst, 1.0)
+        return min(2.0 / burst, 1.0) if previous and previous in WORD_BOUNDARIES else 0.5 / burst
+
+    def latency(self, previous: str, char: str, rng) -> float:
+        """Seconds between typing `previous` and `char`."""
+        p = self.profile
+        self.keystrokes += 1
+        ms = p.key_ms * self.transition(previous, char) * rng.lognormvariate(0, p.spread) * self.fatigue()
+        if rng.random() < self.pause_chance(previous):
+            ms += p.pause_ms * rng.lognormvariate(0, p.spread)
+        return ms * p.scale / 1000
+
+    def mean_latency(self, previous: str, char: str) -> float:
+        """Mean of latency() in milliseconds, before scaling and fatigue."""
+        p = self.profile
+        jitter = math.exp(p.spread ** 2 / 2)  # mean of the log-normal
+        return (p.key_ms * self.transition(previous, char) + self.pause_chance(previous) * p.pause_ms) * jitter
+
+    def expected_time(self, command: str) -> float:
+        """Mean seconds to type `command` and press enter, including typos and pauses, at the current fatigue."""
+        p = self.profile
+        backspace = self.mean_latency('\x7f', '\x7f')
+        total = 0.0
+        previous = ''
+        for i, char in enumerate(command):
+            following = command[i + 1] if i + 1 < len(command) else '\n'
+            # A typo costs a pause to notice it, then 1 or 3 backspaces (2 on average)
+            typo = TYPO_NOTICE_KEYS * self.mean_latency(previous, char) + 2 * backspace
+            total += p.typo * typo + self.mean_latency(char, following)
+            previous = char
+        return total * self.fatigue() * p.scale / 1000
+
+
+def expected_typing_time(command: str, profile: TypingProfile | None = None) -> float:
+    """Mean seconds the calling persona (or `profile`) takes to type `command`, for planning."""
+    return KeystrokeModel(profile or current_profile()).expected_time(command)
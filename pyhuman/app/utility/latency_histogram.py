@@ -0,0 +1,168 @@
+import math
+import threading
+import time
+
+from .metrics_sink import HOSTNAME, PID, get_pipeline
+
+SUB_BUCKET_BITS = 7  # 64 buckets per power of two; reported midpoints are within 1% of the recorded value
+WORKFLOW_STEP = '(workflow)'  # step name used for whole-workflow durations
+DEFAULT_SUMMARY_INTERVAL = 60
+SUMMARY_PERCENTILES = (50, 90, 99)
+
+
+class LatencyHistogram(object):
+    """
+    Sparse HDR-style log-linear histogram of durations, recorded in microseconds.
+
+    Values below 2**SUB_BUCKET_BITS us are counted exactly; above that each power-of-two
+    range is split into 2**(SUB_BUCKET_BITS - 1) equal buckets, each at most 1/64 (about 1.6%)
+    of its value wide. Percentiles report a bucket's midpoint, so they are within 1% of a
+    recorded value, while memory only grows with the number of distinct buckets hit.
+    """
+
+    __slots__ = ['counts', 'count', 'total', 'min', 'max']
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @staticmethod
+    def bucket_of(micros: int) -> tuple:
+        shift = max(micros.bit_length() - SUB_BUCKET_BITS, 0)
+        return shift, micros >> shift
+
+    def record(self, seconds: float) -> None:
+        micros = max(int(seconds * 1e6), 0)
+        key = self.bucket_of(micros)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        for key, n in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        """Return the duration in seconds at percentile `p` (0-100), or 0.0 when empty."""
+        if self.count == 0:
+            return 0.0
+        target = max(math.ceil(p / 100.0 * self.count), 1)
+        seen = 0
+        for shift, sub in sorted(self.counts, key=lambda k: k[1] << k[0]):
+            seen += self.counts[(shift, sub)]
+            if seen >= target:
+                # Middle of the bucket, clamped to what was actually observed
+                middle = ((sub << shift) + ((1 << shift) - 1) / 2) / 1e6
+                return min(max(middle, self.min), self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds: tuple) -> list:
+        """
+        Recordings of at most each of the ascending `bounds` (seconds), as Prometheus buckets
+        count them. A bucket is counted whole once its lowest value is within a bound, so the
+        counts are exact to within one bucket's width.
+        """
+        buckets = sorted(((sub << shift), n) for (shift, sub), n in self.counts.items())
+        counts = []
+        seen = 0
+        i = 0
+        for bound in bounds:
+            limit = bound * 1e6
+            while i < len(buckets) and buckets[i][0] <= limit:
+                seen += buckets[i][1]
+                i += 1
+            counts.append(seen)
+        return counts
+
+    def summary(self) -> dict:
+        result = {'count': self.count,
+                  'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+                  'min_ms': round(self.min * 1000, 3) if self.count else 0.0,
+                  'max_ms': round(self.max * 1000, 3)}
+        for p in SUMMARY_PERCENTILES:
+            result[f'p{p}_ms'] = round(self.percentile(p) * 1000, 3)
+        return result
+
+
+class HistogramRegistry(object):
+    """
+    Thread-safe histograms keyed by (workflow, step, status).
+
+    Keeps cumulative histograms for the life of the process and a window that is reset each
+    time a periodic summary is taken.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cumulative = {}
+        self._window = {}
+
+    def record(self, workflow: str, step: str | None, status: str, seconds: float) -> None:
+        key = (workflow, step or WORKFLOW_STEP, status)
+        with self._lock:
+            for table in (self._cumulative, self._window):
+                histogram = table.get(key)
+                if histogram is None:
+                    histogram = table[key] = LatencyHistogram()
+                histogram.record(seconds)
+
+    def cumulative(self) -> dict:
+        """Return copies of the cumulative histograms."""
+        with self._lock:
+            copies = {}
+            for key, histogram in self._cumulative.items():
+                copy = LatencyHistogram()
+                copy.merge(histogram)
+                copies[key] = copy
+            return copies
+
+    def take_window(self) -> dict:
+        """Return the histograms recorded since the last call and start a new window."""
+        with self._lock:
+            window, self._window = self._window, {}
+        return window
+
+
+registry = HistogramRegistry()
+
+
+def emit_summaries(window: dict) -> None:
+    """Queue one latency summary record per (workflow, step, status) on the metrics pipeline."""
+    now = time.time()
+    for (workflow, step, status), histogram in sorted(window.items()):
+        record = {
+            "timestamp": now,
+            "workflow_name": workflow,
+            "status": "summary",
+            "message": f"Latency summary for {workflow} {step} ({status})",
+            "hostname": HOSTNAME,
+            "pid": PID,
+            "step_name": step,
+            "outcome": status,
+        }
+        record.update(histogram.summary())
+        get_pipeline().submit(record)
+
+
+def start_summary_reporter(interval: float = DEFAULT_SUMMARY_INTERVAL) -> threading.Thread | None:
+    """Emit p50/p90/p99 summaries for each window of `interval` seconds; 0 disables reporting."""
+    if interval <= 0:
+        return None
+
+    def report():
+        while True:
+            time.sleep(interval)
+            emit_summaries(registry.take_window())
+
+    thread = threading.Thread(target=report, name='latency-summary', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,150 @@
+"""
+Chrome launch profiles, and a benchmark of their launch time and memory use.
+
+Run the benchmark from the pyhuman directory on the host being sized:
+
+    python -m app.utility.launch_profiles --runs 3 --url https://moodle.example.edu/
+"""
+import argparse
+import os
+import time
+
+BASE_ARGUMENTS = ['--disable-gpu', '--ignore-certificate-errors', '--start-maximized', '--disable-infobars']
+
+HEADLESS_ARGUMENTS = ['--headless=new', '--window-size=1920,1080']
+
+# Background work a scripted user never needs; each Chrome otherwise keeps several extra processes busy
+LEAN_ARGUMENTS = HEADLESS_ARGUMENTS + [
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-sync',
+    '--disable-default-apps',
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+    '--no-first-run',
+    '--mute-audio',
+    '--renderer-process-limit=2',
+]
+
+LAUNCH_PROFILES = {
+    'headed': [],
+    'headless': HEADLESS_ARGUMENTS,
+    'lean': LEAN_ARGUMENTS,
+    # For workflows that only follow links and fill forms; pages render without images
+    'minimal': LEAN_ARGUMENTS + ['--blink-settings=imagesEnabled=false'],
+}
+DEFAULT_PROFILE = 'headed'
+
+# Set once from the command line via configure()
+settings = {'profile': DEFAULT_PROFILE}
+
+
+def configure(profile: str = DEFAULT_PROFILE) -> None:
+    if profile not in LAUNCH_PROFILES:
+        raise ValueError(f"Unknown launch profile '{profile}', expected one of {', '.join(LAUNCH_PROFILES)}")
+    settings['profile'] = profile
+
+
+def launch_arguments(profile: str | None = None) -> list:
+    """Chrome command-line arguments for a launch profile (the configured one by default)."""
+    return BASE_ARGUMENTS + LAUNCH_PROFILES[profile or settings['profile']]
+
+
+def process_tree_memory(pid: int) -> int | None:
+    """
+    Memory used by a process and all its descendants, in bytes (Linux only, else None).
+
+    Uses PSS where the kernel provides it, so pages shared between Chrome's processes are
+    not counted once per process; falls back to RSS.
+    """
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        total += _process_memory(current)
+    return total
+
+
+def _process_memory(pid: int) -> int:
+    for path, field in ((f'/proc/{pid}/smaps_rollup', 'Pss:'), (f'/proc/{pid}/status', 'VmRSS:')):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return 0
+
+
+def benchmark(profiles: list, runs: int, url: str, settle: float) -> list:
+    """
+    Launch Chrome `runs` times per profile and measure launch time, page load time and memory.
+
+    Returns:
+        list: One dict per profile with mean launch/load seconds and mean memory in MB.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from .webdriver_helper import WebDriverHelper
+
+    driver_path = WebDriverHelper()._driver_path
+    results = []
+    for profile in profiles:
+        launches, loads, memory = [], [], []
+        for _ in range(runs):
+            options = webdriver.ChromeOptions()
+            for argument in launch_arguments(profile):
+                options.add_argument(argument)
+            service = Service(driver_path)
+            start = time.monotonic()
+            driver = webdriver.Chrome(service=service, options=options)
+            launches.append(time.monotonic() - start)
+            try:
+                start = time.monotonic()
+                driver.get(url)
+                loads.append(time.monotonic() - start)
+                time.sleep(settle)
+                used = process_tree_memory(service.process.pid)
+                if used is not None:
+                    memory.append(used / (1024 * 1024))
+            finally:
+                driver.quit()
+        results.append({
+            'profile': profile,
+            'launch_seconds': sum(launches) / len(launches),
+            'load_seconds': sum(loads) / len(loads),
+            'memory_mb': sum(memory) / len(memory) if memory else None,
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare Chrome launch profiles on this host')
+    parser.add_argument('--profiles', nargs='*', default=list(LAUNCH_PROFILES), choices=list(LAUNCH_PROFILES))
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--url', default='about:blank', help='Page loaded before memory is measured')
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help='Seconds to wait after the page load before measuring memory')
+    args = parser.parse_args()
+
+    print(f"{'profile':<10} {'launch (s)':>10} {'load (s)':>9} {'memory (MB)':>12}")
+    for r in benchmark(args.profiles, args.runs, args.url, args.settle):
+        memory = f"{r['memory_mb']:.0f}" if r['memory_mb'] is not None else 'n/a'
+        print(f"{r['profile']:<10} {r['launch_seconds']:>10.2f} {r['load_seconds']:>9.2f} {memory:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import functools
+import os
+import re
+import sys
+import threading
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+RANGE_PATTERN = re.compile(r'bytes=(\d+)-(\d*)$')
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse can be observed
+
+    def send_head(self):
+        # Single byte ranges on files, so resumed downloads can be exercised
+        match = RANGE_PATTERN.match(self.headers.get('Range', ''))
+        path = self.translate_path(self.path)
+        if match is None or not os.path.isfile(path):
+            self._range = None
+            return super().send_head()
+        size = os.path.getsize(path)
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        if start >= size or start > end:
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+        f = open(path, 'rb')
+        f.seek(start)
+        self._range = end - start + 1
+        self.send_response(HTTPStatus.PARTIAL_CONTENT)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.send_header('Content-Length', str(self._range))
+        self.end_headers()
+        return f
+
+    def copyfile(self, source, outputfile):
+        if getattr(self, '_range', None) is None:
+            return super().copyfile(source, outputfile)
+        remaining = self._range
+        while remaining > 0:
+            chunk = source.read(min(64 * 1024, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients abandoning a response (e.g. a download over its size limit) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class LocalHTTPServer(object):
+    """
+    Stand-in web server serving a directory on localhost, with keep-alive and byte ranges,
+    for exercising download code without touching the internet.
+
+        with LocalHTTPServer(directory) as server:
+            get_engine().run(get_engine().fetch_page(server.url('index.html')))
+    """
+
+    def __init__(self, directory: str, host: str = '127.0.0.1', port: int = 0, handler=RangeRequestHandler):
+        handler = functools.partial(handler, directory=directory)
+        self._server = _Server((host, port), handler)
+        self.connections = 0
+        self._count_connections()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def url(self, path: str = '') -> str:
+        return self.base_url + path.lstrip('/')
+
+    def start(self) -> 'LocalHTTPServer':
+        threading.Thread(target=self._server.serve_forever, name='local-http-server', daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    """ PRIVATE """
+
+    def _count_connections(self):
+        # Each accepted TCP connection; fewer connections than requests means keep-alive worked
+        accept = self._server.get_request
+
+        def get_request():
+            request = accept()
+            self.connections += 1
+            return request
+
+        self._server.get_request = get_request
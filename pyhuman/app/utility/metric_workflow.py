@@ -1,35 +1,32 @@
-import json
 import logging
-import os
-import socket
+import time
 from abc import abstractmethod
-from datetime import datetime
 from .base_workflow import BaseWorkflow
+from .metrics_sink import HOSTNAME, PID, get_local_hostname, get_pipeline
+from .latency_histogram import registry as latency_registry
+from .prometheus_exporter import metrics
 
 # Configure the logger
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 
-def get_local_hostname():
-    """Retrieve the local hostname."""
-    try:
-        hostname = socket.gethostname()
-        return hostname
-    except Exception as e:
-        return f"Error retrieving hostname: {e}"
-
-
 class MetricWorkflow(BaseWorkflow):
 
     @abstractmethod
     def __init__(self, name, description, driver=None):
         super().__init__(name=name, description=description, driver=driver)
         self.integrity = 1
+        self._started = {}  # step name (None for the workflow) -> monotonic start time
 
     def _log(self, message, step_name, status, integrity):
         """
         Log a workflow or workflow step in JSON format.
 
+        The record is queued on the metrics pipeline; formatting and I/O happen on its
+        writer thread so the workflow is not slowed down by log output. A "success" or
+        "error" that follows a "start" for the same step also carries the step's duration,
+        which is recorded in the latency histograms.
+
         Parameters:
         - workflow_name (str): Name of the workflow.
         - message (str): A message describing the event.
@@ -43,25 +40,29 @@ class MetricWorkflow(BaseWorkflow):
             raise ValueError(
                 f"Invalid status: '{status}'. Valid statuses are {valid_statuses}.")
 
-        timestamp = datetime.utcnow().isoformat()
         log_entry = {
-            "timestamp": timestamp,
+            "timestamp": time.time(),  # formatted by the pipeline's writer thread
             "workflow_name": self.name,
             "status": status,
             "message": message,
-            "hostname": get_local_hostname(),
-            "pid": os.getpid(),
+            "hostname": HOSTNAME,
+            "pid": PID,
         }
         if integrity is not None:
             log_entry["integrity"] = integrity
 
+        if status == "start":
+            self._started[step_name] = time.monotonic()
+        elif step_name in self._started:
+            duration = time.monotonic() - self._started.pop(step_name)
+            log_entry["duration_ms"] = round(duration * 1000, 3)
+            latency_registry.record(self.name, step_name, status, duration)
+
         # Add step_name only if it's provided
         if step_name is not None:
             log_entry["step_name"] = step_name
 
-        # Print out on a single line
-        logging.info("\n")
-        logging.info(json.dumps(log_entry))
+        get_pipeline().submit(log_entry)
 
 
     # STEP
@@ -99,6 +100,7 @@ class MetricWorkflow(BaseWorkflow):
     def check_external_integrity(self, to_check:str ) -> int:
         if "pwned" in to_check or "pwnd" in to_check:
             print("... Integrity failure: suspicious terms found")
+            metrics.inc('pyhuman_integrity_failures_total', workflow=self.name)
             return 0
         return 1
 
@@ -0,0 +1,291 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import socket
+import threading
+from datetime import datetime, timezone
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_FILE_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_FILE_BACKUPS = 5
+MAX_DATAGRAM_BYTES = 8192
+
+
+def get_local_hostname():
+    """Retrieve the local hostname."""
+    try:
+        hostname = socket.gethostname()
+        return hostname
+    except Exception as e:
+        return f"Error retrieving hostname: {e}"
+
+
+# Looked up once; these never change for the life of the process
+HOSTNAME = get_local_hostname()
+PID = os.getpid()
+
+
+def format_timestamp(epoch: float) -> str:
+    """Format an epoch time the way datetime.utcnow().isoformat() would."""
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class StdoutSink(object):
+    """Writes records through the root logger, one JSON document per line, as pyhuman always has."""
+
+    def write(self, lines: list) -> None:
+        for line in lines:
+            logging.info("\n\n%s", line)
+
+    def close(self) -> None:
+        pass
+
+
+class RotatingFileSink(object):
+    """Appends NDJSON to a file, rotating it when it reaches `max_bytes`."""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_FILE_MAX_BYTES, backups: int = DEFAULT_FILE_BACKUPS):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+
+    def write(self, lines: list) -> None:
+        for line in lines:
+            self._handler.emit(logging.makeLogRecord({'msg': line, 'levelno': logging.INFO}))
+        self._handler.flush()
+
+    def close(self) -> None:
+        self._handler.close()
+
+
+class UdpSink(object):
+    """Sends records as newline-separated NDJSON, packing as many as fit into each datagram."""
+
+    def __init__(self, host: str, port: int, prefix: str = ''):
+        self._address = (host, port)
+        self._prefix = prefix
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def write(self, lines: list) -> None:
+        for datagram in self._pack(lines):
+            self._sock.sendto(datagram, self._address)
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def _pack(self, lines):
+        chunk = b''
+        for line in lines:
+            data = (self._prefix + line + '\n').encode('utf-8')
+            if chunk and len(chunk) + len(data) > MAX_DATAGRAM_BYTES:
+                yield chunk
+                chunk = b''
+            chunk += data
+        if chunk:
+            yield chunk
+
+
+class SyslogSink(object):
+    """Sends each record as an RFC 3164 syslog message over UDP, or to a local socket such as /dev/log."""
+
+    def __init__(self, address, facility: int = logging.handlers.SysLogHandler.LOG_LOCAL0):
+        self._handler = logging.handlers.SysLogHandler(address=address, facility=facility)
+        self._handler.setFormatter(logging.Formatter('pyhuman[%(process)d]: %(message)s'))
+
+    def write(self, lines: list) -> None:
+        for line in lines:
+            self._handler.emit(logging.makeLogRecord({'msg': line, 'levelno': logging.INFO,
+                                                      'levelname': 'INFO', 'process': PID}))
+
+    def close(self) -> None:
+        self._handler.close()
+
+
+class UnixSocketSink(object):
+    """Streams NDJSON to a local Unix stream socket, reconnecting after errors."""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._sock = None
+
+    def write(self, lines: list) -> None:
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(self._path)
+        try:
+            self._sock.sendall(''.join(line + '\n' for line in lines).encode('utf-8'))
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+def parse_sink(spec: str):
+    """
+    Build a sink from a command-line spec.
+
+    Supported forms: ``stdout``, ``file:PATH``, ``udp:HOST:PORT``, ``syslog:HOST:PORT``,
+    ``syslog:/dev/log`` and ``unix:PATH``.
+    """
+    kind, _, target = spec.partition(':')
+    if kind == 'stdout':
+        return StdoutSink()
+    if kind == 'file' and target:
+        return RotatingFileSink(target)
+    if kind == 'udp' and target:
+        host, _, port = target.rpartition(':')
+        return UdpSink(host, int(port))
+    if kind == 'syslog' and target:
+        if target.startswith('/'):
+            return SyslogSink(target)
+        host, _, port = target.rpartition(':')
+        return SyslogSink((host, int(port)))
+    if kind == 'unix' and target:
+        return UnixSocketSink(target)
+    raise ValueError(f"Invalid metrics sink '{spec}'")
+
+
+class MetricsPipeline(object):
+    """
+    Bounded queue of metric records drained by a background writer thread.
+
+    Workflows only pay for a dict copy and a non-blocking put; timestamp formatting, JSON
+    encoding and all I/O happen on the writer thread in batches. When the queue is full the
+    record is dropped and counted rather than blocking the workflow.
+    """
+
+    def __init__(self, sinks: list, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'written': 0, 'dropped': 0, 'batches': 0, 'sink_errors': 0}
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._drain, name='metrics-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict) -> bool:
+        """Queue a record without blocking; returns False if it had to be dropped."""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += 1
+            return False
+        with self._lock:
+            self._stats['submitted'] += 1
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['queued'] = self._queue.qsize()
+        return snapshot
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything queued so far has been handed to the sinks."""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._closed.is_set():
+            return
+        self.flush(timeout)
+        self._closed.set()
+        self._thread.join(timeout)
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception:
+                pass
+        stats = self.stats()
+        if stats['dropped'] or stats['sink_errors']:
+            print(f"Metrics: {stats['dropped']} records dropped, {stats['sink_errors']} sink errors")
+
+    """ PRIVATE """
+
+    def _drain(self):
+        while not self._closed.is_set():
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch, markers = [], []
+            while True:
+                (markers if isinstance(item, threading.Event) else batch).append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            for marker in markers:
+                marker.set()
+
+    def _write(self, batch):
+        lines = []
+        for record in batch:
+            if isinstance(record.get('timestamp'), float):
+                record['timestamp'] = format_timestamp(record['timestamp'])
+            lines.append(json.dumps(record))
+        for sink in self.sinks:
+            try:
+                sink.write(lines)
+            except Exception as e:
+                with self._lock:
+                    self._stats['sink_errors'] += 1
+                print(f'Metrics sink {type(sink).__name__} failed: {e}')
+        with self._lock:
+            self._stats['written'] += len(batch)
+            self._stats['batches'] += 1
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def configure_pipeline(specs: list | None = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                       batch_size: int = DEFAULT_BATCH_SIZE) -> MetricsPipeline:
+    """Replace the process-wide pipeline with one writing to the sinks named by `specs`."""
+    global _pipeline
+    sinks = [parse_sink(spec) for spec in (specs or ['stdout'])]
+    with _pipeline_lock:
+        old, _pipeline = _pipeline, MetricsPipeline(sinks, queue_size=queue_size, batch_size=batch_size)
+    if old is not None:
+        old.close()
+    return _pipeline
+
+
+def get_pipeline() -> MetricsPipeline:
+    """Return the process-wide pipeline, creating a stdout one on first use."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = MetricsPipeline([StdoutSink()])
+    return _pipeline
+
+
+@atexit.register
+def _close_pipeline():
+    if _pipeline is not None:
+        _pipeline.close()
@@ -0,0 +1,229 @@
+import heapq
+import queue
+import random
+import threading
+import time
+from typing import Callable
+
+from .latency_histogram import LatencyHistogram, registry as latency_registry
+from .metrics_sink import HOSTNAME, PID, get_pipeline
+from .persona import Persona, set_current_persona
+from .rng import streams as random_streams
+from .prometheus_exporter import metrics
+from .timing import timing
+from .workflow_registry import workflow_key
+from .workflow_selector import parse_assignments, selector as default_selector
+
+DEFAULT_REPORT_INTERVAL = 60
+DEFAULT_MAX_QUEUE = 1000
+SCHEDULER_WORKFLOW = '(scheduler)'
+
+
+def parse_rates(specs: list) -> dict:
+    """Parse NAME=RATE pairs (arrivals per minute) from the command line."""
+    return parse_assignments(specs, 'workflow rate')
+
+
+def resolve_rate_key(name: str | None, workflows: list) -> str | None:
+    """The module name of the workflow a rate is given for (module or WORKFLOW_NAME); None stays None."""
+    if name is None:
+        return None
+    for workflow in workflows:
+        if workflow_key(workflow) == name:
+            return name
+    for workflow in workflows:
+        if workflow.name == name:
+            return workflow_key(workflow)
+    raise ValueError(f"Unknown workflow '{name}' in arrival rates")
+
+
+class ArrivalStream(object):
+    """Arrivals of one workflow (or of any workflow when `workflow` is None) at a fixed mean rate."""
+
+    def __init__(self, workflow: str | None, rate_per_minute: float, poisson: bool, rng):
+        self.workflow = workflow
+        self.rate = rate_per_minute
+        self.poisson = poisson
+        self.rng = rng
+
+    def next_interval(self) -> float:
+        """Seconds of simulated time until the next arrival."""
+        if self.poisson:
+            return self.rng.expovariate(self.rate / 60.0)
+        return 60.0 / self.rate
+
+
+class Job(object):
+    __slots__ = ['workflow', 'due', 'seed']
+
+    def __init__(self, workflow: str, due: float, seed: int | None = None):
+        self.workflow = workflow
+        self.due = due
+        self.seed = seed
+
+
+class OpenLoopScheduler(object):
+    """
+    Open-loop load generator: dispatches workflows at target arrival rates onto a worker pool.
+
+    Arrivals are generated on their own schedule whether or not earlier workflows have
+    finished, so a slow service under test shows up as queueing delay and a shortfall in
+    achieved rate rather than as silently reduced load. Each worker is a persona with its own
+    browser session. Arrivals that find the queue full are shed and counted. Aggregate
+    arrivals are assigned a workflow by the WorkflowSelector, whose concurrency caps also
+    apply here: a capped job waits for a slot, which shows up as queueing delay.
+    """
+
+    def __init__(self, personas: list, rates: dict, handle: Callable, poisson: bool = False,
+                 selector=None, report_interval: float = DEFAULT_REPORT_INTERVAL,
+                 max_queue: int = DEFAULT_MAX_QUEUE, rng=None, pick_rng=None):
+        """
+        Args:
+            personas (list): Worker personas, each with its own `workflows` list.
+            rates (dict): Arrivals per minute keyed by workflow module or WORKFLOW_NAME; the key
+                          None is an aggregate rate whose arrivals are assigned by `pick`.
+            handle (callable): handle(workflow, extra, seed) runs one workflow.
+            poisson (bool): Exponential inter-arrival times instead of fixed spacing.
+            selector (WorkflowSelector): Picks aggregate arrivals and enforces concurrency caps.
+            report_interval (float): Seconds between achieved-rate reports.
+            max_queue (int): Jobs waiting for a worker before new arrivals are shed.
+            rng: Random source for arrival times.
+            pick_rng: Random source for assigning aggregate arrivals a workflow. Kept apart from
+                      `rng` because a replayed run takes its picks from the log instead, and the
+                      arrival times must not shift when those draws are skipped.
+        """
+        if report_interval <= 0:
+            raise ValueError(f'Rate report interval must be positive, got {report_interval}')
+        self.personas = personas
+        self.handle = handle
+        self.selector = selector or default_selector
+        self.report_interval = report_interval
+        self.rng = rng or random.Random()
+        self.pick_rng = pick_rng or random.Random()
+        self.streams = [ArrivalStream(resolve_rate_key(name, personas[0].workflows), rate, poisson, self.rng)
+                        for name, rate in rates.items() if rate > 0]
+        self.target_rate = sum(s.rate for s in self.streams)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._window_started = 0
+        self._window_delay = LatencyHistogram()
+        self._totals = {'arrivals': 0, 'started': 0, 'shed': 0}
+        self._previous = None
+
+    def run(self, lifespan_seconds: float = 0) -> None:
+        """Dispatch until `lifespan_seconds` of real time pass (0 = forever) or stop() is called."""
+        workers = [threading.Thread(target=self._work, args=(p,), name=p.name, daemon=True)
+                   for p in self.personas]
+        for worker in workers:
+            worker.start()
+        metrics.set('pyhuman_open_loop_target_rate', self.target_rate)
+
+        now = time.monotonic()
+        end = now + lifespan_seconds if lifespan_seconds else None
+        next_report = now + self.report_interval
+        window_start = now
+        arrivals = []
+        for index, stream in enumerate(self.streams):
+            heapq.heappush(arrivals, (now + stream.next_interval() / timing.compression, index))
+
+        while arrivals and not self._stop.is_set():
+            due, index = arrivals[0]
+            wake = min(due, next_report, end or due)
+            if self._stop.wait(max(wake - time.monotonic(), 0)):
+                break
+            now = time.monotonic()
+            if end is not None and now >= end:
+                break
+            if now >= next_report:
+                self._report(now - window_start)
+                window_start, next_report = now, now + self.report_interval
+            if now < due:
+                continue
+            heapq.heapreplace(arrivals, (due + self.streams[index].next_interval() / timing.compression, index))
+            if not self._dispatch(self.streams[index], due):
+                print('Open loop: replay finished')
+                break
+
+        self.stop()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for persona in self.personas:
+            persona.stop_event.set()
+
+    """ PRIVATE """
+
+    def _dispatch(self, stream: ArrivalStream, due: float) -> bool:
+        """Queue one arrival; returns False when a replayed run has no decisions left."""
+        workflows = self.personas[0].workflows
+        if stream.workflow is not None:
+            fixed = next(w for w in workflows if workflow_key(w) == stream.workflow)
+            choose = lambda: fixed
+        else:
+            choose = lambda: self.selector.choose(workflows, self.pick_rng, self._previous)
+        decision = random_streams.decide(SCHEDULER_WORKFLOW, workflows, choose)
+        if decision is None:
+            return False
+        workflow, seed = decision
+        key = workflow_key(workflow)
+        if stream.workflow is None:
+            self._previous = workflow
+        with self._lock:
+            self._totals['arrivals'] += 1
+        try:
+            self._queue.put_nowait(Job(key, due, seed))
+        except queue.Full:
+            with self._lock:
+                self._totals['shed'] += 1
+            metrics.inc('pyhuman_open_loop_shed_total', workflow=key)
+        metrics.set('pyhuman_open_loop_queue_depth', self._queue.qsize())
+        return True
+
+    def _work(self, persona: Persona) -> None:
+        set_current_persona(persona)
+        by_key = {workflow_key(w): w for w in persona.workflows}
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            workflow = by_key[job.workflow]
+            with self.selector.slot(workflow, persona.stop_event) as acquired:
+                if not acquired:
+                    return
+                delay = max(time.monotonic() - job.due, 0.0)
+                latency_registry.record(SCHEDULER_WORKFLOW, 'queue-delay', 'success', delay)
+                with self._lock:
+                    self._window_started += 1
+                    self._totals['started'] += 1
+                    self._window_delay.record(delay)
+                print(f"[{persona.name}] {workflow.display} (queued {delay:.2f}s)")
+                self.handle(workflow, persona.extra, job.seed)
+
+    def _report(self, elapsed: float) -> None:
+        with self._lock:
+            started, self._window_started = self._window_started, 0
+            delay, self._window_delay = self._window_delay, LatencyHistogram()
+            totals = dict(self._totals)
+        # Rates are per minute of simulated time so they compare directly with the targets
+        simulated_minutes = elapsed * timing.compression / 60.0
+        achieved = started / simulated_minutes if simulated_minutes else 0.0
+        metrics.set('pyhuman_open_loop_achieved_rate', achieved)
+        summary = delay.summary()
+        print(f"Open loop: target {self.target_rate:.2f}/min, achieved {achieved:.2f}/min, "
+              f"queue {self._queue.qsize()}, shed {totals['shed']}, "
+              f"queueing delay p50 {summary['p50_ms'] / 1000:.2f}s p99 {summary['p99_ms'] / 1000:.2f}s")
+        get_pipeline().submit({
+            "timestamp": time.time(),
+            "workflow_name": SCHEDULER_WORKFLOW,
+            "status": "open-loop",
+            "message": "Open loop arrival rate report",
+            "hostname": HOSTNAME,
+            "pid": PID,
+            "target_per_minute": round(self.target_rate, 3),
+            "achieved_per_minute": round(achieved, 3),
+            "queue_depth": self._queue.qsize(),
+            "queue_delay": summary,
+            **totals,
+        })
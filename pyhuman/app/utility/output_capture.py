@@ -0,0 +1,97 @@
+import codecs
+import gzip
+
+
+class OutputCapture(object):
+    """
+    Bounded record of one command's output.
+
+    The first `head_bytes` and the last `tail_bytes` are kept in memory; text() joins them with
+    a note of how much was left out. Every byte can also be written to a gzip transcript, and
+    listeners see each chunk as it arrives, so checks can scan the whole output without it
+    ever being held at once. With both limits 0 everything is kept, as before.
+    """
+
+    def __init__(self, head_bytes: int = 0, tail_bytes: int = 0, spill_path: str | None = None,
+                 listeners: tuple = ()):
+        """
+        Args:
+            head_bytes (int): Bytes kept from the start of the output.
+            tail_bytes (int): Bytes kept from the end of the output (a ring buffer).
+            spill_path (str, optional): Write the full output to this gzip file.
+            listeners (tuple): Callables given each chunk of output (bytes) as it arrives.
+        """
+        self.unbounded = not head_bytes and not tail_bytes
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.spill_path = spill_path
+        self.listeners = list(listeners)
+        self.total_bytes = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._spill = None
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        self.total_bytes += len(data)
+        if self.spill_path is not None:
+            if self._spill is None:
+                self._spill = gzip.open(self.spill_path, 'wb', compresslevel=6)
+            self._spill.write(data)
+        for listener in self.listeners:
+            listener(data)
+        if self.unbounded:
+            self._head += data
+            return
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data and self.tail_bytes:
+            self._tail += data
+            # Trimmed in batches so appending stays amortized O(len(data))
+            if len(self._tail) > 2 * self.tail_bytes:
+                del self._tail[:len(self._tail) - self.tail_bytes]
+
+    @property
+    def omitted_bytes(self) -> int:
+        return self.total_bytes - len(self._head) - min(len(self._tail), self.tail_bytes)
+
+    def text(self) -> str:
+        tail = self._tail[-self.tail_bytes:] if self.tail_bytes else b''
+        if not self.omitted_bytes:
+            return (self._head + tail).decode(errors='ignore')
+        note = f"\n[... {self.omitted_bytes} bytes omitted"
+        if self.spill_path is not None:
+            note += f", full output in {self.spill_path}"
+        return self._head.decode(errors='ignore') + note + " ...]\n" + tail.decode(errors='ignore')
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+class StreamScanner(object):
+    """
+    Listener running a text check over a stream in overlapping windows.
+
+    `check(text)` returns 1 for clean text and 0 when it finds something; after the first 0 it is
+    not called again, so side effects of a failure (logging, counters) happen once. Windows
+    overlap by `overlap` characters so a match split between chunks is still seen.
+    """
+
+    def __init__(self, check, overlap: int = 256):
+        self.check = check
+        self.overlap = overlap
+        self.result = 1
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self._carry = ''
+
+    def __call__(self, data: bytes) -> None:
+        if not self.result:
+            return
+        text = self._carry + self._decoder.decode(data)
+        self.result = self.check(text)
+        self._carry = text[-self.overlap:]
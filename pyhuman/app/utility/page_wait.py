@@ -0,0 +1,104 @@
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+READY_TIMEOUT = 30  # Longest we wait for a page to become ready, in seconds
+NETWORK_IDLE_SECONDS = 0.5  # No new resource loads for this long counts as network idle
+POLL_SECONDS = 0.1
+
+RESOURCE_BUFFER_SIZE = 10000  # Resource Timing entries kept, up from the browser's 250
+
+# Installs (once per document) counters of XHR/fetch requests in flight and of network activity
+# (requests started or settled, and resources loaded), and returns [in flight, activity]. Counting
+# with a PerformanceObserver keeps working after the Resource Timing buffer fills up.
+NETWORK_MONITOR_SCRIPT = """
+if (!window.__pyhumanNet) {
+    var net = window.__pyhumanNet = {pending: 0, activity: 0};
+    var settle = function () { net.pending = Math.max(net.pending - 1, 0); net.activity++; };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            net.pending++;
+            net.activity++;
+            return fetch.apply(window, arguments).finally(settle);
+        };
+    }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        net.pending++;
+        net.activity++;
+        this.addEventListener('loadend', settle, {once: true});
+        try {
+            return send.apply(this, arguments);
+        } catch (e) {
+            settle();
+            throw e;
+        }
+    };
+    performance.setResourceTimingBufferSize(%d);
+    if (window.PerformanceObserver) {
+        new PerformanceObserver(function (list) { net.activity += list.getEntries().length; })
+            .observe({type: 'resource'});
+    }
+}
+return [window.__pyhumanNet.pending, window.__pyhumanNet.activity];
+""" % RESOURCE_BUFFER_SIZE
+
+
+def wait_for_document_ready(driver, timeout: float = READY_TIMEOUT) -> bool:
+    """Wait until document.readyState is 'complete'. Returns False on timeout."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_SECONDS).until(
+            lambda d: d.execute_script('return document.readyState') == 'complete')
+        return True
+    except (TimeoutException, WebDriverException):
+        return False
+
+
+def wait_for_network_idle(driver, idle: float = NETWORK_IDLE_SECONDS, timeout: float = READY_TIMEOUT) -> bool:
+    """
+    Wait until no XHR/fetch request is in flight and there has been no network activity for `idle` seconds.
+
+    Requests are counted by wrapping fetch and XMLHttpRequest in the page, and other loads
+    (images, scripts) with a PerformanceObserver, so AJAX triggered after the load event (e.g.
+    Moodle's blocks) is waited for even while a slow request has not finished. A request
+    started before the first check is only seen when it completes. Returns False on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    try:
+        _, last_activity = driver.execute_script(NETWORK_MONITOR_SCRIPT)
+        last_change = time.monotonic()
+        while time.monotonic() < deadline:
+            time.sleep(POLL_SECONDS)
+            # Re-run each time: a navigation replaces the document and its counters
+            pending, activity = driver.execute_script(NETWORK_MONITOR_SCRIPT)
+            now = time.monotonic()
+            if pending or activity != last_activity:
+                last_activity, last_change = activity, now
+            elif now - last_change >= idle:
+                return True
+    except WebDriverException:
+        pass
+    return False
+
+
+def wait_until_ready(driver, timeout: float = READY_TIMEOUT) -> bool:
+    """Wait for document ready and then network idle, sharing one timeout budget."""
+    deadline = time.monotonic() + timeout
+    if not wait_for_document_ready(driver, timeout):
+        return False
+    return wait_for_network_idle(driver, timeout=max(deadline - time.monotonic(), 0))
+
+
+def wait_for_element(driver, locator: tuple, timeout: float = READY_TIMEOUT):
+    """Return the element at `locator` once present; raises TimeoutException otherwise."""
+    return WebDriverWait(driver, timeout, poll_frequency=POLL_SECONDS).until(
+        EC.presence_of_element_located(locator))
+
+
+def wait_for_clickable(driver, locator: tuple, timeout: float = READY_TIMEOUT):
+    """Return the element at `locator` once visible and enabled; raises TimeoutException otherwise."""
+    return WebDriverWait(driver, timeout, poll_frequency=POLL_SECONDS).until(
+        EC.element_to_be_clickable(locator))
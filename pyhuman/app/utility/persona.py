@@ -0,0 +1,51 @@
+import random
+import threading
+
+from .rng import StreamContext, bind_context
+
+_local = threading.local()
+
+
+class Persona(object):
+    """
+    One simulated user running inside a shared human.py process.
+
+    Each persona owns its random streams (`rng` for scheduling decisions, others per
+    component, all derived from `seed`), its copy of the extra arguments (so it can
+    carry its own credentials), its workflow instances, a speed factor applied to
+    all of its think times (2.0 acts twice as fast) and a stop event used to
+    interrupt sleeps on shutdown. Workflow modules themselves are shared.
+    """
+
+    def __init__(self, index: int, seed=None, extra: list | None = None, speed_spread: float = 0.0):
+        self.index = index
+        self.name = f"persona-{index:02d}"
+        self.streams = StreamContext(random.SystemRandom().getrandbits(63) if seed is None else seed)
+        self.rng = self.streams.stream('scheduler')
+        self.speed = self.streams.stream('speed').lognormvariate(0, speed_spread) if speed_spread > 0 else 1.0
+        self.extra = [self.expand(e) for e in (extra or [])]
+        self.stop_event = threading.Event()
+        self.workflows = []
+
+    def expand(self, value: str) -> str:
+        """Substitute {persona} and {index} placeholders, e.g. in a passfile path."""
+        return value.replace('{persona}', self.name).replace('{index}', str(self.index))
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to `seconds`, returning True if the persona was asked to stop."""
+        return self.stop_event.wait(seconds)
+
+
+def current_persona() -> Persona | None:
+    """Return the persona bound to the calling thread, or None outside persona mode."""
+    return getattr(_local, 'persona', None)
+
+
+def set_current_persona(persona: Persona | None) -> None:
+    _local.persona = persona
+    bind_context(None if persona is None else persona.streams)
+
+
+def persona_key() -> str | None:
+    persona = current_persona()
+    return None if persona is None else persona.name
@@ -0,0 +1,194 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .browser_pool import get_pool
+from .latency_histogram import registry as latency_registry
+from .metrics_sink import get_pipeline
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BIND = '0.0.0.0'
+# Upper bounds (seconds) of the step duration histogram buckets; fixed, so buckets from every
+# scraped process can be summed and quantiles computed over any range with histogram_quantile()
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+DESCRIPTIONS = {
+    'pyhuman_workflow_starts_total': ('counter', 'Workflows started'),
+    'pyhuman_workflow_successes_total': ('counter', 'Workflows that finished without error'),
+    'pyhuman_workflow_errors_total': ('counter', 'Workflows that failed or raised'),
+    'pyhuman_integrity_failures_total': ('counter', 'Integrity checks that found suspicious terms'),
+    'pyhuman_browser_restarts_total': ('counter', 'Browsers discarded after a workflow exception'),
+    'pyhuman_workflows_running': ('gauge', 'Workflows currently executing'),
+    'pyhuman_personas': ('gauge', 'Personas running in this process'),
+    'pyhuman_scheduler_sleeping': ('gauge', 'Personas currently waiting between tasks'),
+    'pyhuman_open_loop_target_rate': ('gauge', 'Target workflow arrivals per simulated minute'),
+    'pyhuman_open_loop_achieved_rate': ('gauge', 'Workflows started per simulated minute in the last report window'),
+    'pyhuman_open_loop_queue_depth': ('gauge', 'Arrivals waiting for a free worker'),
+    'pyhuman_open_loop_shed_total': ('counter', 'Arrivals dropped because the dispatch queue was full'),
+}
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+class MetricsRegistry(object):
+    """
+    Minimal thread-safe store of counters and gauges, rendered in the Prometheus text format.
+
+    Values that already live elsewhere (browser pool, metrics pipeline, latency histograms)
+    are read at scrape time by collectors instead of being copied here.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._collectors = []
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = value
+
+    def add_collector(self, collector) -> None:
+        """Register a callable returning (name, type, help, [(suffix, labels_dict, value), ...]) tuples."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        families = {}
+        with self._lock:
+            values = dict(self._values)
+        for (name, labels), value in values.items():
+            kind, text = DESCRIPTIONS.get(name, ('untyped', name))
+            families.setdefault(name, (kind, text, []))[2].append(('', labels, value))
+        for collector in self._collectors:
+            try:
+                for name, kind, text, samples in collector():
+                    family = families.setdefault(name, (kind, text, []))
+                    family[2].extend((suffix, tuple(labels.items()), v) for suffix, labels, v in samples)
+            except Exception as e:
+                print(f'Metrics collector failed: {e}')
+
+        lines = []
+        for name, (kind, text, samples) in sorted(families.items()):
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{name}{suffix}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+def _collect_latency():
+    samples = []
+    for (workflow, step, status), histogram in latency_registry.cumulative().items():
+        labels = {'workflow': workflow, 'step': step, 'outcome': status}
+        for bound, count in zip(DURATION_BUCKETS, histogram.cumulative_counts(DURATION_BUCKETS)):
+            samples.append(('_bucket', dict(labels, le=str(bound)), count))
+        samples.append(('_bucket', dict(labels, le='+Inf'), histogram.count))
+        samples.append(('_sum', labels, histogram.total))
+        samples.append(('_count', labels, histogram.count))
+    return [('pyhuman_step_duration_seconds', 'histogram', 'Step and workflow durations', samples)]
+
+
+def _collect_browser_pool():
+    stats = get_pool().stats()
+    families = [
+        ('pyhuman_browser_pool_hits_total', 'counter', 'Checkouts served by a warm browser', stats['hits']),
+        ('pyhuman_browser_pool_misses_total', 'counter', 'Checkouts that launched a browser', stats['misses']),
+        ('pyhuman_browser_launches_total', 'counter', 'Browsers launched', stats['launches']),
+        ('pyhuman_browser_launch_seconds_total', 'counter', 'Time spent launching browsers', stats['launch_seconds_total']),
+        ('pyhuman_browsers_live', 'gauge', 'Browsers checked out, idle or launching', stats['live']),
+        ('pyhuman_browsers_idle', 'gauge', 'Warm spare browsers', stats['idle']),
+    ]
+    webdriver_helper = sys.modules.get('app.utility.webdriver_helper')
+    if webdriver_helper is not None:
+        families.append(('pyhuman_session_resets_total', 'counter', 'Cheap in-place session resets',
+                         webdriver_helper.session_stats['resets']))
+        families.append(('pyhuman_session_reset_failures_total', 'counter',
+                         'Session resets that fell back to a browser restart',
+                         webdriver_helper.session_stats['reset_failures']))
+    return [(name, kind, text, [('', {}, value)]) for name, kind, text, value in families]
+
+
+def _collect_downloads():
+    download_engine = sys.modules.get('app.utility.download_engine')
+    stats = download_engine.engine_stats() if download_engine is not None else None
+    if stats is None:
+        return []
+    return [
+        ('pyhuman_download_requests_total', 'counter', 'HTTP requests made by the download engine', [('', {}, stats['requests'])]),
+        ('pyhuman_download_errors_total', 'counter', 'Download engine requests that failed', [('', {}, stats['errors'])]),
+        ('pyhuman_download_bytes_total', 'counter', 'Response bytes received by the download engine', [('', {}, stats['bytes'])]),
+        ('pyhuman_download_seconds_total', 'counter', 'Time spent in download engine requests', [('', {}, stats['seconds_total'])]),
+    ]
+
+
+def _collect_artifacts():
+    artifact_store = sys.modules.get('app.utility.artifact_store')
+    if artifact_store is None:
+        return []
+    stats = artifact_store.all_stats()
+    return [
+        ('pyhuman_artifact_bytes_written_total', 'counter', 'Bytes of downloads and builds added to artifact stores', [('', {}, stats['bytes_written'])]),
+        ('pyhuman_artifact_bytes_evicted_total', 'counter', 'Bytes deleted from artifact stores by quota or age', [('', {}, stats['bytes_evicted'])]),
+        ('pyhuman_artifacts_evicted_total', 'counter', 'Artifacts deleted by quota or age', [('', {}, stats['artifacts_evicted'])]),
+        ('pyhuman_artifact_bytes', 'gauge', 'Bytes currently held in artifact stores', [('', {}, stats['bytes'])]),
+    ]
+
+
+def _collect_pipeline():
+    stats = get_pipeline().stats()
+    return [
+        ('pyhuman_metric_records_written_total', 'counter', 'Metric records written to sinks', [('', {}, stats['written'])]),
+        ('pyhuman_metric_records_dropped_total', 'counter', 'Metric records dropped on a full queue', [('', {}, stats['dropped'])]),
+        ('pyhuman_metric_queue_depth', 'gauge', 'Metric records waiting to be written', [('', {}, stats['queued'])]),
+    ]
+
+
+metrics.add_collector(_collect_latency)
+metrics.add_collector(_collect_browser_pool)
+metrics.add_collector(_collect_pipeline)
+metrics.add_collector(_collect_downloads)
+metrics.add_collector(_collect_artifacts)
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes would otherwise flood stdout
+
+
+def start_exporter(port: int, bind: str = DEFAULT_BIND) -> ThreadingHTTPServer | None:
+    """Serve /metrics on a daemon thread; a port of 0 disables the exporter."""
+    if port <= 0:
+        return None
+    server = ThreadingHTTPServer((bind, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-exporter', daemon=True).start()
+    print(f'Serving metrics on http://{bind}:{port}/metrics')
+    return server
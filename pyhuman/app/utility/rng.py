@@ -0,0 +1,191 @@
+import atexit
+import hashlib
+import json
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from .workflow_registry import workflow_key
+
+DEFAULT_COMPONENT = 'workflow'
+LOG_VERSION = 1
+
+_local = threading.local()
+
+
+def derive_seed(base: int, *path) -> int:
+    """
+    Derive an independent 64-bit seed from a base seed and a path such as ('persona', 3).
+
+    Streams derived from different paths do not overlap or shift each other, so adding a
+    workflow, a component or a random draw somewhere leaves every other stream unchanged.
+    """
+    text = '/'.join(str(p) for p in (base,) + path)
+    return int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+
+
+class StreamContext(object):
+    """A seed plus the per-component random.Random streams derived from it, created on first use."""
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self._streams = {}
+
+    def stream(self, component: str = DEFAULT_COMPONENT) -> random.Random:
+        if component not in self._streams:
+            self._streams[component] = random.Random(derive_seed(self.seed, component))
+        return self._streams[component]
+
+
+def bind_context(context: StreamContext | None) -> None:
+    """Set the calling thread's fallback context (its persona's) used outside workflow runs."""
+    _local.default = context
+
+
+def current_stream(component: str = DEFAULT_COMPONENT):
+    """
+    The random source `component` should draw from on this thread.
+
+    Inside a workflow run that is the run's stream for the component; otherwise the bound
+    persona's; outside both, the global `random` module.
+    """
+    runs = getattr(_local, 'runs', None)
+    context = runs[-1] if runs else getattr(_local, 'default', None)
+    return random if context is None else context.stream(component)
+
+
+class _CurrentRandom(object):
+    """Drop-in for the `random` module that draws from the calling thread's current stream."""
+
+    def __init__(self, component: str):
+        self._component = component
+
+    def __getattr__(self, name):
+        return getattr(current_stream(self._component), name)
+
+
+# Workflows use this in place of the random module: rng.choice(...), rng.randint(...)
+rng = _CurrentRandom(DEFAULT_COMPONENT)
+
+
+class RandomStreams(object):
+    """
+    Process-wide source of seeds, and the decision log used to record and replay runs.
+
+    Every persona, workflow run and component gets a stream derived from one base seed. A
+    "decision" is the choice of the next workflow together with the seed of its run; when
+    recording, each decision is appended to a JSON lines log, and when replaying, decisions
+    are taken from such a log instead of being drawn, so the same workflows run with the same
+    seeds (and therefore the same clicks, typos and think times) in the same order.
+    """
+
+    def __init__(self):
+        self.base_seed = random.SystemRandom().getrandbits(63)
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._record = None
+        self._replay = None
+
+    def configure(self, seed: int | None = None, record: str | None = None, replay: str | None = None) -> None:
+        """
+        Args:
+            seed (int|None): Base seed; a random one is chosen (and printed) when None.
+            record (str|None): Write the decision log to this path.
+            replay (str|None): Take decisions from this log; its base seed overrides `seed`.
+        """
+        if replay:
+            seed, self._replay = self._read_log(replay)
+            print(f'Replaying decisions from {replay} (seed {seed})')
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+            print(f'Random seed: {seed} (pass --seed {seed} to repeat)')
+        self.base_seed = seed
+        if record:
+            self._record = open(record, 'w', encoding='utf-8')
+            atexit.register(self.close)
+            self._write({'version': LOG_VERSION, 'seed': seed})
+
+    def derive(self, *path) -> int:
+        return derive_seed(self.base_seed, *path)
+
+    def stream(self, *path) -> random.Random:
+        """A new independent stream, e.g. stream('arrivals') for the open-loop scheduler."""
+        return random.Random(self.derive(*path))
+
+    def decide(self, owner: str, workflows: list, choose):
+        """
+        Choose the next workflow for `owner` (a persona name or the scheduler).
+
+        Args:
+            owner (str): Whose decision this is; decisions are replayed per owner, in order.
+            workflows (list): Candidates, matched to logged decisions by module name.
+            choose (callable): Draws the workflow when not replaying.
+
+        Returns:
+            tuple|None: (workflow, run seed), or None once a replayed owner has no decisions left.
+        """
+        if self._replay is None:
+            workflow = choose()
+            key = workflow_key(workflow)
+            with self._lock:
+                count = self._counts[(owner, key)] = self._counts.get((owner, key), 0) + 1
+            seed = self.derive(owner, key, count)
+        else:
+            with self._lock:
+                pending = self._replay.get(owner)
+                if not pending:
+                    return None
+                entry = pending.popleft()
+            key, seed = entry['workflow'], entry['seed']
+            workflow = next((w for w in workflows if workflow_key(w) == key), None)
+            if workflow is None:
+                raise ValueError(f"Replayed workflow '{key}' is not loaded; check --workflows")
+        if self._record is not None:
+            self._write({'owner': owner, 'workflow': key, 'seed': seed})
+        return workflow, seed
+
+    @contextmanager
+    def run(self, seed: int | None):
+        """Make the streams derived from `seed` current on this thread for the duration of a workflow run."""
+        if seed is None:
+            yield
+            return
+        runs = getattr(_local, 'runs', None)
+        if runs is None:
+            runs = _local.runs = []
+        runs.append(StreamContext(seed))
+        try:
+            yield
+        finally:
+            runs.pop()
+
+    def close(self) -> None:
+        if self._record is not None:
+            with self._lock:
+                self._record.close()
+                self._record = None
+
+    """ PRIVATE """
+
+    def _write(self, entry: dict) -> None:
+        with self._lock:
+            if self._record is not None:
+                self._record.write(json.dumps(entry) + '\n')
+                self._record.flush()
+
+    @staticmethod
+    def _read_log(path: str) -> tuple:
+        decisions = {}
+        with open(path, encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get('version') != LOG_VERSION:
+                raise ValueError(f'{path} is not a pyhuman decision log')
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    decisions.setdefault(entry['owner'], deque()).append(entry)
+        return header['seed'], decisions
+
+
+streams = RandomStreams()
@@ -7,7 +7,10 @@ import re
 import sys
 import random
 import difflib
-from typing import Callable, List, Literal, TypedDict
+from typing import Callable, List, Literal, Optional, TypedDict
+
+from .human_typer import CommandInterrupted
+from .output_capture import StreamScanner
 
 # Result type returned by the sanity check callback
 SanityCheckResult = Literal["success", "retry", "fail"]
@@ -15,10 +18,81 @@ SanityCheckResult = Literal["success", "retry", "fail"]
 # CommandTask defines the structure for each command object
 
 
-class CommandTask(TypedDict):
+class _RequiredCommandTask(TypedDict):
     command: str
     check: Callable[["CommandTask", str, int], SanityCheckResult]
 
+
+class CommandTask(_RequiredCommandTask, total=False):
+    timeout: float  # interrupt the command (Ctrl-C) and fail the step after this many seconds
+    inactivity_timeout: float  # ... or after this many seconds without output
+
+
+# Output a stream check keeps from the previous chunk, so a match split between chunks is
+# still seen; long enough for a full compiler command line
+STREAM_CHECK_OVERLAP = 8192
+
+
+class StreamingCheck(object):
+    """
+    A check that is decided while the output streams in, not only once the prompt is back.
+
+    Seeing `failure` interrupts the command at once; `success` anywhere in the output makes
+    the attempt succeed (unless `failure` also appears). Failed attempts are retried until
+    `max_fails` is reached. It can also be called like a plain check on a finished output.
+    """
+
+    def __init__(self, success: str, failure: Optional[str] = None, max_fails: int = 2):
+        self.success = re.compile(success, re.MULTILINE)
+        self.failure = re.compile(failure, re.MULTILINE) if failure else None
+        self.max_fails = max_fails
+
+    def __call__(self, task, output, fail_count) -> SanityCheckResult:
+        if self.failure is None or not self.failure.search(output):
+            if self.success.search(output):
+                return "success"
+        return self.failed(fail_count)
+
+    def failed(self, fail_count) -> SanityCheckResult:
+        return "retry" if fail_count < self.max_fails else "fail"
+
+    def watch(self) -> "_Watch":
+        """A listener for one attempt's output; checks are shared, so state lives here."""
+        return _Watch(self)
+
+
+class _Watch(object):
+
+    def __init__(self, check: StreamingCheck):
+        self._echoed = False
+        self.succeeded = StreamScanner(lambda text: 0 if check.success.search(text) else 1, STREAM_CHECK_OVERLAP)
+        self.failed = StreamScanner(lambda text: 0 if check.failure.search(text) else 1, STREAM_CHECK_OVERLAP) \
+            if check.failure else None
+
+    def __call__(self, data: bytes) -> None:
+        if not self._echoed:
+            # Skip the shell's echo of the typed command, which may contain the patterns itself
+            newline = data.find(b"\n")
+            if newline < 0:
+                return
+            self._echoed = True
+            data = data[newline + 1:]
+        self.succeeded(data)
+        if self.failed is not None:
+            self.failed(data)
+
+    @property
+    def outcome(self) -> Optional[str]:
+        if self.failed is not None and not self.failed.result:
+            return "failure"
+        if not self.succeeded.result:
+            return "success"
+        return None
+
+    def failure_seen(self) -> Optional[str]:
+        return "check failed" if self.outcome == "failure" else None
+
+
 # Run commands using the provided HumanTyperShell instance, retrying as instructed by the check callback.
 # Throws RuntimeError if a task ultimately fails.
 def run_shell_commands_with_checks(
@@ -31,11 +105,15 @@ def run_shell_commands_with_checks(
     Executes a series of shell commands with retry logic and optional step logging.
 
     Parameters:
-    shell: An object with a type_command(str) -> str method for running shell commands.
+    shell: An object with a type_command(str, listeners) -> str method for running shell commands.
     tasks: A list of CommandTask dicts, each containing a 'command' string and a 'check' function.
     max_retries: Maximum number of retries for each command on transient failure.
     step_logger: Optional object with logging methods log_step_start, log_step_success, log_step_error,
-                 and check_external_integrity(output) for recording progress and results.
+                 and check_external_integrity(output) for recording progress and results. The integrity
+                 check is run over the output as it streams in, so it sees all of it even when the
+                 shell only returns the head and tail of long output.
+
+    A task interrupted for its 'timeout' or 'inactivity_timeout' fails permanently.
 
     Raises:
     RuntimeError if a command fails permanently or exceeds retry limit.
@@ -58,9 +136,33 @@ def run_shell_commands_with_checks(
         # Run a single task with retries and logging
         fail_count = 0
         while fail_count <= max_retries:
-            output = shell.type_command(task["command"])
-            result = task["check"](task, output, fail_count)
-            integrity = step_logger.check_external_integrity(output) if step_logger else None
+            check = task["check"]
+            watch = check.watch() if isinstance(check, StreamingCheck) else None
+            listeners = [watch] if watch else []
+            integrity_scan = StreamScanner(step_logger.check_external_integrity) if step_logger else None
+            if integrity_scan:
+                listeners.append(integrity_scan)
+            try:
+                output = shell.type_command(task["command"], listeners=tuple(listeners),
+                                            timeout=task.get("timeout"),
+                                            inactivity_timeout=task.get("inactivity_timeout"),
+                                            should_interrupt=watch.failure_seen if watch else None)
+                interrupted = None
+            except CommandInterrupted as e:
+                output, interrupted = e.output, e.reason
+                print(f"... Interrupted {task['command']!r}: {e.reason}")
+            integrity = integrity_scan.result if integrity_scan else None
+
+            if watch and watch.outcome == "failure":
+                # Seen while streaming; the command was cut short
+                result = check.failed(fail_count)
+            elif interrupted:
+                # A hung step would most likely hang again, so it is not retried
+                result = "fail"
+            elif watch and watch.outcome == "success":
+                result = "success"
+            else:
+                result = check(task, output, fail_count)
 
             if result == "success":
                 _log_if_present("log_step_success", step_name, integrity=integrity)
@@ -77,7 +179,6 @@ def run_shell_commands_with_checks(
             )
 
         # Exceeded retry limit
-        integrity = step_logger.check_integrity(output) if step_logger else True
         _log_if_present("log_step_error", step_name, integrity=integrity)
         raise RuntimeError(
             f"Command failed after {max_retries} retries: {task['command']}\nLast output:\n{output}"
@@ -92,7 +193,7 @@ def run_shell_commands_with_checks(
 
 # Example usage
 if __name__ == "__main__":
-    from human_typer import HumanTyperShell  # Updated import to match file name
+    from .human_typer import HumanTyperShell  # run as python -m app.utility.shell_interact
 
     def jittery_typist():
         return random.gauss(0.1, 0.03)
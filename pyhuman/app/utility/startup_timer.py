@@ -0,0 +1,42 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer(object):
+    """Collects wall-clock time spent in named startup phases of human.py."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._sections = {}
+
+    @contextmanager
+    def section(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            count, total = self._sections.get(name, (0, 0.0))
+            self._sections[name] = (count + 1, total + seconds)
+
+    def names(self) -> set:
+        with self._lock:
+            return set(self._sections)
+
+    def report(self) -> str:
+        with self._lock:
+            sections = dict(self._sections)
+        lines = ['Startup timing:']
+        for name, (count, total) in sections.items():
+            suffix = f' ({count} calls)' if count > 1 else ''
+            lines.append(f'  {name:<40} {total * 1000:10.1f} ms{suffix}')
+        lines.append(f'  {"total since start":<40} {(time.perf_counter() - self.started) * 1000:10.1f} ms')
+        return '\n'.join(lines)
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,170 @@
+import math
+import threading
+import time
+
+from .persona import current_persona
+from .rng import current_stream
+
+MAX_STRETCH = 4.0  # Heavy-tailed draws are capped at this multiple of the upper bound
+DEFAULT_SIGMA = 0.5
+DEFAULT_ALPHA = 2.0
+
+# Relative activity by hour of day; think times are divided by it, so busy hours run faster
+DIURNAL_PRESETS = {
+    'flat': [1.0] * 24,
+    'office': [0.2, 0.1, 0.1, 0.1, 0.1, 0.2, 0.3, 0.6, 1.0, 1.2, 1.2, 1.1,
+               0.8, 1.0, 1.2, 1.2, 1.0, 0.7, 0.5, 0.4, 0.4, 0.3, 0.3, 0.2],
+}
+
+
+class Uniform(object):
+    """Uniform between the caller's bounds; the historical pyhuman behavior."""
+
+    def sample(self, low: float, high: float, rng) -> float:
+        return rng.uniform(low, high)
+
+
+class LogNormal(object):
+    """Log-normal with its median at the middle of the caller's bounds."""
+
+    def __init__(self, sigma: float = DEFAULT_SIGMA):
+        self.sigma = sigma
+
+    def sample(self, low: float, high: float, rng) -> float:
+        median = (low + high) / 2
+        return min(median * math.exp(rng.gauss(0, self.sigma)), high * MAX_STRETCH)
+
+
+class Pareto(object):
+    """Pareto starting at the lower bound (or the midpoint when it is 0), capped at MAX_STRETCH * high."""
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA):
+        self.alpha = alpha
+
+    def sample(self, low: float, high: float, rng) -> float:
+        scale = low if low > 0 else (low + high) / 2
+        return min(scale * rng.paretovariate(self.alpha), high * MAX_STRETCH)
+
+
+class Empirical(object):
+    """Resamples observed durations, rescaled so their mean lands on the middle of the bounds."""
+
+    def __init__(self, values: list):
+        if not values:
+            raise ValueError('Empirical distribution needs at least one value')
+        self.values = values
+        self.mean = sum(values) / len(values)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Empirical':
+        with open(path, encoding='utf-8') as f:
+            return cls([float(line) for line in f if line.strip()])
+
+    def sample(self, low: float, high: float, rng) -> float:
+        return rng.choice(self.values) * ((low + high) / 2) / self.mean if self.mean else 0.0
+
+
+def parse_distribution(spec: str):
+    """
+    Build a distribution from a command-line spec.
+
+    Forms: ``uniform``, ``lognormal[:SIGMA]``, ``pareto[:ALPHA]``, ``empirical:PATH`` where PATH
+    holds one observed duration per line.
+    """
+    kind, _, arg = spec.partition(':')
+    if kind == 'uniform':
+        return Uniform()
+    if kind == 'lognormal':
+        return LogNormal(float(arg) if arg else DEFAULT_SIGMA)
+    if kind == 'pareto':
+        return Pareto(float(arg) if arg else DEFAULT_ALPHA)
+    if kind == 'empirical' and arg:
+        return Empirical.from_file(arg)
+    raise ValueError(f"Invalid think time distribution '{spec}'")
+
+
+def parse_diurnal(spec: str) -> list:
+    """A preset name from DIURNAL_PRESETS or 24 comma-separated hourly activity levels."""
+    if spec in DIURNAL_PRESETS:
+        return DIURNAL_PRESETS[spec]
+    try:
+        curve = [float(v) for v in spec.split(',')]
+    except ValueError:
+        raise ValueError(f"Invalid diurnal curve '{spec}': expected a preset "
+                         f"({', '.join(DIURNAL_PRESETS)}) or 24 numbers") from None
+    if len(curve) != 24 or min(curve) <= 0:
+        raise ValueError('A diurnal curve needs 24 positive hourly values')
+    return curve
+
+
+class TimingModel(object):
+    """
+    Single source of every human delay: think times, dwell times and scheduler gaps.
+
+    A delay is drawn from the configured distribution within the caller's nominal bounds,
+    stretched by the current persona's speed factor and the diurnal curve, and slept after
+    dividing by the global compression factor. The diurnal curve follows a simulated clock
+    that also runs `compression` times faster than real time, so a compressed run sweeps
+    through a whole "workday".
+    """
+
+    def __init__(self):
+        self.distribution = Uniform()
+        self.compression = 1.0
+        self.diurnal = DIURNAL_PRESETS['flat']
+        self._real_start = time.time()
+        self._lock = threading.Lock()
+
+    def configure(self, distribution=None, compression: float = 1.0, diurnal: list | None = None) -> None:
+        if compression <= 0:
+            raise ValueError('Time compression must be positive')
+        with self._lock:
+            self.distribution = distribution or Uniform()
+            self.compression = compression
+            self.diurnal = diurnal or DIURNAL_PRESETS['flat']
+            self._real_start = time.time()
+
+    def simulated_time(self) -> float:
+        """Epoch time on the simulated clock, which runs `compression` times faster than real time."""
+        return self._real_start + (time.time() - self._real_start) * self.compression
+
+    def activity(self) -> float:
+        hour = time.localtime(self.simulated_time()).tm_hour
+        return self.diurnal[hour]
+
+    def delay(self, low: float, high: float, rng=None) -> float:
+        """Draw a simulated-time delay with nominal bounds [low, high], in seconds."""
+        persona = current_persona()
+        if rng is None:
+            rng = current_stream('timing')
+        speed = persona.speed if persona else 1.0
+        value = self.distribution.sample(low, high, rng) if high > low else float(low)
+        return max(value, 0.0) / (speed * self.activity())
+
+    def sleep(self, seconds: float) -> bool:
+        """
+        Sleep for `seconds` of simulated time.
+
+        Returns True if the current persona was asked to stop while sleeping.
+        """
+        real = seconds / self.compression
+        persona = current_persona()
+        if persona is not None:
+            return persona.wait(real)
+        time.sleep(real)
+        return False
+
+    def think(self, low: float, high: float, rng=None) -> bool:
+        """Draw a delay within [low, high] and sleep it; returns True if asked to stop."""
+        return self.sleep(self.delay(low, high, rng))
+
+
+timing = TimingModel()
+
+
+def think(low: float, high: float, rng=None) -> bool:
+    return timing.think(low, high, rng)
+
+
+def sleep(seconds: float) -> bool:
+    return timing.sleep(seconds)
@@ -1,17 +1,43 @@
 import os
 import getpass
+import threading
+import time
+from urllib.parse import urlsplit
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.driver_cache import DriverCacheManager
-from webdriver_manager.core.manager import DriverManager
-from webdriver_manager.drivers.chrome import ChromeDriver
 
 from .base_driver import BaseDriverHelper
+from .browser_pool import get_pool
+from .browser_profiles import acquire_profile, needs_trim, trim_held_profile
+from .driver_cache import resolve_chromedriver, settings as driver_settings
+from .launch_profiles import launch_arguments
+from .persona import persona_key
+from .startup_timer import startup_timer
 
 DRIVER_NAME = 'ChromeWebDriver'
 
+# Process-wide counters for cheap session resets versus full browser restarts
+session_stats = {'resets': 0, 'reset_failures': 0, 'reset_seconds_total': 0.0}
+_session_stats_lock = threading.Lock()
+
+
+def origin_of(url: str) -> str | None:
+    """Return the scheme://host[:port] origin of a URL, or None for non-http(s) URLs."""
+    parts = urlsplit(url or '')
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _install_chromedriver(cache_dir):
+    # webdriver-manager is only imported when the local driver cache misses
+    from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.driver_cache import DriverCacheManager
+
+    cache_manager = DriverCacheManager(cache_dir) if cache_dir else None
+    return ChromeDriverManager(cache_manager=cache_manager).install()
+
 
 class WebDriverHelper(BaseDriverHelper):
 
@@ -22,14 +48,14 @@ class WebDriverHelper(BaseDriverHelper):
         home_dir = os.path.expanduser(f"~{username}")
         use_tmp = not os.path.isdir(home_dir)
 
-        # Always create base Chrome options
+        # Always create base Chrome options, plus those of the selected launch profile
         self.options = webdriver.ChromeOptions()
-        self.options.add_argument('--disable-gpu')
-        self.options.add_argument('--ignore-certificate-errors')
-        self.options.add_argument('--start-maximized')
-        self.options.add_argument('--disable-infobars')
+        for argument in launch_arguments():
+            self.options.add_argument(argument)
 
-        cache_manager = None  # default
+        wdm_cache_dir = None  # webdriver-manager default
+        self.profile_dir = None  # None = Chrome's throwaway profile
+        driver_cache_dir = os.path.join(home_dir, '.cache', 'pyhuman')
 
         if use_tmp:
             base_dir = f"/tmp/chrome-profile-{username}"
@@ -47,39 +73,105 @@ class WebDriverHelper(BaseDriverHelper):
             os.environ["XDG_CACHE_HOME"] = xdg_cache_dir
             os.environ["XDG_CONFIG_HOME"] = xdg_config_dir
 
-            # Add user-data-dir argument if use_tmp
-            self.options.add_argument(f'--user-data-dir={base_dir}')
+            # Use a user-data-dir if use_tmp (a managed profile below takes precedence); one per
+            # persona, since Chrome refuses a user-data-dir that another Chrome is using
+            self.profile_dir = os.path.join(base_dir, 'profiles', persona_key() or 'default')
 
             # Use custom cache manager
-            cache_manager = DriverCacheManager(cache_dir)
-
-        self._driver_path = ChromeDriverManager(
-            cache_manager=cache_manager).install()
+            wdm_cache_dir = cache_dir
+            driver_cache_dir = cache_dir
+
+        # A persistent per-persona profile keeps the HTTP cache, TLS sessions and cookies
+        # (e.g. the Shibboleth IdP session) across restarts of human.py
+        managed_profile = acquire_profile(persona_key())
+        if managed_profile:
+            self.profile_dir = managed_profile
+        # A browser with its own user-data-dir cannot have a warm spare launched on the same directory
+        self.exclusive_profile = self.profile_dir is not None
+        if self.profile_dir:
+            self.options.add_argument(f'--user-data-dir={self.profile_dir}')
+
+        with startup_timer.section('chromedriver resolution'):
+            self._driver_path = resolve_chromedriver(
+                driver_cache_dir, install=lambda: _install_chromedriver(wdm_cache_dir),
+                override=driver_settings['chromedriver'], offline=driver_settings['offline'])
         self._driver = None
 
     @property
     def driver(self):
         if self._driver is None:
-            self._driver = webdriver.Chrome(service=Service(
-                self._driver_path), options=self.options)
+            self._driver = get_pool().checkout(self.pool_key, self._launch, exclusive=self.exclusive_profile)
         return self._driver
 
+    @property
+    def pool_key(self):
+        # Browsers are only shared between helpers that would launch them identically
+        return self._driver_path, tuple(self.options.arguments)
+
     def stop_browser(self):
         if self._driver == None:
             return
-        self._driver.quit()
+        get_pool().checkin(self.pool_key, self._driver, discard=True)
         self._driver = None
+        # An exclusive profile's browser has quit by now, so Chrome is not writing its cache
+        trim_held_profile(self.profile_dir)
+
+    def reset_session(self, origins=None) -> bool:
+        """
+        Log out cheaply by wiping cookies and site storage instead of restarting Chrome.
+
+        Clears every cookie in the browser (including the Shibboleth IdP session cookie) over
+        CDP, then clears storage for the current page's origin and any extra `origins` (e.g. the
+        IdP origin seen at the login page). If anything fails, falls back to stop_browser(). The
+        browser is also stopped when its persistent profile has outgrown its size cap, since the
+        cache can only be trimmed while Chrome is not running.
+
+        Args:
+            origins (iterable, optional): Additional origins whose storage should be cleared.
+
+        Returns:
+            bool: True if the session was reset in place, False if the browser was restarted.
+        """
+        if self._driver is None:
+            return True
+        if needs_trim(self.profile_dir):
+            print("... Browser profile over its size cap, restarting browser to trim it")
+            self.stop_browser()
+            return False
+        start = time.monotonic()
+        try:
+            targets = {origin_of(self._driver.current_url)} | set(origins or [])
+            self._driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            for origin in filter(None, targets):
+                self._driver.execute_cdp_cmd('Storage.clearDataForOrigin',
+                                             {'origin': origin, 'storageTypes': 'all'})
+            self._driver.get('about:blank')
+        except Exception as e:
+            print(f"... Session reset failed, restarting browser: {e}")
+            with _session_stats_lock:
+                session_stats['reset_failures'] += 1
+            self.stop_browser()
+            return False
+        elapsed = time.monotonic() - start
+        with _session_stats_lock:
+            session_stats['resets'] += 1
+            session_stats['reset_seconds_total'] += elapsed
+        print(f"... Session reset in {elapsed:.2f}s")
+        return True
 
     def restart_browser(self):
-        self._driver.quit()
-        self._driver = webdriver.Chrome(
-            self._driver_path, options=self.options)
+        self.stop_browser()
+        return self.driver
 
     def cleanup(self):
-        self._driver.quit()
+        # Through the pool, so its count of live browsers stays right and the profile is trimmed
+        self.stop_browser()
 
     """ PRIVATE """
 
+    def _launch(self):
+        return webdriver.Chrome(service=Service(self._driver_path), options=self.options)
+
     def check_valid_driver_connection(self):
         try:
             driver = webdriver.Chrome(self._driver_path)
@@ -0,0 +1,104 @@
+import ast
+import sys
+import threading
+import time
+from importlib import import_module
+
+from .startup_timer import startup_timer
+
+MANIFEST_FIELDS = ('WORKFLOW_NAME', 'WORKFLOW_DESCRIPTION')
+
+# When set, the first load of each workflow prints its import cost, and the startup timing
+# report again if loading it timed a new phase (e.g. chromedriver resolution)
+profile_imports = False
+
+
+def read_manifest(path: str) -> dict:
+    """
+    Read a workflow module's WORKFLOW_NAME/WORKFLOW_DESCRIPTION without importing it.
+
+    Only top-level assignments of string constants are considered; anything else is ignored.
+
+    Args:
+        path (str): Path to the workflow's .py file.
+
+    Returns:
+        dict: The manifest fields that were found.
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    manifest = {}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or not isinstance(node.value, ast.Constant):
+            continue
+        for target in node.targets:
+            if isinstance(target, ast.Name) and target.id in MANIFEST_FIELDS:
+                manifest[target.id] = node.value.value
+    return manifest
+
+
+class LazyWorkflow(object):
+    """
+    Stand-in for a workflow that imports its module and calls load() on first use.
+
+    Exposes the BaseWorkflow interface (`name`, `description`, `display`, `action`, `cleanup`)
+    from the manifest, so the scheduler can list and pick workflows that are never imported.
+    """
+
+    def __init__(self, module: str, name: str, description: str):
+        self.module = module
+        self.name = name
+        self.description = description
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def display(self):
+        return 'Running Task: {}'.format(self.description)
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    @property
+    def instance(self):
+        """The real workflow object, importing the module and calling its load() if needed."""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._load()
+        return self._instance
+
+    def action(self, extra=None):
+        return self.instance.action(extra)
+
+    def cleanup(self):
+        if self._instance is not None:
+            self._instance.cleanup()
+
+    """ PRIVATE """
+
+    def _load(self):
+        before = set(sys.modules)
+        sections = startup_timer.names()
+        start = time.perf_counter()
+        workflow = getattr(import_module(self.module), 'load')()
+        elapsed = time.perf_counter() - start
+        if profile_imports:
+            new = sorted({m.split('.')[0] for m in set(sys.modules) - before} - {'app'})
+            print(f'Loaded workflow {self.module} in {elapsed * 1000:.1f} ms'
+                  f' ({len(set(sys.modules) - before)} new modules; packages: {", ".join(new) or "none"})')
+            if startup_timer.names() - sections:
+                print(startup_timer.report())
+        return workflow
+
+
+def workflow_key(workflow) -> str:
+    """The module name a workflow was loaded from (e.g. 'moodle'), as used by --workflows."""
+    module = getattr(workflow, 'module', None) or type(workflow).__module__
+    return module.rsplit('.', 1)[-1]
+
+
+def resolve_workflow(workflow):
+    """Return the real workflow object behind a LazyWorkflow, or the argument unchanged."""
+    return workflow.instance if isinstance(workflow, LazyWorkflow) else workflow
@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from .workflow_registry import workflow_key
+
+SLOT_POLL_SECONDS = 0.5
+SLOT_TIMEOUT_SECONDS = 300  # longest slot() waits when nothing can stop it
+
+
+def parse_assignments(specs: list, what: str, cast=float) -> dict:
+    """Parse NAME=VALUE pairs from the command line, e.g. ``moodle=3``."""
+    values = {}
+    for spec in specs or []:
+        name, sep, value = spec.partition('=')
+        if not sep or not name:
+            raise ValueError(f"Invalid {what} '{spec}', expected NAME=VALUE")
+        try:
+            values[name] = cast(value)
+        except ValueError:
+            raise ValueError(f"Invalid {what} '{spec}', value must be a number") from None
+        if values[name] < 0:
+            raise ValueError(f"Invalid {what} '{spec}', value must not be negative")
+    return values
+
+
+def load_mix(path: str) -> dict:
+    """
+    Read a workflow mix file.
+
+    The file is a JSON object with optional "weights" ({NAME: weight}), "transitions"
+    ({FROM: {TO: weight}}) and "concurrency" ({NAME: max running}) members. Names are module
+    names (``moodle``) or WORKFLOW_NAMEs (``Moodle``).
+    """
+    with open(path, encoding='utf-8') as f:
+        mix = json.load(f)
+    unknown = set(mix) - {'weights', 'transitions', 'concurrency'}
+    if unknown:
+        raise ValueError(f"Unknown workflow mix sections: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def _lookup(table: dict, workflow, default=None):
+    """Look a workflow up by module name first, then by WORKFLOW_NAME."""
+    key = workflow_key(workflow)
+    if key in table:
+        return table[key]
+    return table.get(workflow.name, default)
+
+
+class WorkflowSelector(object):
+    """
+    Chooses the next workflow and limits how many of each run at once.
+
+    Without configuration every workflow is equally likely, as before. Weights make some
+    workflows more frequent than others; a transition row for the previous workflow (a Markov
+    chain, e.g. ShibbolethBrowser -> Moodle -> DownloadFiles) replaces the weights for the next
+    pick. Concurrency caps are shared by all personas in the process: a capped workflow is
+    skipped while it is at its limit, and slot() waits for a free slot when it is picked anyway.
+    """
+
+    def __init__(self):
+        self.weights = {}
+        self.transitions = {}
+        self.caps = {}
+        self._running = {}
+        self._cond = threading.Condition()
+
+    def configure(self, weights: dict | None = None, transitions: dict | None = None,
+                  caps: dict | None = None) -> None:
+        self.weights = dict(weights or {})
+        self.transitions = dict(transitions or {})
+        caps = {name: int(cap) for name, cap in (caps or {}).items()}
+        invalid = sorted(name for name, cap in caps.items() if cap < 1)
+        if invalid:
+            raise ValueError(f"Invalid workflow concurrency for {', '.join(invalid)}: must be at least 1")
+        self.caps = caps
+
+    def weight(self, workflow, previous=None) -> float:
+        """Relative likelihood of `workflow` following `previous` (None at the start of a chain)."""
+        if previous is not None:
+            row = _lookup(self.transitions, previous)
+            if row is not None:
+                return float(_lookup(row, workflow, 0.0))
+        return float(_lookup(self.weights, workflow, 1.0))
+
+    def choose(self, workflows: list, rng, previous=None):
+        """
+        Pick the next workflow.
+
+        Workflows at their concurrency cap are avoided while any other candidate exists. If
+        the previous workflow's transition row leaves nothing to choose, the plain weights
+        are used instead.
+        """
+        with self._cond:
+            free = [w for w in workflows if not self._at_cap(w)] or workflows
+        for prior in ([previous, None] if previous is not None else [None]):
+            weights = [self.weight(w, prior) for w in free]
+            if sum(weights) > 0:
+                return rng.choices(free, weights=weights)[0]
+        return rng.choice(free)
+
+    @contextmanager
+    def slot(self, workflow, stop_event: threading.Event | None = None, timeout: float | None = None):
+        """
+        Hold one of the workflow's concurrency slots while the block runs.
+
+        Yields False without running anything extra if `stop_event` is set, or `timeout` seconds
+        pass, while waiting. Without a stop event the wait is bounded by SLOT_TIMEOUT_SECONDS.
+        """
+        if timeout is None and stop_event is None:
+            timeout = SLOT_TIMEOUT_SECONDS
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        key = workflow_key(workflow)
+        acquired = False
+        with self._cond:
+            while self._at_cap(workflow):
+                if stop_event is not None and stop_event.is_set():
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                self._cond.wait(SLOT_POLL_SECONDS)
+            else:
+                self._running[key] = self._running.get(key, 0) + 1
+                acquired = True
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with self._cond:
+                    self._running[key] -= 1
+                    self._cond.notify_all()
+
+    def running(self) -> dict:
+        with self._cond:
+            return {k: v for k, v in self._running.items() if v}
+
+    """ PRIVATE """
+
+    def _at_cap(self, workflow) -> bool:
+        cap = _lookup(self.caps, workflow)
+        return cap is not None and self._running.get(workflow_key(workflow), 0) >= cap
+
+
+selector = WorkflowSelector()
@@ -1,9 +1,8 @@
-from time import sleep
-import random
 import ssl
 import socket
 
 from ..utility.metric_workflow import MetricWorkflow
+from ..utility.timing import timing
 from ..utility.webdriver_helper import WebDriverHelper
 from selenium.webdriver.common.by import By
 
@@ -126,7 +125,7 @@ class IISBrowse(MetricWorkflow):
 
         # Navigate to the secure service page
         self.driver.driver.get('https://iis.castle.project1.os/')
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        timing.think(MIN_WAIT_TIME, MAX_WAIT_TIME)
 
         # Attempt to locate the secured content on the post-login page
         print("... Checking that page loaded with certificate ")
@@ -1,10 +1,10 @@
-from time import sleep
-import random
 
 # from soupsieve import select
 
 from ..utility.metric_workflow import MetricWorkflow
-from ..utility.webdriver_helper import WebDriverHelper
+from ..utility.timing import timing
+from ..utility.webdriver_helper import WebDriverHelper, origin_of
+from ..utility.rng import rng
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
 
@@ -47,6 +47,7 @@ class ShibbolethBrowse(MetricWorkflow):
         super().__init__(name=WORKFLOW_NAME, description=WORKFLOW_DESCRIPTION, driver=driver)
         self.username = None
         self.password = None
+        self.idp_origin = None
 
     def action(self, extra=None):
         """
@@ -96,9 +97,11 @@ class ShibbolethBrowse(MetricWorkflow):
 
         # Navigate to the secure service page
         self.driver.driver.get('https://service.project1.os/secure/index.html')
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        timing.think(MIN_WAIT_TIME, MAX_WAIT_TIME)
 
         try:
+            # Remember the IdP origin we were redirected to so logout can clear its storage
+            self.idp_origin = origin_of(self.driver.driver.current_url) or self.idp_origin
             login_page_integrity = self.check_integrity()
             # Attempt to locate and fill in the username field
             print(f"... Trying to enter username '{self.username}'")
@@ -109,7 +112,7 @@ class ShibbolethBrowse(MetricWorkflow):
                     "password", message="could not find username field", integrity=login_page_integrity)
                 return err
             search_element.send_keys(self.username)
-            sleep(1)
+            timing.sleep(1)
 
             # Attempt to locate and fill in the password field
             print(f"... Trying to enter password '{self.password}'")
@@ -124,12 +127,12 @@ class ShibbolethBrowse(MetricWorkflow):
 
             self.log_step_success("password", integrity=login_page_integrity)
 
-            sleep(1)
+            timing.sleep(1)
 
             # Attempt to locate and click the login button
             self.log_step_start("login-button")
             print("... Trying to click login")
-            sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+            timing.think(MIN_WAIT_TIME, MAX_WAIT_TIME)
             search_element = self.driver.driver.find_element(
                 By.TAG_NAME, 'button')
             if search_element is None:
@@ -140,7 +143,7 @@ class ShibbolethBrowse(MetricWorkflow):
             ActionChains(self.driver.driver).move_to_element(
                 search_element).click(search_element).perform()
             # Temporarily delay to allow the secure page to load
-            sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+            timing.think(MIN_WAIT_TIME, MAX_WAIT_TIME)
 
         except Exception:
             # If any element is missing, assume we may already be logged in
@@ -173,8 +176,8 @@ class ShibbolethBrowse(MetricWorkflow):
                                 integrity=secure_page_integrity)
 
         # Occasionally log out for realism
-        if random.random() < 0.2:
-            sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        if rng.random() < 0.2:
+            timing.think(MIN_WAIT_TIME, MAX_WAIT_TIME)
             print("... Decided to log out")
             try:
                 search_element = self.driver.driver.find_element(
@@ -187,8 +190,8 @@ class ShibbolethBrowse(MetricWorkflow):
                         search_element).click(search_element).perform()
                 else:
                     print("... Could not find logout link")
-            print("... Stopping browser to force logout")
-            self.driver.stop_browser()
+            print("... Resetting browser session to force logout")
+            self.driver.reset_session(origins=[self.idp_origin])
         else:
             print("... Decided not to log out")
 
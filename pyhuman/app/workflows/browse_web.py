@@ -1,13 +1,13 @@
 import os
-import random
-from time import sleep
 
+from ..utility.timing import timing
 from ..utility.webdriver_helper import WebDriverHelper
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import WebDriverException
 from selenium.common.exceptions import InvalidArgumentException
 from selenium.common.exceptions import TimeoutException
 from ..utility.metric_workflow import MetricWorkflow
+from ..utility.rng import rng
 
 WORKFLOW_NAME = 'WebBrowser'
 WORKFLOW_DESCRIPTION = 'Select a random website and browse'
@@ -42,12 +42,12 @@ class WebBrowse(MetricWorkflow):
     def _web_browse(self):
         self.driver.driver.set_page_load_timeout(self.default_timeout)
         self._browse(self._get_random_website())
-        sleep(random.randint(1, self.max_sleep_time))
+        timing.think(1, self.max_sleep_time)
         self._navigate_website()
 
     def _get_random_website(self):
         # Get a random website from the list of websites
-        return random.choice(self.website_list)
+        return rng.choice(self.website_list)
 
     def _browse(self, random_website):
         print("Browsing to", random_website.rstrip())
@@ -71,7 +71,7 @@ class WebBrowse(MetricWorkflow):
 
     def _navigate_website(self):
         # Browse the currently loaded website with a random amount of clicks
-        navigation_clicks = random.randrange(0, self.max_navigation_clicks)
+        navigation_clicks = rng.randrange(0, self.max_navigation_clicks)
         for num_click in range(1, navigation_clicks):
             clickables = self.driver.driver.find_elements(By.TAG_NAME, ("a"))
             # If there's nothing to click, stop navigating this page
@@ -80,7 +80,7 @@ class WebBrowse(MetricWorkflow):
                 return
             # Navigate to a random url on the page
             else:
-                clickable = random.choice(clickables)
+                clickable = rng.choice(clickables)
                 url = clickable.get_attribute("href")
                 if url is None:
                     print(f"... {num_click}. Invalid URL ")
@@ -88,7 +88,7 @@ class WebBrowse(MetricWorkflow):
                 try:
                     self.driver.driver.get(url)
                     print(f"... {num_click}. Navigated to {url}")
-                    sleep(random.randint(1, self.max_sleep_time))
+                    timing.think(1, self.max_sleep_time)
                 except TimeoutException as error:
                     print(f"Timeout loading {url.rstrip()}: {error}")
                 except InvalidArgumentException as error:
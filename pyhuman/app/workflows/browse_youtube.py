@@ -1,11 +1,11 @@
-from time import sleep
 import os
-import random
 
 # from soupsieve import select
 
 from ..utility.base_workflow import BaseWorkflow
+from ..utility.timing import timing
 from ..utility.webdriver_helper import WebDriverHelper
+from ..utility.rng import rng
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
@@ -48,14 +48,14 @@ class YoutubeSearch(BaseWorkflow):
 
         # Navigate to youtube
         self.driver.driver.get('https://www.youtube.com')
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        timing.think(MIN_WAIT_TIME, MAX_WAIT_TIME)
 
         # Perform a youtube search
         search_element = self.driver.driver.find_element(
             By.CSS_SELECTOR, 'input#search')  # search bar
         search_element.send_keys(random_search)
         search_element.submit()
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        timing.think(MIN_WAIT_TIME, MAX_WAIT_TIME)
 
         # Click on a random video from the search results
         WebDriverWait(self.driver.driver, 10).until(
@@ -64,22 +64,22 @@ class YoutubeSearch(BaseWorkflow):
         attempts = 0
         while attempts < 10:
             try:
-                search_results[random.randrange(
+                search_results[rng.randrange(
                     0, len(search_results)-1)].click()
                 attempts = 10
             except Exception:
                 attempts += 1
                 print("... Failed to click, retrying.")
 
-        sleep(random.randrange(MIN_WATCH_TIME, MAX_WATCH_TIME))
+        timing.think(MIN_WATCH_TIME, MAX_WATCH_TIME)
 
         # Click on a random video from the suggested videos
-        for _ in range(0, random.randrange(0, MAX_SUGGESTED_VIDEOS)):
-            sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        for _ in range(0, rng.randrange(0, MAX_SUGGESTED_VIDEOS)):
+            timing.think(MIN_WAIT_TIME, MAX_WAIT_TIME)
             suggested_videos = self.driver.driver.find_elements(
                 By.ID, "video-title")
             try:
-                suggested_videos[random.randrange(
+                suggested_videos[rng.randrange(
                     0, len(suggested_videos)-1)].click()
             except ElementNotInteractableException:
                 pass
@@ -87,7 +87,7 @@ class YoutubeSearch(BaseWorkflow):
                 pass
 
     def _get_random_search(self):
-        search_term = random.choice(self._load_search_list()).rstrip('\n')
+        search_term = rng.choice(self._load_search_list()).rstrip('\n')
         return search_term
 
     @staticmethod
@@ -1,35 +1,45 @@
-import random
+import os
 import re
+import shlex
+from ..utility.artifact_store import get_store
 from ..utility.human_typer import HumanTyperShell
-from ..utility.shell_interact import run_shell_commands_with_checks
+from ..utility.shell_interact import StreamingCheck, run_shell_commands_with_checks
 from ..utility.metric_workflow import MetricWorkflow
+from ..utility.rng import rng
 
 
 WORKFLOW_NAME = 'BuildSoftware'
 WORKFLOW_DESCRIPTION = 'Pick a random piece of software, download it, install prereqs, and build the software'
 
+# Build logs can run to tens of MB; checks see the start and end, the full log is gzipped into the workspace
+OUTPUT_HEAD_BYTES = 256 * 1024
+OUTPUT_TAIL_BYTES = 1024 * 1024
+
+# Output that means a step has failed, whatever its success pattern; seen while the step runs,
+# so e.g. a failing ./configure is interrupted and retried at once
+BUILD_FAILURE = r"configure: error:|make(?:\[\d+\])?: \*\*\* |^fatal: |^ERROR \d{3}: |^curl: \(\d+\)"
+
+# A step is interrupted, and the build abandoned, if it runs this long or this long without printing anything
+STEP_TIMEOUT = 1800
+STEP_INACTIVITY_TIMEOUT = 90
+
 # Define basic success check using regex
 
 
-def basic_success(pattern): return lambda task, output, fail_count: (
-    "success"
-    if re.search(pattern, output)
-    else ("retry" if fail_count < 2 else "fail")
-)
+def basic_success(pattern): return StreamingCheck(pattern, failure=BUILD_FAILURE)
 
 
 def cmds(blocks):
     def get_check(p):
         return basic_success(p) if isinstance(p, str) else p
-    return [[{"command": c, "check": get_check(p)} for c, p in group] for group in blocks]
+    return [[{"command": c, "check": get_check(p), "timeout": STEP_TIMEOUT,
+              "inactivity_timeout": STEP_INACTIVITY_TIMEOUT} for c, p in group] for group in blocks]
 
 # Example check function for tar-based build
 
 
 def tarball_check_contains(string):
-    def check(task, output, fail_count):
-        return "success" if string in output else ("retry" if fail_count < 2 else "fail")
-    return check
+    return StreamingCheck(re.escape(string), failure=BUILD_FAILURE)
 
 
 # Software project definitions
@@ -158,17 +168,28 @@ class BuildSoftware(MetricWorkflow):
     """ PRIVATE """
 
     def build_software(self):
-        shell = HumanTyperShell(live_echo=True, prompt_timeout=180.0)
+        # Source trees and build outputs go in a fresh workspace of the persona's artifact store,
+        # which deletes old builds once the store is over its disk quota
+        store = get_store()
+        workspace = store.new_workspace(WORKFLOW_NAME)
+        shell = HumanTyperShell(live_echo=True, prompt_timeout=180.0,
+                                output_head_bytes=OUTPUT_HEAD_BYTES, output_tail_bytes=OUTPUT_TAIL_BYTES,
+                                transcript_dir=os.path.join(workspace, 'transcripts'))
         try:
-            # for testing a particular software build.
-            # chosen_projects = [ software_projects[10] ]
-            chosen_projects = random.sample(
-                software_projects, k=random.randint(1, 2))
-            for task_group in chosen_projects:
-                run_shell_commands_with_checks(
-                    shell, task_group, step_logger=self)
+            with store.using(workspace):
+                # for testing a particular software build.
+                # chosen_projects = [ software_projects[10] ]
+                chosen_projects = rng.sample(
+                    software_projects, k=rng.randint(1, 2))
+                for task_group in chosen_projects:
+                    # Each project starts from the workspace, not the previous project's directory; typed
+                    # outside the checked steps so their names (and step metrics) keep their numbering
+                    shell.type_command("cd " + shlex.quote(workspace))
+                    run_shell_commands_with_checks(
+                        shell, task_group, step_logger=self)
         finally:
             shell.close()
+            store.add(workspace, WORKFLOW_NAME)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,13 @@
-import os
-import ssl
-import urllib.request
 import json
-import random
-import requests
-import tempfile
-from bs4 import BeautifulSoup
-from random import choice
-from time import sleep
+import posixpath
 
+from ..utility.artifact_store import get_store
 from ..utility.base_workflow import BaseWorkflow
+from ..utility.content_mirror import mirror_catalog, mirror_url
+from ..utility.download_engine import DownloadError, get_engine
+from ..utility.link_extractor import LinkExtractor
+from ..utility.rng import rng
+from ..utility.timing import timing
 
 
 WORKFLOW_NAME = 'DownloadFiles'
@@ -36,60 +34,98 @@ class DownloadFiles(BaseWorkflow):
     def _download_files(self):
         random_function_selector = [self._download_xkcd,
                                     self._download_wikipedia, self._download_nist]
-        directory = tempfile.gettempdir()
-        random.choice(random_function_selector)(directory)
-        sleep(self.input_wait_time)
-
-    def _download_wikipedia(self, directory):
+        # Downloads land in this persona's artifact store, which keeps them under its disk quota
+        store = get_store()
+        if mirror_url():
+            self._download_mirrored(store)
+        else:
+            rng.choice(random_function_selector)(store)
+        timing.sleep(self.input_wait_time)
+
+    def _download_wikipedia(self, store):
+        engine = get_engine()
         url = "https://en.wikipedia.org/wiki/Special:Random"
+        file_name = "wiki" + str(rng.randint(1, 100000)) + ".html"
         try:
-            request = requests.get(url, verify=False)
-        except urllib.error.URLError:
+            # The article is streamed to disk; its images, scripts and stylesheets are fetched concurrently.
+            # Its name is random, so nothing would resume a failed part: fetch_page() removes it
+            page, assets = engine.run(engine.fetch_page(url, path=store.path_for(file_name)))
+        except DownloadError as e:
+            print(e)
             return
-        file_name = "wiki" + str(random.randint(1, 100000)) + ".html"
-        open(os.path.join(directory, file_name), 'wb').write(request.content)
+        store.add(store.path_for(file_name), WORKFLOW_NAME)
+        print(f"... Fetched {page.url} and {len(assets)} assets over {page.http_version}")
 
-    def _download_xkcd(self, directory):
-        # Disable certificate verification. Will display warning when run.
-        ssl._create_default_https_context = ssl._create_unverified_context
+    def _download_xkcd(self, store):
+        engine = get_engine()
         xkcd_url = "https://xkcd.com/" + \
-            str(random.randint(1, 1000)) + "/info.0.json"
-        try:
-            request = urllib.request.urlopen(xkcd_url)
-        except urllib.error.URLError:
-            return
-        pic_url = json.load(request)['img']
-        pic_name = pic_url.split("https://imgs.xkcd.com/comics/", 1)[1]
+            str(rng.randint(1, 1000)) + "/info.0.json"
         try:
-            urllib.request.urlretrieve(
-                pic_url, os.path.join(directory, pic_name))
-        except urllib.error.URLError:
+            pic_url = json.loads(engine.run(engine.fetch(xkcd_url)).content)['img']
+            pic_name = pic_url.split("https://imgs.xkcd.com/comics/", 1)[1]
+            engine.run(engine.download(pic_url, store.path_for(pic_name)))
+        except (DownloadError, ValueError, KeyError, IndexError) as e:
+            print(e)
             return
+        store.add(store.path_for(pic_name), WORKFLOW_NAME)
 
-    def _download_nist(self, directory):
+    def _download_nist(self, store):
+        engine = get_engine()
         # Get random page of NIST search results
         nist_search_url = "https://www.nist.gov/publications/search?k=&t=&a=&ps=All&n=&d[min]=&d[max]=&page=" + str(
-            random.randint(1, 2000))
-        nist_search_request = requests.get(nist_search_url).text
-        nist_search_soup = BeautifulSoup(nist_search_request, features="lxml")
-        publications_links = (
-            nist_search_soup.select('a[href^="/publications"]'))
+            rng.randint(1, 2000))
+        # Search and publication pages are parsed as they stream in, keeping only matching anchors
+        publications_links = LinkExtractor(href_prefix="/publications")
+        try:
+            engine.run(engine.stream(nist_search_url, publications_links.feed))
+        except DownloadError as e:
+            print(e)
+            return
+        if len(publications_links.anchors) < 2:
+            return
 
         # Download random publication from the NIST search page
-        random_publication = choice(publications_links[1:])
-        publication_url = "https://www.nist.gov" + \
-            random_publication.get('href')
-        publication_page_text = requests.get(publication_url).text
-        publication_page_soup = BeautifulSoup(
-            publication_page_text, features="lxml")
-        publication_download_link = publication_page_soup.find(
-            'a', href=True, text='Local Download')
-        if publication_download_link is not None:
-            file_url = (publication_download_link.get('href'))
+        random_publication = rng.choice(publications_links.anchors[1:])
+        publication_url = "https://www.nist.gov" + random_publication.href
+        download_links = LinkExtractor(text="Local Download", limit=1)
+        try:
+            engine.run(engine.stream(publication_url, download_links.feed))
+        except DownloadError as e:
+            print(e)
+            return
+        if download_links.anchors:
+            file_url = download_links.anchors[0].href
             file_name = publication_url.split(
                 "https://www.nist.gov/publications/", 1)[1] + ".pdf"
             try:
-                urllib.request.urlretrieve(
-                    file_url,  os.path.join(directory, file_name))
-            except urllib.error.URLError:
+                engine.run(engine.download(file_url, store.path_for(file_name)))
+            except DownloadError as e:
+                print(e)
                 return
+            store.add(store.path_for(file_name), WORKFLOW_NAME)
+
+    def _download_mirrored(self, store):
+        # Same sources, served from a local content mirror (see app.utility.content_mirror)
+        engine = get_engine()
+        try:
+            catalog = mirror_catalog()
+        except (DownloadError, ValueError) as e:
+            print(f"... Mirror catalog unavailable: {e}")
+            return
+        if not catalog:
+            return
+        entry = rng.choice(catalog[rng.choice(sorted(catalog))])
+        url = mirror_url() + entry['path'].lstrip('/')
+        file_name = posixpath.basename(entry['path'].split('?')[0]) or "index"
+        try:
+            if 'html' in entry['content_type']:
+                if not file_name.endswith(".html"):
+                    file_name += ".html"
+                page, assets = engine.run(engine.fetch_page(url, path=store.path_for(file_name)))
+                print(f"... Fetched {page.url} and {len(assets)} assets from the mirror")
+            else:
+                engine.run(engine.download(url, store.path_for(file_name)))
+        except DownloadError as e:
+            print(e)
+            return
+        store.add(store.path_for(file_name), WORKFLOW_NAME)
@@ -1,10 +1,10 @@
 import traceback
-from time import sleep
 import os
-import random
 
 from ..utility.base_workflow import BaseWorkflow
+from ..utility.timing import timing
 from ..utility.webdriver_helper import WebDriverHelper
+from ..utility.rng import rng
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -42,21 +42,21 @@ class GoogleSearch(BaseWorkflow):
             # Navigate to google.com
             self.driver.driver.get('https://www.google.com')
             assert 'Google' in self.driver.driver.title
-            sleep(DEFAULT_WAIT_TIME)
+            timing.think(DEFAULT_WAIT_TIME, DEFAULT_WAIT_TIME)
 
             # Randomly choose whether to google a search term or click lucky button
-            chosen_action = random.choice(["search-term", "lucky"])
+            chosen_action = rng.choice(["search-term", "lucky"])
 
             if chosen_action == "search-term":
                 self._google_search(random_search)
-                sleep(DEFAULT_WAIT_TIME)
+                timing.think(DEFAULT_WAIT_TIME, DEFAULT_WAIT_TIME)
                 self._browse_search_results()
-                sleep(DEFAULT_WAIT_TIME)
+                timing.think(DEFAULT_WAIT_TIME, DEFAULT_WAIT_TIME)
                 self._click_on_search_result()
             elif chosen_action == "lucky":
                 self._hover_click_feeling_lucky()
 
-            sleep(DEFAULT_WAIT_TIME)
+            timing.think(DEFAULT_WAIT_TIME, DEFAULT_WAIT_TIME)
             # Randomly navigate on the current website
             self._navigate_webpage()
 
@@ -77,7 +77,7 @@ class GoogleSearch(BaseWorkflow):
     def _browse_search_results(self):
         # Click through search result pages
         print(".... Browsing search results")
-        for _ in range(0, random.randint(0, MAX_PAGES)):
+        for _ in range(0, rng.randint(0, MAX_PAGES)):
 
             # google doesn't have a next button anymore.  just infinit scroll
             # next_button = WebDriverWait(self.driver.driver, 30).until(EC.visibility_of_any_elements_located((By.LINK_TEXT, "Next")))[0]
@@ -85,13 +85,13 @@ class GoogleSearch(BaseWorkflow):
 
             self.driver.driver.execute_script(
                 "window.scrollTo(0, document.body.scrollHeight)")
-            sleep(DEFAULT_WAIT_TIME)
+            timing.think(DEFAULT_WAIT_TIME, DEFAULT_WAIT_TIME)
 
     def _google_search(self, random_search):
         print(".... Googling:", random_search.rstrip())
         elem = self.driver.driver.find_element(By.NAME, 'q')
         elem.clear()
-        sleep(self.input_wait_time)
+        timing.think(self.input_wait_time, self.input_wait_time)
         elem.send_keys(random_search)
         self.driver.driver.execute_script(
             "window.scrollTo(0, document.body.Height)")
@@ -105,14 +105,14 @@ class GoogleSearch(BaseWorkflow):
 
     def _navigate_webpage(self):
         # Navigate webpage
-        navigation_clicks = random.randrange(0, MAX_NAVIGATION_CLICKS)
+        navigation_clicks = rng.randrange(0, MAX_NAVIGATION_CLICKS)
         print(".... Navigating and highlighting web page",
               navigation_clicks, "times")
         for _ in range(0, navigation_clicks):
             clickables = self.driver.driver.find_elements(By.TAG_NAME, ("a"))
             if len(clickables) == 0:
                 return
-            clickable = random.choice(clickables)
+            clickable = rng.choice(clickables)
             try:
                 self._highlight(clickable)
                 self.driver.driver.execute_script(
@@ -124,7 +124,7 @@ class GoogleSearch(BaseWorkflow):
                 pass
 
     def _get_random_search(self):
-        return random.choice(self.search_list)
+        return rng.choice(self.search_list)
 
     def _highlight(self, element):
         driver = element._parent
@@ -134,7 +134,7 @@ class GoogleSearch(BaseWorkflow):
                                   element, s)
         original_style = element.get_attribute('style')
         apply_style("border: 10px solid red;")
-        sleep(DEFAULT_WAIT_TIME)
+        timing.think(DEFAULT_WAIT_TIME, DEFAULT_WAIT_TIME)
         apply_style(original_style)
 
     @staticmethod
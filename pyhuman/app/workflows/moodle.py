@@ -8,9 +8,6 @@
 # pylint: disable=bare-except
 # pylint: disable=too-many-return-statements
 
-from time import sleep
-import random
-
 from faker import Faker
 from faker.providers import person
 
@@ -20,10 +17,14 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from ..utility.metric_workflow import MetricWorkflow
-from ..utility.webdriver_helper import WebDriverHelper
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from ..utility.webdriver_helper import WebDriverHelper, origin_of
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from ..utility.timing import timing
+from ..utility.page_wait import READY_TIMEOUT, wait_for_clickable, wait_for_element, wait_until_ready
+from ..utility.rng import current_stream, rng
+
 
+MOODLE_ORIGIN = 'https://service.project1.os'
 
 WORKFLOW_NAME = 'Moodle'
 WORKFLOW_DESCRIPTION = 'Interact with Moodle'
@@ -31,6 +32,9 @@ WORKFLOW_DESCRIPTION = 'Interact with Moodle'
 DEFAULT_INPUT_WAIT_TIME = 2
 MIN_WAIT_TIME = 2  # Minimum amount of time to wait after searching, in seconds
 MAX_WAIT_TIME = 5  # Maximum amount of time to wait after searching, in seconds
+ELEMENT_TIMEOUT = 5  # Event mode: how long to wait for an element on a ready page, in seconds
+FIXED_CLICK_RETRIES = 10
+EVENT_CLICK_RETRIES = 3
 
 
 def load():
@@ -50,17 +54,24 @@ class MoodleBrowse(MetricWorkflow):
         self.adminpass = 'adminPass!1'
         self.fake = Faker()
         self.fake.add_provider(person)
+        self.idp_origin = None
+        # 'fixed' sleeps a random MIN..MAX_WAIT_TIME after every page change; 'event' waits for
+        # the page to be ready and then applies the think time separately
+        self.wait_mode = 'fixed'
+        self.think_time = (MIN_WAIT_TIME, MAX_WAIT_TIME)
 
     def action(self, extra=None):
+        # Faker keeps its own generator; reseed it from this run's stream so names are replayable
+        self.fake.seed_instance(current_stream('faker').getrandbits(64))
         self.get_creds(extra)
         err = self.shib_sign_in()
         err = err or self.moodle_workflow()
 
-        if err or random.random() < 0.2:
+        if err or rng.random() < 0.2:
             print("... Decided to log out")
-            sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
-            print("... Stopping browser to force logout")
-            self.driver.stop_browser()  # restart browser for security!
+            self.think()
+            print("... Resetting browser session to force logout")
+            self.driver.reset_session(origins=[MOODLE_ORIGIN, self.idp_origin])
         else:
             print("... Decided not to log out of moodle")
 
@@ -81,22 +92,53 @@ class MoodleBrowse(MetricWorkflow):
             elif extra[i] == "user_roles":
                 self.user_roles = extra[i+1].split(',')
                 i += 2
+            elif extra[i] == "wait_mode":
+                self.wait_mode = extra[i+1]
+                i += 2
+            elif extra[i] == "think_time":
+                low, high = extra[i+1].split(',')
+                self.think_time = (float(low), float(high))
+                i += 2
             else:
                 i += 1
 
+    def think(self):
+        """Pause like a user reading the page or deciding what to do next."""
+        if self.wait_mode == 'fixed':
+            timing.think(MIN_WAIT_TIME, MAX_WAIT_TIME)
+        else:
+            timing.think(*self.think_time)
+
+    def settle(self):
+        """After a navigation or click: wait for the page to be ready (event mode), then think."""
+        if self.wait_mode == 'event' and not wait_until_ready(self.driver.driver):
+            print(f"... Page not ready after {READY_TIMEOUT}s, continuing")
+        self.think()
+
+    def find(self, by, value, timeout=ELEMENT_TIMEOUT):
+        """find_element that, in event mode, waits up to `timeout` seconds for the element."""
+        if self.wait_mode == 'fixed' or timeout <= 0:
+            return self.driver.driver.find_element(by, value)
+        try:
+            return wait_for_element(self.driver.driver, (by, value), timeout)
+        except TimeoutException:
+            raise NoSuchElementException(f"No element {by}={value} after {timeout}s")
+
     def shib_sign_in(self) -> bool:
 
         # Navigate to moodle
         self.driver.driver.get(
             'https://service.project1.os/moodle/auth/shibboleth/index.php')
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        self.settle()
 
         try:
+            # The shibboleth entry point redirects to the IdP; remember it so logout can clear it
+            self.idp_origin = origin_of(self.driver.driver.current_url) or self.idp_origin
             login_page_integrity = self.check_integrity()
             print(f"... Trying to enter username '{self.username}'")
 
-            search_element = self.driver.driver.find_element(
-                By.ID, 'username')  # username
+            # Already logged in means no username field; don't wait for one
+            search_element = self.find(By.ID, 'username', timeout=0)  # username
             if search_element is None:
                 print("... Could not find username field")
                 self.log_step_error(
@@ -104,12 +146,11 @@ class MoodleBrowse(MetricWorkflow):
                 return True
 
             search_element.send_keys(self.username)
-            sleep(1)
+            timing.sleep(1)
             print(f"... Trying to enter password '{self.password}'")
 
             self.log_step_start("enter-password")
-            search_element = self.driver.driver.find_element(
-                By.ID, 'password')  # password
+            search_element = self.find(By.ID, 'password')  # password
             if search_element is None:
                 print("... Could not find username field")
                 self.log_step_error(
@@ -120,13 +161,12 @@ class MoodleBrowse(MetricWorkflow):
 
             search_element.send_keys(self.password)
 
-            sleep(1)
+            timing.sleep(1)
             print("... Trying to click login")
 
             self.log_step_start("login")
-            sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
-            search_element = self.driver.driver.find_element(
-                By.TAG_NAME, 'button')  # login button
+            self.think()
+            search_element = self.find(By.TAG_NAME, 'button')  # login button
             if search_element is None:
                 print("... Could not find login button")
                 self.log_step_error("login", login_page_integrity)
@@ -136,7 +176,7 @@ class MoodleBrowse(MetricWorkflow):
                 search_element).click(search_element).perform()
 
             self.log_step_success("login", integrity=login_page_integrity)
-            sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+            self.settle()
         except Exception:
             print("... No login fields present, assuming we're already logged in")
 
@@ -146,7 +186,7 @@ class MoodleBrowse(MetricWorkflow):
         self.log_step_start("Dashboard")
 
         # Gather full visible text of the page
-        page_text = self.driver.driver.find_element(By.TAG_NAME, "body").text
+        page_text = self.find(By.TAG_NAME, "body").text
 
         # Define acceptable matches
         expected_strings = [
@@ -173,7 +213,7 @@ class MoodleBrowse(MetricWorkflow):
 
         self.driver.driver.get(
             'https://service.project1.os/moodle/?redirect=0')
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        self.settle()
 
         err = self.find_text_and_click(
             'Special Topics: AI-Powered Cybersecurity')
@@ -192,7 +232,7 @@ class MoodleBrowse(MetricWorkflow):
     def moodle_workflow(self) -> bool:
         self.driver.driver.get(
             'https://service.project1.os/moodle/my/courses.php')
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        self.settle()
 
         search_str = "not enrolled in any course"
         search_elements = self.driver.driver.find_elements(By.XPATH,
@@ -215,23 +255,23 @@ class MoodleBrowse(MetricWorkflow):
         # pop up to help a new user navigate.  click "got it"
         err = err or self.find_link_and_click(
             'https://service.project1.os/moodle/course/view.php?id=2')
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        self.settle()
         # go straight to course
         # print(f"Current url is {self.driver.driver.current_url}")
         # self.driver.driver.get('https://service.project1.os/moodle/course/view.php?id=2')
         # sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
 
-        pages_to_view = random.randint(1, 3)
+        pages_to_view = rng.randint(1, 3)
 
         for _ in range(pages_to_view):
-            week_choice = random.randint(0, 4)
+            week_choice = rng.randint(0, 4)
             match week_choice:
                 case 0:  # Announcements
                     self.log_step_start("BrowseCourse:Announcements")
                     err = err or self.find_text_and_click('Announcements')
                     print("... Going back to courses page")
                     self.driver.driver.back()
-                    sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+                    self.settle()
                     if err:
                         self.log_step_error(
                             "BrowseCourse:Announcements", integrity=self.check_integrity())
@@ -244,7 +284,7 @@ class MoodleBrowse(MetricWorkflow):
                     err = err or self.browse_moodle_pdf()
                     print("... Going back to courses page")
                     self.driver.driver.back()
-                    sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+                    self.settle()
                     if err:
                         self.log_step_error(
                             "BrowseCourse:CGC", integrity=self.check_integrity())
@@ -267,7 +307,7 @@ class MoodleBrowse(MetricWorkflow):
                     err = err or self.browse_moodle_pdf()
                     print("... Going back to courses page")
                     self.driver.driver.back()
-                    sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+                    self.settle()
                     if err:
                         self.log_step_error(
                             "BrowseCourse:Week3", integrity=self.check_integrity())
@@ -291,12 +331,12 @@ class MoodleBrowse(MetricWorkflow):
         self.log_step_start("BrowseCourse:MoodlePDF")
         err = False
         if False:
-            sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+            self.think()
             viewer = self.driver.driver.find_element(
                 By.XPATH, "//html/body/embed")
-            for _ in range(random.randint(0, 14)):
+            for _ in range(rng.randint(0, 14)):
 
-                choice = random.randint(0, 2)
+                choice = rng.randint(0, 2)
                 choice = 0
                 match choice:
                     case 0:
@@ -304,7 +344,7 @@ class MoodleBrowse(MetricWorkflow):
                         viewer.send_keys(Keys.PAGE_DOWN)
                         self.driver.driver.execute_script(
                             "window.scrollTo(0,250)")
-                        sleep(10)
+                        timing.sleep(10)
                     case 1:
                         print("... Trying page up key")
                         viewer.send_keys(Keys.PAGE_UP)
@@ -314,7 +354,7 @@ class MoodleBrowse(MetricWorkflow):
                     case 3:
                         print("... Trying end key")
                         viewer.send_keys(Keys.END)
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        self.think()
         if err:
             self.log_step_error("BrowseCourse:MoodlePDF",
                                 integrity=self.check_integrity())
@@ -327,20 +367,23 @@ class MoodleBrowse(MetricWorkflow):
         print(f"... Trying to click link containing: {to_find}")
         xpath = f"//{link_type}[contains(@href,'{to_find}')]"
 
+        # Waiting for clickability already covers a slow server, so event mode only retries
+        # for the case where a 'Got it' popup intercepted the click
+        retries = FIXED_CLICK_RETRIES if self.wait_mode == 'fixed' else EVENT_CLICK_RETRIES
+        timeout = 10 if self.wait_mode == 'fixed' else READY_TIMEOUT
+
         retry = 0
-        while retry < 10:
+        while retry < retries:
             try:
-                element = WebDriverWait(self.driver.driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, xpath))
-                )
+                element = wait_for_clickable(self.driver.driver, (By.XPATH, xpath), timeout)
                 element.click()
                 print(f"... Clicked link: {element.text}")
                 return False
             except Exception:
                 self.maybe_click_got_it()
                 retry += 1
-                sleep(1)
-                pass
+                if self.wait_mode == 'fixed':
+                    timing.sleep(1)
 
         print(f"... Failed to click link '{to_find}'")
         return True
@@ -352,7 +395,7 @@ class MoodleBrowse(MetricWorkflow):
             if "got it" in button.text.lower():
                 button.click()
                 print("... Clicked 'Got it'")
-                sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+                self.settle()
                 break
         else:
             print("... No 'Got it' to click")
@@ -360,8 +403,7 @@ class MoodleBrowse(MetricWorkflow):
     def find_text_and_click(self, to_find: str, link_type: str = '*') -> bool:
 
         print(f"... Trying to click {to_find}")
-        search_element = self.driver.driver.find_element(By.XPATH,
-                                                         f"//{link_type}[contains(text(),'{to_find}')]")
+        search_element = self.find(By.XPATH, f"//{link_type}[contains(text(),'{to_find}')]")
 
         if search_element is None or to_find not in search_element.text:
             print(f"... Could not find {to_find}.")
@@ -372,21 +414,21 @@ class MoodleBrowse(MetricWorkflow):
         ActionChains(self.driver.driver).move_to_element(
             search_element).click(search_element).perform()
         print(f"... Successful click of {text}.")
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        self.settle()
 
         return False
 
     def find_id_and_click(self, to_find: str) -> bool:
-        search_element = self.driver.driver.find_element(By.ID, to_find)
+        search_element = self.find(By.ID, to_find)
 
         if search_element is None:
             print(f"### Could not find button id='{to_find}'")
             return True
 
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        self.think()
         print(f"... Trying to click button id={to_find}")
         ActionChains(self.driver.driver).move_to_element(
             search_element).click(search_element).perform()
-        sleep(random.randrange(MIN_WAIT_TIME, MAX_WAIT_TIME))
+        self.settle()
 
         return False
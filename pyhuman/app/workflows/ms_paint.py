@@ -1,9 +1,10 @@
 import os
 import platform
 from importlib import import_module
-from time import sleep, time
+from time import time
 
 from ..utility.base_workflow import BaseWorkflow
+from ..utility.timing import timing
 
 
 WORKFLOW_NAME = 'MicrosoftPaint'
@@ -37,13 +38,13 @@ class msPaint(BaseWorkflow):
     def _ms_paint(self):
         os.startfile(self.paint_path)
         self.pyautogui.getWindowsWithTitle('Paint')
-        sleep(self.input_wait_time)
+        timing.sleep(self.input_wait_time)
         self.pyautogui.hotkey('ctrl', 's')
         file_name = int(time())
-        sleep(self.input_wait_time)
+        timing.sleep(self.input_wait_time)
         self.pyautogui.typewrite(str(file_name))
-        sleep(self.input_wait_time)
+        timing.sleep(self.input_wait_time)
         self.pyautogui.press('enter')
-        sleep(self.input_wait_time)
+        timing.sleep(self.input_wait_time)
         self.pyautogui.getWindowsWithTitle('Paint')
         self.pyautogui.hotkey('alt', 'f4')
@@ -1,9 +1,9 @@
 import os
 import platform
-import random
 from lorem.text import TextLorem
-from time import sleep
 from ..utility.base_workflow import BaseWorkflow
+from ..utility.rng import rng
+from ..utility.timing import timing
 
 
 WORKFLOW_NAME = 'OpenOfficeCalc'
@@ -33,39 +33,39 @@ class OpenOfficeCalc(BaseWorkflow):
     def _create_spreadsheet(self):
         self._new_spreadsheet()
         # move to random cell, given column & row parameters
-        self._move_to_cell([random.choice('abcde'), random.randrange(6)])
-        sleep(1)
+        self._move_to_cell([rng.choice('abcde'), rng.randrange(6)])
+        timing.sleep(1)
         self._insert_table()
-        sleep(1)
+        timing.sleep(1)
         # move to random cell, given column & row parameters
         self._move_to_cell(
-            [random.choice('abcdefghijkl'), random.randrange(15)])
+            [rng.choice('abcdefghijkl'), rng.randrange(15)])
         self._insert_comment()
-        sleep(3)
+        timing.sleep(3)
         self._save_quit()
 
     def _insert_comment(self):
         pyautogui.hotkey('ctrl', 'alt', 'c')  # insert comment
         pyautogui.typewrite(TextLorem().sentence())  # type random sentence
         pyautogui.press('esc')  # finish commenting
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
 
     def _new_spreadsheet(self):
         os.startfile(self.open_office_path)  # start OpenOffice
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.press('s')  # choose new spreadsheet
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
 
     def _save_quit(self):
         pyautogui.hotkey('ctrl', 's')  # save
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         # type random file name
         pyautogui.typewrite(TextLorem(wsep='-', srange=(1, 3)).sentence()[:-1])
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.press('enter')
         # choose "yes" if a popup asks if you'd like to overwrite another file
         pyautogui.hotkey('alt', 'y')
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.hotkey('ctrl', 'q')  # quit OpenOffice
 
     def _move_to_cell(self, cell_coordinate):
@@ -78,13 +78,13 @@ class OpenOfficeCalc(BaseWorkflow):
         pyautogui.press('f5')  # close navigator
 
     def _insert_table(self):
-        row_length = random.randint(3, 10)
+        row_length = rng.randint(3, 10)
         for i in range(0, row_length):  # create header row for a table
             pyautogui.write(TextLorem()._word())  # type a random word
             pyautogui.press('tab')
-        for j in range(0, random.randint(3, 10)):
+        for j in range(0, rng.randint(3, 10)):
             pyautogui.press('enter')
             for k in range(0, row_length):
                 # type a random number
-                pyautogui.write(str(random.randint(0, 10000)))
+                pyautogui.write(str(rng.randint(0, 10000)))
                 pyautogui.press('tab')
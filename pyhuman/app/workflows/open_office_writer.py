@@ -1,9 +1,9 @@
 import os
-import random
 import platform
 from lorem.text import TextLorem
-from time import sleep
 from ..utility.base_workflow import BaseWorkflow
+from ..utility.rng import rng
+from ..utility.timing import timing
 
 
 WORKFLOW_NAME = 'OpenOfficeWriter'
@@ -32,14 +32,14 @@ class OpenOfficeWriter(BaseWorkflow):
     def _create_document(self):
         self._new_document()
         # Type random paragrahs and sentences
-        for i in range(0, random.randint(2, 10)):
-            random.choice([pyautogui.typewrite(TextLorem().paragraph()),
+        for i in range(0, rng.randint(2, 10)):
+            rng.choice([pyautogui.typewrite(TextLorem().paragraph()),
                           pyautogui.typewrite(TextLorem().sentence())])
             pyautogui.press('enter')
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         # Randomly perform actions
-        for i in range(0, random.randint(6, 15)):
-            random.choice([self._save_pdf,
+        for i in range(0, rng.randint(6, 15)):
+            rng.choice([self._save_pdf,
                            self._write_sentence,
                            self._write_paragraph,
                            self._copy_paste,
@@ -47,7 +47,7 @@ class OpenOfficeWriter(BaseWorkflow):
                            self._find,
                            self._delete_text,
                            self._format_text])()
-            sleep(self.default_wait_time)
+            timing.sleep(self.default_wait_time)
         # Save and quit the document
         self._save_quit()
 
@@ -55,33 +55,33 @@ class OpenOfficeWriter(BaseWorkflow):
         pyautogui.hotkey('ctrl', 'alt', 'c')  # insert comment
         pyautogui.typewrite(TextLorem().sentence())  # type random sentence
         pyautogui.press('esc')  # finish commenting
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
 
     def _find(self):
         pyautogui.hotkey('ctrl', 'f')  # open Find & Replace
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.typewrite(TextLorem()._word())  # type random word
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.press('enter')
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.hotkey('alt', 'y')  # close pop up box that may appear
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.hotkey('alt', 'c')  # close Find & Replace
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
 
     def _copy_paste(self):
         self._select_text()
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.hotkey('ctrl', 'c')  # copy to clipboard
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.press('backspace')  # delete text
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.typewrite(TextLorem().paragraph())  # write text
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.press('enter')  # insert new line
         pyautogui.press('enter')  # insert new line
         pyautogui.hotkey('ctrl', 'v')  # paste from clipboard
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
 
     def _select_text(self):
         selection_params = [
@@ -89,19 +89,19 @@ class OpenOfficeWriter(BaseWorkflow):
             ['shift', 'left'],  # move cursor & select to left
             ['shift', 'up']  # move cursor & select up
         ]
-        pyautogui.hotkey(*random.choice(selection_params))
+        pyautogui.hotkey(*rng.choice(selection_params))
 
     def _format_text(self):
         self._select_text()
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         formatting_params = [['ctrl', '1'],  # Apply heading 1 style
                              ['ctrl', '2'],  # Apply heading 2 style
                              ['ctrl', '3'],  # Apply heading 3 style
                              ['ctrl', 'd'],  # Double underline
                              ['ctrl', 'e'],  # Center
                              ['ctrl', '5']]  # Set 1.5 line spacing
-        pyautogui.hotkey(*random.choice(formatting_params))
-        sleep(self.default_wait_time)
+        pyautogui.hotkey(*rng.choice(formatting_params))
+        timing.sleep(self.default_wait_time)
 
     def _delete_text(self):
         # Delete text to beginning of line
@@ -117,30 +117,30 @@ class OpenOfficeWriter(BaseWorkflow):
         pyautogui.hotkey('alt', 'x')  # choose Export
         # type random file name
         pyautogui.typewrite(TextLorem(wsep='-', srange=(1, 3)).sentence()[:-1])
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.press('enter')  # press enter
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         # choose "yes" if a popup asks if you'd like to overwrite another file
         pyautogui.hotkey('alt', 'y')
 
     def _new_document(self):
         # Open new document in OpenOffice
         os.startfile(self.open_office_path)  # open OpenOffice
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.press('d')  # choose document editing
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         # pyautogui.hotkey('ctrl','shift', 'j') # full screen mode
 
     def _save_quit(self):
         pyautogui.hotkey('ctrl', 's')  # save
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         # type random file name
         pyautogui.typewrite(TextLorem(wsep='-', srange=(1, 3)).sentence()[:-1])
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.press('enter')
         # choose "yes" if a popup asks if you'd like to overwrite another file
         pyautogui.hotkey('alt', 'y')
-        sleep(self.default_wait_time)
+        timing.sleep(self.default_wait_time)
         pyautogui.hotkey('ctrl', 'q')  # quit OpenOffice
 
     def _write_paragraph(self):
@@ -1,8 +1,8 @@
 import subprocess
 import sys
-from time import sleep
 
 from ..utility.base_workflow import BaseWorkflow
+from ..utility.timing import timing
 
 
 WORKFLOW_NAME = 'ListFiles'
@@ -25,7 +25,7 @@ class ListFiles(BaseWorkflow):
 
     def _spawn_shell_and_quit(self):
         p = subprocess.Popen(self._determine_os_shell_command(), shell=True)
-        sleep(5)
+        timing.sleep(5)
         p.kill()
 
     @staticmethod
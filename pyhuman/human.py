@@ -1,14 +1,27 @@
+from app.utility.startup_timer import startup_timer  # first, so the timer covers imports
 import argparse
 import signal
 import os
 import random
 import sys
-from importlib import import_module
-from time import sleep
+import threading
 import traceback
 import time
-from app.utility.webdriver_helper import WebDriverHelper
-from app.utility.metric_workflow import MetricWorkflow  # Import to use isinstance
+with startup_timer.section('import human.py dependencies'):
+    # Nothing here may import selenium; browser code is only loaded with the first browser workflow
+    from app.utility.metric_workflow import MetricWorkflow  # Import to use isinstance
+    from app.utility.persona import Persona, set_current_persona
+    from app.utility.browser_pool import configure_pool, get_pool, DEFAULT_POOL_SIZE, DEFAULT_SPARES
+    from app.utility import (artifact_store, browser_profiles, content_mirror, download_engine, driver_cache,
+                             keystroke_dynamics, launch_profiles, workflow_registry)
+    from app.utility.metrics_sink import configure_pipeline, DEFAULT_QUEUE_SIZE, DEFAULT_BATCH_SIZE
+    from app.utility.latency_histogram import start_summary_reporter, DEFAULT_SUMMARY_INTERVAL
+    from app.utility.prometheus_exporter import metrics, start_exporter, DEFAULT_BIND
+    from app.utility.timing import timing, parse_distribution, parse_diurnal
+    from app.utility.workflow_registry import LazyWorkflow, read_manifest, resolve_workflow
+    from app.utility.open_loop import OpenLoopScheduler, parse_rates, resolve_rate_key, DEFAULT_REPORT_INTERVAL
+    from app.utility.workflow_selector import selector, parse_assignments, load_mix
+    from app.utility.rng import StreamContext, bind_context, streams
 
 
 # Constants for default values
@@ -17,27 +30,55 @@ TASK_INTERVAL_SECONDS = 10
 GROUPING_INTERVAL_SECONDS = 500
 HUMAN_LIFESPAN_SECONDS = 0
 EXTRA_DEFAULTS = []
+PERSONA_COUNT = 0
 
 
-def handle_workflow(workflow, extra):
+def stop_browser():
+    """
+    stop_browser
+
+    Discards the current persona's browser, if any browser workflow has been loaded at all.
+
+    Return:
+    None
+    """
+    webdriver_helper = sys.modules.get('app.utility.webdriver_helper')
+    if webdriver_helper is None:
+        return
+    webdriver_helper.WebDriverHelper().stop_browser()
+    metrics.inc('pyhuman_browser_restarts_total')
+    print(get_pool().report())
+
+
+def handle_workflow(workflow, extra, seed=None):
     """
     handle_workflow
 
     Executes a single workflow action with appropriate logging and error handling.
 
     Parameters:
-    workflow (object): The workflow instance.
+    workflow (object): The workflow instance, or a LazyWorkflow that is loaded on first use.
     extra (list): Extra arguments for the workflow.
+    seed (int|None): Seed of this run's random streams (see app.utility.rng).
 
     Return:
     bool: True if the action failed, False otherwise.
     """
+    try:
+        workflow = resolve_workflow(workflow)
+    except Exception as e:
+        print(f'Error could not load workflow {workflow.module}: {e}')
+        return True
+
     err = False
+    metrics.inc('pyhuman_workflow_starts_total', workflow=workflow.name)
+    metrics.inc('pyhuman_workflows_running', workflow=workflow.name)
     try:
         if isinstance(workflow, MetricWorkflow):
             workflow.log_workflow_start()
 
-        result = workflow.action(extra)
+        with streams.run(seed):
+            result = workflow.action(extra)
         err = bool(result)
 
         if isinstance(workflow, MetricWorkflow):
@@ -56,13 +97,20 @@ def handle_workflow(workflow, extra):
         print(f"\nWorkflow {workflow.display} failed")
         print(traceback.format_exc())
         print("Trying browser restart")
-        WebDriverHelper().stop_browser()
+        stop_browser()
 
+    finally:
+        metrics.inc('pyhuman_workflows_running', -1, workflow=workflow.name)
+
+    if err:
+        metrics.inc('pyhuman_workflow_errors_total', workflow=workflow.name)
+    else:
+        metrics.inc('pyhuman_workflow_successes_total', workflow=workflow.name)
     return err
 
 
 def emulation_loop(workflows: list, clustersize: int, taskinterval: int, taskgroupinterval: int,
-                   lifespan_seconds: int, extra: list) -> None:
+                   lifespan_seconds: int, extra: list, persona: Persona | None = None) -> None:
     """
     emulation_loop
 
@@ -73,32 +121,61 @@ def emulation_loop(workflows: list, clustersize: int, taskinterval: int, taskgro
     taskgroupinterval (int): Max interval between task groups.
     lifespan_seconds (int): Duration to run the loop.
     extra (list): Extra parameters for workflows.
+    persona (Persona|None): Persona driving this loop; its RNG and stop event are used when given.
 
     Return:
     None
     """
     infinite = lifespan_seconds == 0
     t_end = time.time() + lifespan_seconds
+    if persona is None:
+        bind_context(StreamContext(streams.derive('main')))
+    rng = persona.rng if persona else streams.stream('main', 'scheduler')
+    owner = persona.name if persona else 'main'
+    prefix = f"[{persona.name}] " if persona else ""
+    stop_event = persona.stop_event if persona else None
+    previous = None
+
+    def pause(interval):
+        # Returns True when the loop should stop
+        metrics.inc('pyhuman_scheduler_sleeping')
+        try:
+            return timing.think(0, interval)
+        finally:
+            metrics.inc('pyhuman_scheduler_sleeping', -1)
 
     while infinite or time.time() < t_end:
         for _ in range(clustersize):
-            sleep(random.randrange(taskinterval))
-            workflow = random.choice(workflows)
-            print(workflow.display)
+            if pause(taskinterval):
+                return
+            decision = streams.decide(owner, workflows, lambda: selector.choose(workflows, rng, previous))
+            if decision is None:
+                print(prefix + "Replay finished")
+                return
+            workflow, seed = decision
+            previous = workflow
+            print(prefix + workflow.display)
 
             try:
-                err = handle_workflow(workflow, extra)
+                with selector.slot(workflow, stop_event) as acquired:
+                    if not acquired and stop_event is not None and stop_event.is_set():
+                        return
+                    if not acquired:
+                        print(prefix + f"Skipping {workflow.name}: no free concurrency slot")
+                        continue
+                    err = handle_workflow(workflow, extra, seed)
             except KeyboardInterrupt:
                 print('Keyboard interrupt detected, shutting down')
                 return
 
             if not infinite and time.time() >= t_end:
-                if not err and isinstance(workflow, MetricWorkflow):
-                    workflow.log_workflow_success()
+                if not err and isinstance(resolve_workflow(workflow), MetricWorkflow):
+                    resolve_workflow(workflow).log_workflow_success()
                     print("Finishing workflows due to time out")
                 return
 
-        sleep(random.randrange(taskgroupinterval))
+        if pause(taskgroupinterval):
+            return
 
 
 def import_workflows(selected_workflows: list | None = None) -> list:
@@ -108,8 +185,12 @@ def import_workflows(selected_workflows: list | None = None) -> list:
     Parameters:
     selected_workflows (list|None): List of workflow names to import, or None to import all.
 
+    Workflows are discovered from the WORKFLOW_NAME/WORKFLOW_DESCRIPTION constants in each
+    module's source; the module is only imported, and its load() called, when the workflow is
+    first run.
+
     Return:
-    list: List of loaded workflow instances.
+    list: List of LazyWorkflow entries.
     """
     extensions = []
     root_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'app', 'workflows')
@@ -124,33 +205,161 @@ def import_workflows(selected_workflows: list | None = None) -> list:
                 continue
 
             try:
-                module=load_module('app/workflows', file)
-                if module is not None:
-                    extensions.append(module)
-            except Exception as e:
+                manifest = read_manifest(os.path.join(root, file))
+            except (OSError, SyntaxError) as e:
                 print(f'Error could not load workflow {file}: {e}')
+                continue
+            module = os.path.join('app', 'workflows', name).replace(os.path.sep, '.')
+            extensions.append(LazyWorkflow(module, manifest.get('WORKFLOW_NAME', name),
+                                           manifest.get('WORKFLOW_DESCRIPTION', name)))
 
     return extensions
 
 
-def load_module(root: str, file: str):
+def build_personas(count: int, extra: list, workflows_list: list | None = None,
+                   speed_spread: float = 0.0) -> list:
     """
-    load_module
+    build_personas
+
+    Creates `count` personas, each with its own workflow instances, RNG stream and extra
+    arguments, in which "{persona}" and "{index}" are substituted so each persona can use its
+    own passfile. Workflow modules are imported once and shared. Persona random streams are
+    derived from the base seed configured on app.utility.rng.streams.
 
     Parameters:
-    root (str): Root Python module path.
-    file (str): Filename of the workflow script.
+    count (int): Number of personas to create.
+    extra (list): Extra parameters for workflows.
+    workflows_list (list|None): Specific workflows to load.
+    speed_spread (float): Sigma of the log-normal per-persona speed factor (0 = all personas equal).
 
     Return:
-    object: The result of the workflow module's load() function.
+    list: The personas.
+    """
+    personas = []
+    for index in range(count):
+        persona = Persona(index, seed=streams.derive('persona', index), extra=extra, speed_spread=speed_spread)
+        set_current_persona(persona)
+        try:
+            persona.workflows = import_workflows(workflows_list)
+        finally:
+            set_current_persona(None)
+        personas.append(persona)
+    metrics.set('pyhuman_personas', len(personas))
+    return personas
+
+
+def install_persona_signal_handler(personas: list, on_stop=None) -> None:
     """
-    module = os.path.join(*root.split('/'), file.split('.')[0]).replace(os.path.sep, '.')
-    workflow_module = import_module(module)
-    return getattr(workflow_module, 'load')()
+    install_persona_signal_handler
+
+    On SIGINT/SIGTERM, stops every persona, cleans up each persona's workflows and exits.
+
+    Parameters:
+    personas (list): Personas to stop.
+    on_stop (callable|None): Called first, e.g. to stop a scheduler.
+
+    Return:
+    None
+    """
+    def signal_handler(sig, frame):
+        if on_stop is not None:
+            on_stop()
+        for persona in personas:
+            persona.stop_event.set()
+        for persona in personas:
+            set_current_persona(persona)
+            for workflow in persona.workflows:
+                workflow.cleanup()
+        set_current_persona(None)
+        exit(0)
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+
+def run_personas(count: int, clustersize: int, taskinterval: int, taskgroupinterval: int,
+                 lifespan_seconds: int, extra: list, workflows_list: list | None = None,
+                 profile_startup: bool = False, speed_spread: float = 0.0) -> None:
+    """
+    run_personas
+
+    Runs `count` independent personas in this process, one thread each. Each persona has its
+    own browser session (WebDriverHelper is a per-persona singleton); see build_personas.
+
+    Parameters:
+    count (int): Number of personas to run.
+    clustersize (int): Number of tasks to run concurrently.
+    taskinterval (int): Max interval between individual task executions.
+    taskgroupinterval (int): Max interval between task groups.
+    lifespan_seconds (int): Duration to run the loop.
+    extra (list): Extra parameters for workflows.
+    workflows_list (list|None): Specific workflows to load.
+    profile_startup (bool): Print the startup timing report once all personas are loaded.
+    speed_spread (float): Sigma of the log-normal per-persona speed factor (0 = all personas equal).
+
+    Return:
+    None
+    """
+    personas = build_personas(count, extra, workflows_list, speed_spread)
+    if profile_startup:
+        print(startup_timer.report())
+    install_persona_signal_handler(personas)
+
+    def persona_main(persona):
+        set_current_persona(persona)
+        emulation_loop(workflows=persona.workflows, clustersize=clustersize, taskinterval=taskinterval,
+                       taskgroupinterval=taskgroupinterval, lifespan_seconds=lifespan_seconds,
+                       extra=persona.extra, persona=persona)
+
+    threads = [threading.Thread(target=persona_main, args=(p,), name=p.name, daemon=True) for p in personas]
+    for thread in threads:
+        thread.start()
+
+    # Join with a timeout so the main thread stays responsive to signals
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=0.5)
+
+
+def run_open_loop(workers: int, rates: dict, lifespan_seconds: int, extra: list,
+                  workflows_list: list | None = None, poisson: bool = False, profile_startup: bool = False,
+                  speed_spread: float = 0.0, report_interval: float = DEFAULT_REPORT_INTERVAL) -> None:
+    """
+    run_open_loop
+
+    Starts workflows at target arrival rates, independent of how long earlier ones take, on a
+    pool of `workers` personas. Achieved vs target rate and queueing delay are reported every
+    `report_interval` seconds.
+
+    Parameters:
+    workers (int): Number of worker personas (concurrent workflows).
+    rates (dict): Arrivals per minute by workflow name; the key None is an aggregate rate.
+    lifespan_seconds (int): Duration to run (0 = forever).
+    extra (list): Extra parameters for workflows.
+    workflows_list (list|None): Specific workflows to load.
+    poisson (bool): Use a Poisson arrival process instead of evenly spaced arrivals.
+    profile_startup (bool): Print the startup timing report once all personas are loaded.
+    speed_spread (float): Sigma of the log-normal per-persona speed factor.
+    report_interval (float): Seconds between achieved-rate reports.
+
+    Return:
+    None
+    """
+    personas = build_personas(workers, extra, workflows_list, speed_spread)
+    if profile_startup:
+        print(startup_timer.report())
+    scheduler = OpenLoopScheduler(personas, rates, handle=handle_workflow, poisson=poisson,
+                                  report_interval=report_interval, rng=streams.stream('arrivals'),
+                                  pick_rng=streams.stream('picks'))
+    install_persona_signal_handler(personas, on_stop=scheduler.stop)
+    scheduler.run(lifespan_seconds)
 
 
 def run(clustersize: int, taskinterval: int, taskgroupinterval: int,
-        lifespan_seconds: int, extra: list, workflows_list: list | None = None) -> None:
+        lifespan_seconds: int, extra: list, workflows_list: list | None = None,
+        personas: int = PERSONA_COUNT, profile_startup: bool = False,
+        speed_spread: float = 0.0, arrival_rates: dict | None = None, poisson: bool = False,
+        rate_report_interval: float = DEFAULT_REPORT_INTERVAL) -> None:
     """
     run
 
@@ -161,11 +370,35 @@ def run(clustersize: int, taskinterval: int, taskgroupinterval: int,
     lifespan_seconds (int): Duration to run the loop.
     extra (list): Extra parameters for workflows.
     workflows_list (list|None): Specific workflows to load.
+    personas (int): Number of concurrent personas; 0 runs the classic single-user loop.
+    profile_startup (bool): Print the startup timing report once workflows are loaded.
+    speed_spread (float): Sigma of the log-normal per-persona speed factor.
+    arrival_rates (dict|None): Target arrivals per minute; when given, runs the open-loop
+                               scheduler with `personas` workers (at least one) instead.
+    poisson (bool): Poisson arrivals in open-loop mode.
+    rate_report_interval (float): Seconds between open-loop rate reports.
 
     Return:
     None
     """
+    if arrival_rates:
+        run_open_loop(workers=max(personas, 1), rates=arrival_rates, lifespan_seconds=lifespan_seconds,
+                      extra=extra, workflows_list=workflows_list, poisson=poisson,
+                      profile_startup=profile_startup, speed_spread=speed_spread,
+                      report_interval=rate_report_interval)
+        return
+
+    if personas > 0:
+        run_personas(count=personas, clustersize=clustersize, taskinterval=taskinterval,
+                     taskgroupinterval=taskgroupinterval, lifespan_seconds=lifespan_seconds,
+                     extra=extra, workflows_list=workflows_list,
+                     profile_startup=profile_startup, speed_spread=speed_spread)
+        return
+
     workflows = import_workflows(workflows_list)
+    metrics.set('pyhuman_personas', 1)
+    if profile_startup:
+        print(startup_timer.report())
 
     def signal_handler(sig, frame):
         for workflow in workflows:
@@ -194,16 +427,137 @@ def main() -> None:
     parser.add_argument('--taskgroupinterval', type=int, default=GROUPING_INTERVAL_SECONDS)
     parser.add_argument('--stopafter', type=int, default=HUMAN_LIFESPAN_SECONDS)
     parser.add_argument('--extra', nargs='*', default=EXTRA_DEFAULTS)
-    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Base seed from which every persona, workflow run and component stream is derived')
+    parser.add_argument('--record', default=None, metavar='FILE',
+                        help='Write every workflow decision and its seed to FILE so the run can be replayed')
+    parser.add_argument('--replay', default=None, metavar='FILE',
+                        help='Repeat the decisions recorded in FILE (uses its seed; stops when it runs out)')
     parser.add_argument('--workflows', nargs='*', help='Names of specific workflows to load (without .py)')
+    parser.add_argument('--personas', type=int, default=PERSONA_COUNT,
+                        help='Run N independent personas in this process (0 = single classic loop)')
+    parser.add_argument('--browser-pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                        help='Maximum number of live Chrome instances (0 = no limit)')
+    parser.add_argument('--browser-spares', type=int, default=DEFAULT_SPARES,
+                        help='Number of pre-launched warm Chrome instances kept ready')
+    parser.add_argument('--launch-profile', default=launch_profiles.DEFAULT_PROFILE,
+                        choices=list(launch_profiles.LAUNCH_PROFILES),
+                        help='Chrome launch profile: headed (realistic), headless, lean (headless without '
+                             'background services) or minimal (lean without images)')
+    parser.add_argument('--browser-profiles', default=None, metavar='DIR',
+                        help='Keep a persistent Chrome profile per persona under DIR (cache, cookies, TLS sessions)')
+    parser.add_argument('--browser-profile-max-mb', type=int, default=browser_profiles.DEFAULT_MAX_MB,
+                        help='Evict least recently used cache files from each profile above this size (0 = no cap)')
+    parser.add_argument('--chromedriver', default=None,
+                        help='Path to a chromedriver executable, skipping driver lookup entirely')
+    parser.add_argument('--offline', action='store_true',
+                        help='Never contact the network to resolve chromedriver; use the local cache only')
+    parser.add_argument('--download-connections', type=int, default=download_engine.DEFAULT_MAX_CONNECTIONS,
+                        help='Keep-alive connections shared by download workflows')
+    parser.add_argument('--download-bandwidth-kbps', type=float, default=0,
+                        help='Shape download workflow throughput to this many kilobits per second (0 = unlimited)')
+    parser.add_argument('--download-chunk-kb', type=int, default=download_engine.DEFAULT_CHUNK_SIZE // 1024,
+                        help='Download workflows read and write files in chunks of this many KB')
+    parser.add_argument('--download-max-mb', type=float, default=download_engine.DEFAULT_MAX_FILE_MB,
+                        help='Abort downloads larger than this many MB (0 = no limit)')
+    parser.add_argument('--no-http2', action='store_true',
+                        help='Do not negotiate HTTP/2 for download workflows even if httpx[http2] is installed')
+    parser.add_argument('--download-mirror', default=None, metavar='URL|DIR',
+                        help='Have DownloadFiles fetch from a content mirror instead of the internet: the URL of '
+                             'a mirror server, or a mirror cache directory to serve on localhost')
+    parser.add_argument('--typing-profile', default=None,
+                        help='Keystroke dynamics profile for shell workflows, e.g. hunt_and_peck, average, '
+                             'touch_typist or fast (load tests); by default each persona draws one')
+    parser.add_argument('--typing-profiles', default=None, metavar='FILE',
+                        help='Load keystroke dynamics profiles from a table file instead of the built-in ones')
+    parser.add_argument('--artifact-dir', default=None, metavar='DIR',
+                        help='Where downloads and software builds are kept, one store per persona')
+    parser.add_argument('--artifact-quota-mb', type=float, default=artifact_store.DEFAULT_QUOTA_MB,
+                        help='Evict least recently used artifacts of a persona above this many MB (0 = no quota)')
+    parser.add_argument('--artifact-max-age-hours', type=float, default=artifact_store.DEFAULT_MAX_AGE_HOURS,
+                        help='Evict artifacts not used for this many hours (0 = no age limit)')
+    parser.add_argument('--metrics-sink', nargs='*', default=['stdout'],
+                        help='Where workflow metrics go: stdout, file:PATH, udp:HOST:PORT, '
+                             'syslog:HOST:PORT, syslog:/dev/log or unix:PATH (several allowed)')
+    parser.add_argument('--metrics-queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help='Metric records buffered before new ones are dropped')
+    parser.add_argument('--metrics-batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Maximum metric records written per batch')
+    parser.add_argument('--latency-summary-interval', type=float, default=DEFAULT_SUMMARY_INTERVAL,
+                        help='Seconds between p50/p90/p99 step latency summaries (0 = disabled)')
+    parser.add_argument('--metrics-port', type=int, default=0,
+                        help='Serve Prometheus/OpenMetrics text on this port at /metrics (0 = disabled)')
+    parser.add_argument('--metrics-bind', default=DEFAULT_BIND,
+                        help='Address the metrics endpoint listens on')
+    parser.add_argument('--think-distribution', default='uniform',
+                        help='Think time distribution: uniform, lognormal[:SIGMA], pareto[:ALPHA] or empirical:PATH')
+    parser.add_argument('--time-compression', type=float, default=1.0,
+                        help='Run all human delays this many times faster (e.g. 60 runs an hour per minute)')
+    parser.add_argument('--diurnal', default='flat',
+                        help='Hour-of-day activity curve: flat, office, or 24 comma-separated values')
+    parser.add_argument('--persona-speed-spread', type=float, default=0.0,
+                        help='Sigma of the log-normal speed factor drawn for each persona (0 = all equal)')
+    parser.add_argument('--workflow-weight', nargs='*', default=[], metavar='NAME=WEIGHT',
+                        help='Relative likelihood of picking workflow NAME (module or WORKFLOW_NAME; default 1)')
+    parser.add_argument('--workflow-concurrency', nargs='*', default=[], metavar='NAME=MAX',
+                        help='Run at most MAX instances of workflow NAME at once across all personas')
+    parser.add_argument('--workflow-mix', default=None, metavar='FILE',
+                        help='JSON file with "weights", Markov "transitions" and "concurrency" for workflows; '
+                             'command-line weights and caps override it')
+    parser.add_argument('--arrival-rate', type=float, default=0.0,
+                        help='Open-loop mode: start this many workflows per minute in total, picked at random')
+    parser.add_argument('--workflow-rate', nargs='*', default=[], metavar='NAME=RATE',
+                        help='Open-loop mode: start workflow NAME (module or WORKFLOW_NAME) RATE times per minute')
+    parser.add_argument('--poisson', action='store_true',
+                        help='Open-loop mode: Poisson arrivals instead of evenly spaced ones')
+    parser.add_argument('--rate-report-interval', type=float, default=DEFAULT_REPORT_INTERVAL,
+                        help='Open-loop mode: seconds between achieved vs target rate reports')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Print how long each startup phase took and the import cost of each workflow')
 
     args = parser.parse_args()
+    if args.rate_report_interval <= 0:
+        parser.error('--rate-report-interval must be positive')
+    # Specs are checked before anything starts, and reported like any other bad argument
+    try:
+        configure_pipeline(args.metrics_sink, queue_size=args.metrics_queue_size, batch_size=args.metrics_batch_size)
+        timing.configure(distribution=parse_distribution(args.think_distribution),
+                         compression=args.time_compression, diurnal=parse_diurnal(args.diurnal))
+        # Shells only pick their typing profile when first used
+        keystroke_dynamics.configure(args.typing_profile, args.typing_profiles)
+        mix = load_mix(args.workflow_mix) if args.workflow_mix else {}
+        selector.configure(
+            weights={**mix.get('weights', {}), **parse_assignments(args.workflow_weight, 'workflow weight')},
+            transitions=mix.get('transitions'),
+            caps={**mix.get('concurrency', {}),
+                  **parse_assignments(args.workflow_concurrency, 'workflow concurrency', cast=int)})
+        arrival_rates = parse_rates(args.workflow_rate)
+        if args.arrival_rate > 0:
+            arrival_rates[None] = args.arrival_rate
+        if arrival_rates:
+            available = import_workflows(args.workflows)
+            for name in arrival_rates:
+                resolve_rate_key(name, available)
+    except (OSError, TypeError, ValueError) as e:
+        parser.error(str(e))
+
+    configure_pool(size=args.browser_pool_size, spares=args.browser_spares)
+    start_summary_reporter(args.latency_summary_interval)
+    start_exporter(args.metrics_port, bind=args.metrics_bind)
+    driver_cache.configure(chromedriver=args.chromedriver, offline=args.offline)
+    launch_profiles.configure(args.launch_profile)
+    download_engine.configure(max_connections=args.download_connections,
+                              bandwidth_kbps=args.download_bandwidth_kbps, http2=not args.no_http2,
+                              chunk_size=args.download_chunk_kb * 1024, max_file_mb=args.download_max_mb)
+    browser_profiles.configure(root=args.browser_profiles, max_mb=args.browser_profile_max_mb)
+    content_mirror.configure(args.download_mirror)
+    artifact_store.configure(root=args.artifact_dir, quota_mb=args.artifact_quota_mb,
+                             max_age_hours=args.artifact_max_age_hours)
+    workflow_registry.profile_imports = args.profile_startup
 
     try:
-        if args.seed is not None:
-            random.seed(args.seed)
-        else:
-            random.seed()
+        streams.configure(seed=args.seed, record=args.record, replay=args.replay)
+        random.seed(streams.base_seed)  # for libraries that draw from the global generator
 
         run(
             clustersize=args.clustersize,
@@ -211,7 +565,13 @@ def main() -> None:
             taskgroupinterval=args.taskgroupinterval,
             lifespan_seconds=args.stopafter,
             extra=args.extra,
-            workflows_list=args.workflows
+            workflows_list=args.workflows,
+            personas=args.personas,
+            profile_startup=args.profile_startup,
+            speed_spread=args.persona_speed_spread,
+            arrival_rates=arrival_rates,
+            poisson=args.poisson,
+            rate_report_interval=args.rate_report_interval
         )
 
     except KeyboardInterrupt:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# human.py runs from the pyhuman directory and imports `app` from there
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,122 @@
+import hashlib
+import os
+
+import pytest
+
+from app.utility.download_engine import PART_SUFFIX, DownloadEngine, DownloadError, DownloadTooLarge
+from app.utility.local_http_server import LocalHTTPServer
+
+PAGE = b"""<html><head><link rel="stylesheet" href="/style.css"><script src="/app.js"></script></head>
+<body><img src="/logo.png"><img src="http://127.0.0.1:1/x.png"></body></html>"""
+BODY = os.urandom(300 * 1024)
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / 'site'
+    root.mkdir()
+    (root / 'index.html').write_bytes(PAGE)
+    (root / 'style.css').write_bytes(b'body {}')
+    (root / 'app.js').write_bytes(b'1;')
+    (root / 'logo.png').write_bytes(b'\x89PNG')
+    (root / 'file.bin').write_bytes(BODY)
+    with LocalHTTPServer(str(root)) as server:
+        yield server
+
+
+@pytest.fixture
+def engine():
+    engine = DownloadEngine(max_connections=4, chunk_size=16 * 1024)
+    yield engine
+    engine.close()
+
+
+def test_fetch_reuses_the_connection(site, engine):
+    for _ in range(3):
+        assert engine.run(engine.fetch(site.url('/style.css'))).content == b'body {}'
+    assert site.connections == 1
+    assert engine.stats()['requests'] == 3
+
+
+def test_fetch_page_fetches_its_assets(site, engine):
+    page, assets = engine.run(engine.fetch_page(site.url('/index.html')))
+    assert page.content == PAGE
+    # The image on an unreachable host fails and is left out
+    assert sorted(a.url for a in assets) == sorted(site.url(p) for p in ('/style.css', '/app.js', '/logo.png'))
+    assert sum(a.size for a in assets) == len(b'body {}') + len(b'1;') + len(b'\x89PNG')
+
+
+def test_fetch_page_to_a_file(site, engine, tmp_path):
+    path = str(tmp_path / 'page.html')
+    page, assets = engine.run(engine.fetch_page(site.url('/index.html'), path=path))
+    with open(path, 'rb') as f:
+        assert f.read() == PAGE
+    assert len(assets) == 3
+
+
+def test_missing_page_raises_with_its_status(site, engine):
+    with pytest.raises(DownloadError) as raised:
+        engine.run(engine.fetch(site.url('/missing.html')))
+    assert raised.value.status == 404
+
+
+def test_download_streams_to_the_file(site, engine, tmp_path):
+    path = str(tmp_path / 'file.bin')
+    result = engine.run(engine.download(site.url('/file.bin'), path, checksum='sha256'))
+    with open(path, 'rb') as f:
+        assert f.read() == BODY
+    assert result.size == len(BODY) and result.resumed_from == 0
+    assert result.digest == hashlib.sha256(BODY).hexdigest()
+    assert not os.path.exists(path + PART_SUFFIX)
+
+
+def test_download_resumes_a_part_with_a_range_request(site, engine, tmp_path):
+    path = str(tmp_path / 'file.bin')
+    with open(path + PART_SUFFIX, 'wb') as f:
+        f.write(BODY[:100 * 1024])
+    result = engine.run(engine.download(site.url('/file.bin'), path,
+                                        expected_digest=hashlib.sha256(BODY).hexdigest()))
+    assert result.resumed_from == 100 * 1024
+    assert result.size == len(BODY) - 100 * 1024
+    with open(path, 'rb') as f:
+        assert f.read() == BODY
+
+
+def test_download_restarts_when_the_range_is_not_satisfiable(site, engine, tmp_path):
+    path = str(tmp_path / 'file.bin')
+    with open(path + PART_SUFFIX, 'wb') as f:
+        f.write(b'\0' * (len(BODY) + 10))
+    result = engine.run(engine.download(site.url('/file.bin'), path))
+    assert result.resumed_from == 0
+    with open(path, 'rb') as f:
+        assert f.read() == BODY
+
+
+def test_download_too_large_removes_the_part(site, engine, tmp_path):
+    path = str(tmp_path / 'file.bin')
+    with pytest.raises(DownloadTooLarge):
+        engine.run(engine.download(site.url('/file.bin'), path, max_bytes=64 * 1024))
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + PART_SUFFIX)
+
+
+def test_download_checksum_mismatch_removes_the_part(site, engine, tmp_path):
+    path = str(tmp_path / 'file.bin')
+    with pytest.raises(DownloadError, match='does not match'):
+        engine.run(engine.download(site.url('/file.bin'), path, expected_digest='0' * 64))
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + PART_SUFFIX)
+
+
+def test_failed_download_keeps_a_resumable_part_only(site, engine, tmp_path):
+    path = str(tmp_path / 'file.bin')
+    unreachable = 'http://127.0.0.1:1/file.bin'
+    for resume, kept in ((True, True), (False, False)):
+        with open(path + PART_SUFFIX, 'wb') as f:
+            f.write(BODY[:1024])
+        with pytest.raises(DownloadError):
+            engine.run(engine.download(unreachable, path, resume=resume))
+        assert os.path.exists(path + PART_SUFFIX) == kept
+    with pytest.raises(DownloadError):
+        engine.run(engine.download(site.url('/missing.bin'), path))
+    assert not os.path.exists(path + PART_SUFFIX)
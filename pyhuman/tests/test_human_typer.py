@@ -0,0 +1,103 @@
+import os
+import random
+
+import pytest
+
+from app.utility import human_typer
+from app.utility.human_typer import TYPING_TICK, HumanTyperShell, Keystroke, plan_keystrokes, typing_time
+
+
+class ScriptedRandom(object):
+    """Stands in for random.Random, returning scripted draws in order."""
+
+    def __init__(self, randoms, choices):
+        self.randoms = list(randoms)
+        self.choices = list(choices)
+
+    def random(self):
+        return self.randoms.pop(0)
+
+    def choice(self, sequence):
+        value = self.choices.pop(0)
+        assert value in sequence
+        return value
+
+
+def constant_latency(previous, char):
+    return 0.1
+
+
+def apply_backspaces(data: bytes) -> bytes:
+    typed = bytearray()
+    for byte in data:
+        if byte == 0x7f:
+            typed.pop()
+        else:
+            typed.append(byte)
+    return bytes(typed)
+
+
+def test_plan_types_typos_then_backspaces_then_the_correct_char():
+    # A typo on 'l' (one neighbour key), none on 's'
+    rng = ScriptedRandom(randoms=[0.0, 0.99], choices=[1, 'x', 'k'])
+    plan = plan_keystrokes('ls', rng, constant_latency, typo_rate=0.5)
+    assert b''.join(k.data for k in plan) == b'k\x7fls\n'
+    assert [k.echo for k in plan] == ['k', '\b \b', 'l', 's', '\n']
+
+
+def test_plan_with_three_typos_backspaces_each():
+    rng = ScriptedRandom(randoms=[0.0], choices=[3, 'x', 'w', 'x', 's', 'x', 'q'])
+    plan = plan_keystrokes('a', rng, constant_latency, typo_rate=0.5)
+    assert b''.join(k.data for k in plan) == b'wsq\x7f\x7f\x7fa\n'
+
+
+def test_seeded_plan_is_reproducible_and_corrects_every_typo():
+    command = 'cd /var/log && grep -i error syslog | tail -n 20'
+    first = plan_keystrokes(command, random.Random(7), constant_latency, typo_rate=0.3)
+    second = plan_keystrokes(command, random.Random(7), constant_latency, typo_rate=0.3)
+    assert first == second
+    data = b''.join(k.data for k in first)
+    assert b'\x7f' in data
+    assert apply_backspaces(data) == command.encode() + b'\n'
+
+
+def test_plan_times_are_monotonic_and_enter_comes_last():
+    plan = plan_keystrokes('make -j4 install', random.Random(3), lambda p, c: random.Random(p + c).uniform(0.05, 0.2),
+                           typo_rate=0.3)
+    times = [k.at for k in plan]
+    assert times == sorted(times)
+    assert plan[-1].data == b'\n'
+    assert b'\n' not in b''.join(k.data for k in plan[:-1])
+    assert typing_time(plan) == plan[-1].at
+
+
+def test_plan_waits_to_notice_a_typo():
+    rng = ScriptedRandom(randoms=[0.99, 0.0], choices=[1, 'x', 'a'])
+    plan = plan_keystrokes('ls', rng, constant_latency, typo_rate=0.5)
+    # 'l' at 0, then the typo after TYPO_NOTICE_KEYS intervals on top of the one after 'l'
+    typo = plan[1]
+    assert typo.data == b'a'
+    assert typo.at == pytest.approx(0.1 + human_typer.TYPO_NOTICE_KEYS * 0.1)
+
+
+def test_type_plan_coalesces_keystrokes_due_within_a_tick(monkeypatch):
+    writes = []
+    monkeypatch.setattr(human_typer.os, 'write', lambda fd, data: writes.append((fd, data)))
+    shell = HumanTyperShell.__new__(HumanTyperShell)
+    shell.master_fd = 99
+    shell.live_echo = False
+    plan = [Keystroke(0.0, b'a', 'a'), Keystroke(TYPING_TICK / 4, b'b', 'b'), Keystroke(TYPING_TICK / 2, b'c', 'c'),
+            Keystroke(0.15, b'd', 'd'), Keystroke(0.15 + TYPING_TICK / 2, b'e', 'e'),
+            Keystroke(0.3, b'\n', '\n')]
+    shell._type_plan(plan)
+    assert writes == [(99, b'abc'), (99, b'de'), (99, b'\n')]
+
+
+def test_type_plan_writes_keystrokes_a_tick_apart_separately(monkeypatch):
+    writes = []
+    monkeypatch.setattr(human_typer.os, 'write', lambda fd, data: writes.append(data))
+    shell = HumanTyperShell.__new__(HumanTyperShell)
+    shell.master_fd = 99
+    shell.live_echo = False
+    shell._type_plan([Keystroke(i * 0.05, bytes([ord('a') + i]), chr(ord('a') + i)) for i in range(4)])
+    assert writes == [b'a', b'b', b'c', b'd']
@@ -0,0 +1,12 @@
+from app.utility.latency_histogram import LatencyHistogram
+
+
+def test_cumulative_counts_match_prometheus_buckets():
+    histogram = LatencyHistogram()
+    for seconds in (0.003, 0.02, 0.02, 0.7, 45):
+        histogram.record(seconds)
+    assert histogram.cumulative_counts((0.001, 0.005, 0.025, 1, 10, 60)) == [0, 1, 3, 4, 4, 5]
+
+
+def test_cumulative_counts_of_an_empty_histogram():
+    assert LatencyHistogram().cumulative_counts((0.1, 1)) == [0, 0]